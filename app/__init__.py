@@ -32,6 +32,10 @@ def create_app(config_name='development'):
     migrate.init_app(app, db)
     CORS(app)
 
+    # Conversation persistence (sync or write-behind batches)
+    from app.services.conversation_writer import conversation_writer
+    conversation_writer.init_app(app)
+
     # Register blueprints
     register_blueprints(app)
 
@@ -42,12 +46,13 @@ def create_app(config_name='development'):
     @app.shell_context_processor
     def make_shell_context():
         """Make database and models available in flask shell."""
-        from app.models import dialogue, conversation, fine_tuning_job
+        from app.models import dialogue, conversation, fine_tuning_job, payload_blob
         return {
             'db': db,
             'Dialogue': dialogue.Dialogue,
             'Conversation': conversation.Conversation,
             'FineTuningJob': fine_tuning_job.FineTuningJob,
+            'PayloadBlob': payload_blob.PayloadBlob,
         }
 
     return app
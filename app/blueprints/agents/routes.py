@@ -3,12 +3,18 @@
 import json
 import time
 import uuid
-from flask import Blueprint, request, jsonify, render_template
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, render_template, current_app
 
 from app import db
 from app.models.dialogue import Dialogue
 from app.models.conversation import Conversation
-from app.services.openrouter_client import OpenRouterClient
+from app.services.conversation_writer import conversation_writer
+from app.services.openrouter_client import get_openrouter_client
+from app.services.tool_cache import agent_tool_cache
+from app.services.dialogue_sampler import dialogue_sampler
+from app.services.async_openrouter_client import get_async_openrouter_client
+from app.blueprints.streaming import wants_stream, sse_event, sse_response
 from app.config import Config
 
 bp = Blueprint('agents', __name__)
@@ -25,7 +31,7 @@ AGENT_TOOLS = [
         "type": "function",
         "function": {
             "name": "search_dialogues",
-            "description": "Search the dialogue database for specific comedian, movie, or emotion",
+            "description": "Search the dialogue database for specific comedian or emotion",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -38,10 +44,6 @@ AGENT_TOOLS = [
                         "type": "string",
                         "description": "Emotional tone (e.g., 'comedy', 'sarcasm', 'angry')"
                     },
-                    "movie": {
-                        "type": "string",
-                        "description": "Movie name"
-                    },
                     "limit": {
                         "type": "integer",
                         "description": "Maximum number of results",
@@ -136,25 +138,16 @@ AGENT_TOOLS = [
 def execute_tool(tool_name: str, arguments: dict) -> str:
     """Execute agent tool and return result."""
     if tool_name == "search_dialogues":
-        # Search dialogues based on criteria
-        query = Dialogue.query
-
-        if 'comedian' in arguments:
-            query = query.filter_by(comedian=arguments['comedian'])
-
-        if 'emotion' in arguments:
-            query = query.filter_by(emotion=arguments['emotion'])
-
-        if 'movie' in arguments:
-            query = query.filter_by(movie_name=arguments['movie'])
-
-        limit = arguments.get('limit', 5)
-        dialogues = query.limit(limit).all()
+        # Search dialogues based on criteria (text columns only)
+        dialogues = Dialogue.records(
+            limit=arguments.get('limit', 5),
+            comedian=arguments.get('comedian'),
+            emotion=arguments.get('emotion')
+        )
 
         results = [
             {
                 'comedian': d.comedian,
-                'movie': d.movie_name,
                 'dialogue': d.dialogue_tanglish or d.dialogue_english,
                 'emotion': d.emotion
             }
@@ -170,9 +163,6 @@ def execute_tool(tool_name: str, arguments: dict) -> str:
         comedian = arguments['comedian']
 
         total_dialogues = Dialogue.query.filter_by(comedian=comedian).count()
-        movies = db.session.query(Dialogue.movie_name).filter_by(
-            comedian=comedian
-        ).distinct().all()
 
         emotions = db.session.query(
             Dialogue.emotion,
@@ -184,33 +174,24 @@ def execute_tool(tool_name: str, arguments: dict) -> str:
         return json.dumps({
             'comedian': comedian,
             'total_dialogues': total_dialogues,
-            'unique_movies': len(movies),
-            'movies': [m[0] for m in movies if m[0]],
             'emotions': {e[0]: e[1] for e in emotions if e[0]}
         })
 
     elif tool_name == "get_random_dialogue":
-        import random
-
-        query = Dialogue.query
-
-        if 'comedian' in arguments and arguments['comedian']:
-            query = query.filter_by(comedian=arguments['comedian'])
-
-        count = arguments.get('count', 1)
-        all_dialogues = query.all()
+        random_dialogues = dialogue_sampler.sample(
+            arguments.get('count', 1),
+            comedian=arguments.get('comedian')
+        )
 
-        if not all_dialogues:
+        if not random_dialogues:
             return json.dumps({'error': 'No dialogues found', 'dialogues': []})
 
-        random_dialogues = random.sample(all_dialogues, min(count, len(all_dialogues)))
-
         results = [
             {
-                'comedian': d.comedian,
-                'dialogue': d.dialogue_tanglish or d.dialogue_english,
-                'emotion': d.emotion,
-                'context': d.context
+                'comedian': d['comedian'],
+                'dialogue': d['dialogue_tanglish'] or d['dialogue_english'],
+                'emotion': d['emotion'],
+                'context': d['context']
             }
             for d in random_dialogues
         ]
@@ -226,9 +207,6 @@ def execute_tool(tool_name: str, arguments: dict) -> str:
 
         for comedian in comedians:
             total = Dialogue.query.filter_by(comedian=comedian).count()
-            movies = db.session.query(Dialogue.movie_name).filter_by(
-                comedian=comedian
-            ).distinct().count()
 
             emotions = db.session.query(
                 Dialogue.emotion,
@@ -239,7 +217,6 @@ def execute_tool(tool_name: str, arguments: dict) -> str:
 
             comparison[comedian] = {
                 'total_dialogues': total,
-                'unique_movies': movies,
                 'top_emotions': [e[0] for e in sorted(emotions, key=lambda x: x[1], reverse=True)[:3] if e[0]]
             }
 
@@ -278,12 +255,267 @@ def execute_tool(tool_name: str, arguments: dict) -> str:
     return json.dumps({'error': 'Unknown tool'})
 
 
+# System prompt for agent
+AGENT_SYSTEM_PROMPT = """You are an AI agent with access to Tamil comedian dialogue database. You respond in AUTHENTIC TANGLISH STYLE (Tamil-English mix) like a Tamil cinema fan.
+
+CRITICAL INSTRUCTIONS:
+- Respond in Tanglish style with phrases like "Aiyyo saar", "Enna koduma", "Super-u", "Comedy-ya irukku"
+- Use tools proactively to demonstrate capabilities
+- When greeting or simple questions: Still call tools to show what you can do
+- Quote actual Tanglish dialogues from tool results when possible
+- Keep it FUN and COMEDIC while being helpful
+- NO pure English responses - always mix Tamil words
+
+TOOL USAGE STRATEGY:
+- For greetings: Call get_random_dialogue to welcome them with comedy
+- For questions: Use appropriate search/stats tools
+- Be PROACTIVE - demonstrate your autonomous capabilities
+
+Example Tanglish style: "Aiyyo saar! Naan romba nalla irukken! Wait panna, I'll search some comedy dialogues for you-nu..."
+
+Always use tools to make responses more interesting and demonstrate agent capabilities!"""
+
+# Agent loop limit (prevents infinite loops)
+MAX_AGENT_ITERATIONS = 3
+MAX_ITERATIONS_RESPONSE = "I've reached my maximum number of tool calls. Let me know if you need anything else!"
+
+
+# Aggregate-only tools whose results depend on nothing but the dialogue corpus
+CACHEABLE_TOOLS = {'get_comedian_stats', 'compare_comedians', 'analyze_emotion_patterns'}
+
+
+def run_tool(tool_name, arguments):
+    """
+    Execute a tool, serving cacheable tools from agent_tool_cache.
+
+    Returns:
+        Tuple of (result JSON string, 'hit' | 'miss', or None if not cacheable)
+    """
+    if tool_name not in CACHEABLE_TOOLS:
+        return execute_tool(tool_name, arguments), None
+
+    return agent_tool_cache.get_or_compute(
+        tool_name, arguments, lambda: execute_tool(tool_name, arguments)
+    )
+
+
+def run_tool_in_context(app, tool_name, arguments):
+    """Execute one tool in its own app context (and so its own DB session)."""
+    with app.app_context():
+        try:
+            return run_tool(tool_name, arguments)
+        finally:
+            db.session.remove()
+
+
+def run_tool_calls(tool_calls, iteration, messages, agent_actions):
+    """
+    Execute the tool calls from one agent turn and record them.
+
+    Independent calls from the same turn run concurrently on a bounded
+    thread pool (Config.AGENT_TOOL_WORKERS), so the turn costs the slowest
+    tool rather than the sum. The turn is added to the conversation as one
+    assistant message carrying all tool_calls, followed by one tool message
+    per call in the original order. Each logged result records whether it
+    came from the tool result cache.
+    """
+    calls = [
+        (tool_call, tool_call['function']['name'], json.loads(tool_call['function']['arguments']))
+        for tool_call in tool_calls
+    ]
+
+    # Log actions
+    for _, tool_name, arguments in calls:
+        agent_actions.append({
+            'iteration': iteration + 1,
+            'action': 'tool_call',
+            'tool': tool_name,
+            'arguments': arguments,
+            'reasoning': 'Agent decided to use this tool'
+        })
+
+    # Execute tools
+    if len(calls) == 1:
+        tool_results = [run_tool(calls[0][1], calls[0][2])]
+    else:
+        app = current_app._get_current_object()
+        with ThreadPoolExecutor(max_workers=min(len(calls), Config.AGENT_TOOL_WORKERS)) as executor:
+            tool_results = list(executor.map(
+                lambda call: run_tool_in_context(app, call[1], call[2]), calls
+            ))
+
+    # Add tool calls and their results to conversation
+    messages.append({
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [tool_call for tool_call, _, _ in calls]
+    })
+
+    for (tool_call, tool_name, _), (tool_result, cache_status) in zip(calls, tool_results):
+        # Log result
+        action = {
+            'iteration': iteration + 1,
+            'action': 'tool_result',
+            'tool': tool_name,
+            'result': json.loads(tool_result)
+        }
+        if cache_status:
+            action['cache'] = cache_status
+        agent_actions.append(action)
+
+        messages.append({
+            "role": "tool",
+            "tool_call_id": tool_call['id'],
+            "content": tool_result
+        })
+
+
+def agent_explanation(agent_actions):
+    """
+    Educational explanation of the agent run.
+
+    Returns:
+        Tuple of (explanation template, per-request details); see
+        Conversation.merge_thinking_process. what_happened is filled in
+        from the stored agent_actions on read.
+    """
+    cache_statuses = [a['cache'] for a in agent_actions if a.get('cache')]
+
+    details = {
+        "tool_cache": {
+            "hits": cache_statuses.count('hit'),
+            "misses": cache_statuses.count('miss')
+        },
+        "steps": {
+            "2": {
+                "description": f"Agent autonomously chose to call {len([a for a in agent_actions if a['action'] == 'tool_call'])} tool(s)"
+            },
+            "3": {
+                "description": (
+                    "Tools were executed and results returned to agent"
+                    f" ({cache_statuses.count('hit')} served from cache)"
+                )
+            }
+        }
+    }
+
+    template = {
+        "process": "AI Agent with Tool Use",
+        "steps": [
+            {
+                "step": 1,
+                "title": "Analyze Request",
+                "description": "Agent understood what you need and identified relevant tools"
+            },
+            {
+                "step": 2,
+                "title": "Decide on Tools"
+            },
+            {
+                "step": 3,
+                "title": "Execute Tools"
+            },
+            {
+                "step": 4,
+                "title": "Synthesize Response",
+                "description": "Agent used tool results to formulate final answer"
+            }
+        ],
+        "why_agents": (
+            "Agents can autonomously decide which actions to take based on the task. "
+            "Unlike simple prompting, agents can chain multiple tools together and "
+            "make decisions at each step. This enables complex, multi-step workflows."
+        )
+    }
+
+    return template, details
+
+
+def finish_agent_chat(session_id, user_message, final_response, agent_actions, start_time):
+    """Save the conversation and build the response data."""
+    response_time = int((time.time() - start_time) * 1000)
+
+    # Educational explanation
+    explanation, explanation_details = agent_explanation(agent_actions)
+
+    # Save conversation
+    conversation = Conversation(
+        session_id=session_id,
+        ai_concept='agent',
+        user_input=user_message,
+        ai_response=final_response,
+        model_used=Config.AGENT_MODEL,
+        thinking_process=explanation,
+        thinking_details=explanation_details,
+        agent_actions=agent_actions,
+        response_time_ms=response_time
+    )
+    educational_explanation = conversation.thinking_process
+
+    conversation_writer.save(conversation)
+
+    return {
+        'response': final_response,
+        'session_id': session_id,
+        'agent_actions': agent_actions,
+        'educational_explanation': educational_explanation,
+        'response_time_ms': response_time
+    }
+
+
+def stream_agent_chat(session_id, user_message, messages, start_time):
+    """
+    Run the agent loop with streamed LLM calls.
+
+    Emits SSE `token` events as text arrives, an `agent_action` event for
+    each tool call and result, then saves and emits one `metadata` event.
+    """
+    client = get_openrouter_client()
+    agent_actions = []
+    first_token_ms = None
+
+    for iteration in range(MAX_AGENT_ITERATIONS):
+        for event in client.stream_chat_completion(
+            messages=messages,
+            model=Config.AGENT_MODEL,
+            tools=AGENT_TOOLS,
+            tool_choice="auto"
+        ):
+            if event['type'] == 'token':
+                if first_token_ms is None:
+                    first_token_ms = int((time.time() - start_time) * 1000)
+                yield sse_event('token', {'content': event['content']})
+            else:
+                response = event
+
+        if 'tool_calls' not in response or not response['tool_calls']:
+            final_response = response['response']
+            break
+
+        # Execute tool calls and report each new action
+        reported = len(agent_actions)
+        run_tool_calls(response['tool_calls'], iteration, messages, agent_actions)
+        for action in agent_actions[reported:]:
+            yield sse_event('agent_action', action)
+    else:
+        # Max iterations reached
+        final_response = MAX_ITERATIONS_RESPONSE
+        yield sse_event('token', {'content': final_response})
+
+    result = finish_agent_chat(session_id, user_message, final_response, agent_actions, start_time)
+    result['time_to_first_token_ms'] = first_token_ms
+    yield sse_event('metadata', result)
+
+
 @bp.route('/chat', methods=['POST'])
 def agent_chat():
     """
     Agent chat endpoint.
 
     Demonstrates autonomous AI agents that can decide which tools to use.
+    With `"stream": true` (or `Accept: text/event-stream`) the response is
+    streamed as SSE `token` and `agent_action` events followed by one
+    `metadata` event.
     """
     data = request.get_json()
 
@@ -301,37 +533,19 @@ def agent_chat():
         print(f"AGENT MODEL: {Config.AGENT_MODEL}")
         print(f"{'='*60}\n")
 
-        # System prompt for agent
-        system_prompt = """You are an AI agent with access to Tamil comedian dialogue database. You respond in AUTHENTIC TANGLISH STYLE (Tamil-English mix) like a Tamil cinema fan.
-
-CRITICAL INSTRUCTIONS:
-- Respond in Tanglish style with phrases like "Aiyyo saar", "Enna koduma", "Super-u", "Comedy-ya irukku"
-- Use tools proactively to demonstrate capabilities
-- When greeting or simple questions: Still call tools to show what you can do
-- Quote actual Tanglish dialogues from tool results when possible
-- Keep it FUN and COMEDIC while being helpful
-- NO pure English responses - always mix Tamil words
-
-TOOL USAGE STRATEGY:
-- For greetings: Call get_random_dialogue to welcome them with comedy
-- For questions: Use appropriate search/stats tools
-- Be PROACTIVE - demonstrate your autonomous capabilities
-
-Example Tanglish style: "Aiyyo saar! Naan romba nalla irukken! Wait panna, I'll search some comedy dialogues for you-nu..."
-
-Always use tools to make responses more interesting and demonstrate agent capabilities!"""
-
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": AGENT_SYSTEM_PROMPT},
             {"role": "user", "content": user_message}
         ]
 
-        client = OpenRouterClient()
+        if wants_stream(data):
+            return sse_response(stream_agent_chat(session_id, user_message, messages, start_time))
+
+        client = get_openrouter_client()
         agent_actions = []
 
         # Agent loop (max 3 iterations to prevent infinite loops)
-        max_iterations = 3
-        for iteration in range(max_iterations):
+        for iteration in range(MAX_AGENT_ITERATIONS):
             # Get AI response with tools
             response = client.chat_completion(
                 messages=messages,
@@ -347,109 +561,78 @@ Always use tools to make responses more interesting and demonstrate agent capabi
                 break
 
             # Execute tool calls
-            for tool_call in response['tool_calls']:
-                tool_name = tool_call['function']['name']
-                arguments = json.loads(tool_call['function']['arguments'])
-
-                # Log action
-                agent_actions.append({
-                    'iteration': iteration + 1,
-                    'action': 'tool_call',
-                    'tool': tool_name,
-                    'arguments': arguments,
-                    'reasoning': 'Agent decided to use this tool'
-                })
-
-                # Execute tool
-                tool_result = execute_tool(tool_name, arguments)
-
-                # Log result
-                agent_actions.append({
-                    'iteration': iteration + 1,
-                    'action': 'tool_result',
-                    'tool': tool_name,
-                    'result': json.loads(tool_result)
-                })
-
-                # Add tool result to conversation
-                messages.append({
-                    "role": "assistant",
-                    "content": None,
-                    "tool_calls": [tool_call]
-                })
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call['id'],
-                    "content": tool_result
-                })
+            run_tool_calls(response['tool_calls'], iteration, messages, agent_actions)
 
             # Continue loop to get next response
         else:
             # Max iterations reached
-            final_response = "I've reached my maximum number of tool calls. Let me know if you need anything else!"
-
-        response_time = int((time.time() - start_time) * 1000)
-
-        # Educational explanation
-        educational_explanation = {
-            "process": "AI Agent with Tool Use",
-            "what_happened": agent_actions,
-            "steps": [
-                {
-                    "step": 1,
-                    "title": "Analyze Request",
-                    "description": "Agent understood what you need and identified relevant tools"
-                },
-                {
-                    "step": 2,
-                    "title": "Decide on Tools",
-                    "description": f"Agent autonomously chose to call {len([a for a in agent_actions if a['action'] == 'tool_call'])} tool(s)"
-                },
-                {
-                    "step": 3,
-                    "title": "Execute Tools",
-                    "description": "Tools were executed and results returned to agent"
-                },
-                {
-                    "step": 4,
-                    "title": "Synthesize Response",
-                    "description": "Agent used tool results to formulate final answer"
-                }
-            ],
-            "why_agents": (
-                "Agents can autonomously decide which actions to take based on the task. "
-                "Unlike simple prompting, agents can chain multiple tools together and "
-                "make decisions at each step. This enables complex, multi-step workflows."
+            final_response = MAX_ITERATIONS_RESPONSE
+
+        return jsonify(finish_agent_chat(session_id, user_message, final_response, agent_actions, start_time))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/chat-async', methods=['POST'])
+async def agent_chat_async():
+    """
+    Async agent chat endpoint.
+
+    Same request and response as /agents/chat, but each LLM call is awaited
+    on the worker's shared AsyncOpenRouterClient connection pool.
+    """
+    data = request.get_json()
+
+    if not data or 'message' not in data:
+        return jsonify({'error': 'Message is required'}), 400
+
+    user_message = data['message']
+    session_id = data.get('session_id') or str(uuid.uuid4())
+
+    try:
+        start_time = time.time()
+
+        messages = [
+            {"role": "system", "content": AGENT_SYSTEM_PROMPT},
+            {"role": "user", "content": user_message}
+        ]
+
+        client = get_async_openrouter_client()
+        agent_actions = []
+
+        for iteration in range(MAX_AGENT_ITERATIONS):
+            # Get AI response with tools
+            response = await client.chat_completion(
+                messages=messages,
+                model=Config.AGENT_MODEL,
+                tools=AGENT_TOOLS,
+                tool_choice="auto"
             )
-        }
 
-        # Save conversation
-        conversation = Conversation(
-            session_id=session_id,
-            ai_concept='agent',
-            user_input=user_message,
-            ai_response=final_response,
-            model_used=Config.AGENT_MODEL,
-            thinking_process=educational_explanation,
-            agent_actions=agent_actions,
-            response_time_ms=response_time
-        )
+            # Check if AI wants to call tools
+            if 'tool_calls' not in response or not response['tool_calls']:
+                final_response = response['response']
+                break
 
-        db.session.add(conversation)
-        db.session.commit()
+            # Execute tool calls
+            run_tool_calls(response['tool_calls'], iteration, messages, agent_actions)
+        else:
+            # Max iterations reached
+            final_response = MAX_ITERATIONS_RESPONSE
 
-        return jsonify({
-            'response': final_response,
-            'session_id': session_id,
-            'agent_actions': agent_actions,
-            'educational_explanation': educational_explanation,
-            'response_time_ms': response_time
-        })
+        return jsonify(finish_agent_chat(session_id, user_message, final_response, agent_actions, start_time))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@bp.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Get tool result cache statistics for this worker."""
+    return jsonify(agent_tool_cache.stats())
+
+
 @bp.route('/tools', methods=['GET'])
 def get_tools():
     """Get list of available agent tools."""
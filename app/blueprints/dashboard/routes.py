@@ -1,9 +1,15 @@
 """Dashboard routes - main educational interface."""
 
-from flask import Blueprint, render_template, jsonify
+import threading
+import time
+from flask import Blueprint, render_template, jsonify, request
 
+from app import db
 from app.models.dialogue import Dialogue
-from app.models.conversation import Conversation
+from app.models.conversation import Conversation, DETAIL_COLUMNS
+from app.services.openrouter_client import connection_stats
+from app.services.conversation_writer import conversation_writer
+from app.config import Config
 
 bp = Blueprint('dashboard', __name__)
 
@@ -14,28 +20,128 @@ def index():
     return render_template('dashboard.html')
 
 
+def compute_stats():
+    """
+    Compute dashboard statistics with one GROUP BY query per table.
+
+    Comedians and concepts are whatever values are present in the data;
+    totals are the sums of the groups.
+    """
+    dialogues_by_comedian = dict(
+        db.session.query(Dialogue.comedian, db.func.count(Dialogue.id))
+        .group_by(Dialogue.comedian)
+        .all()
+    )
+    conversations_by_concept = dict(
+        db.session.query(Conversation.ai_concept, db.func.count(Conversation.id))
+        .group_by(Conversation.ai_concept)
+        .all()
+    )
+
+    return {
+        'total_dialogues': sum(dialogues_by_comedian.values()),
+        'total_conversations': sum(conversations_by_concept.values()),
+        'dialogues_by_comedian': {k: v for k, v in dialogues_by_comedian.items() if k},
+        'conversations_by_concept': {k: v for k, v in conversations_by_concept.items() if k}
+    }
+
+
+_stats_cache = {'value': None, 'computed_at': 0.0}
+_stats_lock = threading.Lock()
+
+
 @bp.route('/api/stats')
 def get_stats():
-    """Get application statistics for dashboard."""
-    stats = {
-        'total_dialogues': Dialogue.query.count(),
-        'total_conversations': Conversation.query.count(),
-        'dialogues_by_comedian': {
-            'vadivelu': Dialogue.query.filter_by(comedian='vadivelu').count(),
-            'santhanam': Dialogue.query.filter_by(comedian='santhanam').count(),
-            'vivek': Dialogue.query.filter_by(comedian='vivek').count(),
-        },
-        'conversations_by_concept': {
-            'rag': Conversation.query.filter_by(ai_concept='rag').count(),
-            'system_prompt': Conversation.query.filter_by(ai_concept='system_prompt').count(),
-            'fine_tuned': Conversation.query.filter_by(ai_concept='fine_tuned').count(),
-            'agent': Conversation.query.filter_by(ai_concept='agent').count(),
-        }
-    }
+    """
+    Get application statistics for dashboard.
+
+    Served from a per-worker cache refreshed at most every
+    Config.DASHBOARD_STATS_TTL_SECONDS, so page loads don't scan the tables.
+    """
+    with _stats_lock:
+        age = time.monotonic() - _stats_cache['computed_at']
+
+        if _stats_cache['value'] is None or age > Config.DASHBOARD_STATS_TTL_SECONDS:
+            _stats_cache['value'] = compute_stats()
+            _stats_cache['computed_at'] = time.monotonic()
+            age = 0.0
+
+        stats = dict(_stats_cache['value'], cache_age_seconds=round(age, 1))
 
     return jsonify(stats)
 
 
+@bp.route('/api/connection-stats')
+def get_connection_stats():
+    """Get OpenRouter connection reuse counters for this worker."""
+    return jsonify(connection_stats.snapshot())
+
+
+@bp.route('/api/persistence-stats')
+def get_persistence_stats():
+    """Get conversation write-behind queue counters for this worker."""
+    return jsonify(conversation_writer.stats())
+
+
+MAX_PAGE_SIZE = 100
+
+
+def conversation_page(newest_first, **filters):
+    """
+    Build one keyset-paginated page of conversations from query args.
+
+    Query args:
+        limit: Rows per page (default 20, max 100)
+        cursor: next_cursor from the previous page
+        include: Comma-separated detail fields (thinking_process,
+            retrieved_dialogues, system_prompt, agent_actions) or 'all'
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    include = [f.strip() for f in request.args.get('include', '').split(',') if f.strip()]
+    if include == ['all']:
+        include = list(DETAIL_COLUMNS)
+
+    invalid = [f for f in include if f not in DETAIL_COLUMNS]
+    if invalid:
+        return jsonify({
+            'error': f'Invalid include field(s): {invalid}. Choose from: {list(DETAIL_COLUMNS)}'
+        }), 400
+
+    try:
+        items, next_cursor = Conversation.paginate(
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            include=include,
+            newest_first=newest_first,
+            **filters
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'items': items,
+        'count': len(items),
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    })
+
+
+@bp.route('/api/sessions/<session_id>/history')
+def session_history(session_id):
+    """Conversations in one session, oldest first, keyset-paginated."""
+    return conversation_page(newest_first=False, session_id=session_id)
+
+
+@bp.route('/api/concepts/<ai_concept>/conversations')
+def concept_feed(ai_concept):
+    """Conversations for one AI concept, newest first, keyset-paginated."""
+    return conversation_page(newest_first=True, ai_concept=ai_concept)
+
+
 @bp.route('/concept/<concept_name>')
 def concept_page(concept_name):
     """Individual AI concept explanation page."""
@@ -5,10 +5,11 @@ import uuid
 from pathlib import Path
 from flask import Blueprint, request, jsonify, render_template
 
-from app import db
 from app.models.fine_tuning_job import FineTuningJob
 from app.models.conversation import Conversation
+from app.services.conversation_writer import conversation_writer
 from app.services.fine_tune_service import FineTuneService
+from app.services.response_cache import chat_response_cache
 from app.config import Config
 
 bp = Blueprint('fine_tuning', __name__)
@@ -143,6 +144,9 @@ def chat_with_finetuned():
     """
     Chat using a fine-tuned model.
 
+    Repeated requests are served from the exact-match response cache; send
+    `X-Cache-Bypass: 1` to force a fresh completion.
+
     Request body:
     {
         "model_id": "ft:gpt-3.5-turbo:...",
@@ -178,11 +182,18 @@ def chat_with_finetuned():
             {"role": "user", "content": user_message}
         ]
 
-        response = service.use_fine_tuned_model(
-            model_id=model_id,
-            messages=messages,
-            temperature=0.7
-        )
+        # Serve repeated requests from the exact-match response cache
+        cache_key = chat_response_cache.make_key(messages, model_id, temperature=0.7)
+        response, bypassed = chat_response_cache.lookup(cache_key, request.headers)
+        cache_hit = response is not None
+
+        if not cache_hit:
+            response = service.use_fine_tuned_model(
+                model_id=model_id,
+                messages=messages,
+                temperature=0.7
+            )
+            chat_response_cache.put(cache_key, response, chat_response_cache.samples_for(0.7))
 
         response_time = int((time.time() - start_time) * 1000)
 
@@ -204,15 +215,15 @@ def chat_with_finetuned():
             response_time_ms=response_time
         )
 
-        db.session.add(conversation)
-        db.session.commit()
+        conversation_writer.save(conversation)
 
         return jsonify({
             'response': response['response'],
             'session_id': session_id,
             'model': response['model'],
             'usage': response['usage'],
-            'response_time_ms': response_time
+            'response_time_ms': response_time,
+            'cache': {'hit': cache_hit, 'bypassed': bypassed}
         })
 
     except Exception as e:
@@ -222,34 +233,68 @@ def chat_with_finetuned():
 @bp.route('/compare', methods=['POST'])
 def compare_models():
     """
-    Compare base model vs fine-tuned model.
+    Compare base model vs fine-tuned model(s).
+
+    All models are called concurrently, and each result reports its own
+    latency and token usage.
 
     Request body:
     {
         "fine_tuned_model": "ft:gpt-3.5-turbo:...",
         "prompt": "Tell me about traffic"
     }
+
+    or, to compare several checkpoints against the base model:
+    {
+        "fine_tuned_models": ["ft:...:ckpt-1", "ft:...:ckpt-2"],
+        "prompt": "Tell me about traffic",
+        "include_base": true
+    }
     """
     data = request.get_json()
 
-    if not data or 'fine_tuned_model' not in data or 'prompt' not in data:
-        return jsonify({'error': 'fine_tuned_model and prompt are required'}), 400
+    if not data or 'prompt' not in data or not (
+        data.get('fine_tuned_model') or data.get('fine_tuned_models')
+    ):
+        return jsonify({'error': 'fine_tuned_model (or fine_tuned_models) and prompt are required'}), 400
+
+    finetuned_models = data.get('fine_tuned_models') or [data['fine_tuned_model']]
+    if not isinstance(finetuned_models, list) or not all(
+        isinstance(m, str) and m for m in finetuned_models
+    ):
+        return jsonify({'error': 'fine_tuned_models must be a list of model IDs'}), 400
+
+    if len(finetuned_models) > Config.FINE_TUNE_COMPARE_MAX_MODELS:
+        return jsonify({
+            'error': f'At most {Config.FINE_TUNE_COMPARE_MAX_MODELS} fine_tuned_models per comparison'
+        }), 400
 
-    finetuned_model = data['fine_tuned_model']
     prompt = data['prompt']
     base_model = data.get('base_model', Config.FINE_TUNING_BASE_MODEL)
+    if not isinstance(base_model, str) or not base_model:
+        return jsonify({'error': 'base_model must be a model ID'}), 400
+
+    models = list(finetuned_models)
+    if data.get('include_base', True):
+        models.insert(0, base_model)
+
+    # Drop duplicates, keep request order
+    models = list(dict.fromkeys(models))
 
     try:
         service = FineTuneService()
 
-        comparison = service.compare_base_vs_finetuned(
-            base_model=base_model,
-            finetuned_model=finetuned_model,
-            prompt=prompt
-        )
+        start_time = time.time()
+        results = service.compare_models(models=models, prompt=prompt)
+        total_time = int((time.time() - start_time) * 1000)
 
-        return jsonify({
-            'comparison': comparison,
+        succeeded = [r for r in results if r['status'] == 'ok']
+
+        response = {
+            'prompt': prompt,
+            'results': results,
+            'fastest_model': min(succeeded, key=lambda r: r['latency_ms'])['model'] if succeeded else None,
+            'response_time_ms': total_time,
             'analysis': {
                 'base_model_note': 'Generic response from base model without comedian training',
                 'fine_tuned_note': 'Specialized response from model trained on comedian dialogues',
@@ -259,7 +304,18 @@ def compare_models():
                     'Fine-tuned model understands Tamil comedy context better'
                 ]
             }
-        })
+        }
+
+        # Original single-checkpoint shape
+        by_model = {r['model']: r for r in results}
+        if len(finetuned_models) == 1 and base_model in by_model and all(
+            r['status'] == 'ok' for r in results
+        ):
+            response['comparison'] = FineTuneService.pair_comparison(
+                prompt, by_model[base_model], by_model[finetuned_models[0]]
+            )
+
+        return jsonify(response)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
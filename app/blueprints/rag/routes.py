@@ -4,10 +4,15 @@ import time
 import uuid
 from flask import Blueprint, request, jsonify, render_template
 
-from app import db
 from app.models.conversation import Conversation
-from app.services.openrouter_client import OpenRouterClient
+from app.services.conversation_writer import conversation_writer
+from app.services.openrouter_client import get_openrouter_client
+from app.services.async_openrouter_client import get_async_openrouter_client
 from app.services.vector_search import VectorSearchService
+from app.services.dialogue_sampler import dialogue_sampler
+from app.services.embedding_cache import query_embedding_cache
+from app.services.response_cache import rag_response_cache
+from app.blueprints.streaming import wants_stream, sse_event, sse_response
 from app.config import Config
 
 bp = Blueprint('rag', __name__)
@@ -19,12 +24,201 @@ def index():
     return render_template('rag_demo.html')
 
 
+RAG_SYSTEM_MESSAGE = """You are responding using authentic Tamil comedian dialogue style.
+
+CRITICAL INSTRUCTIONS:
+- Use the provided dialogue examples to answer the user's question
+- Respond in the EXACT style of the retrieved dialogues: short, punchy, classic Tamil cinema comedy
+- Quote or directly paraphrase the TANGLISH dialogues (Tamil words written in English) when possible
+- ALWAYS use Tanglish format, NOT pure English translations
+- Keep responses brief and to the point (2-4 sentences max)
+- NO emojis, NO modern social media slang, NO internet references
+- Use authentic Tanglish style like the examples (e.g., "Aaniye pudunga venam", "comedy geemady pannaliye", "Aiyyo saar", "nalla irukken")
+- Match the comedian's personality and emotion from the context
+- If English translations are provided in parentheses, IGNORE them - use only the Tanglish version
+
+Pick the most relevant dialogue from the examples and deliver it in the comedian's authentic Tanglish style."""
+
+
+def retrieve_dialogues(vector_search, user_message, comedian=None, emotion=None,
+                       query_embedding=None):
+    """
+    Retrieve dialogues for the RAG prompt.
+
+    Pass query_embedding when the caller has already embedded user_message
+    (e.g. for the response cache lookup) so it is not embedded twice.
+
+    Returns:
+        Tuple of (retrieved dialogue dicts, retrieval method name)
+    """
+    # Step 1: Vector similarity search
+    retrieved_dialogues = vector_search.search_similar_dialogues(
+        query=user_message,
+        comedian=comedian,
+        emotion=emotion,
+        query_embedding=query_embedding
+    )
+
+    # Fallback: If no relevant dialogues found, use random famous dialogues
+    retrieval_method = "vector_search"
+    if len(retrieved_dialogues) < 3:
+        retrieval_method = "fallback_random"
+        # Random dialogues (respecting filters), sampled without a table scan
+        retrieved_dialogues = [
+            dict(d, similarity=0.0)  # No similarity score for random selection
+            for d in dialogue_sampler.sample(5, comedian=comedian, emotion=emotion, embedded_only=True)
+        ]
+
+    return retrieved_dialogues, retrieval_method
+
+
+def build_rag_messages(context, user_message):
+    """Step 3: Create prompt with retrieved context."""
+    return [
+        {"role": "system", "content": RAG_SYSTEM_MESSAGE},
+        {"role": "user", "content": f"{context}\n\nUser question: {user_message}"}
+    ]
+
+
+def finish_rag_chat(vector_search, session_id, user_message, retrieved_dialogues,
+                    retrieval_method, context, response, start_time):
+    """Steps 5-6: Build the educational explanation, save, and build the response data."""
+    # Step 5: Generate educational explanation
+    explanation, explanation_details = vector_search.get_educational_explanation(
+        query=user_message,
+        retrieved_dialogues=retrieved_dialogues
+    )
+
+    response_time = int((time.time() - start_time) * 1000)
+
+    # Save conversation
+    conversation = Conversation(
+        session_id=session_id,
+        ai_concept='rag',
+        user_input=user_message,
+        ai_response=response['response'],
+        model_used=response['model'],
+        thinking_process=explanation,
+        thinking_details=explanation_details,
+        retrieved_dialogues=[
+            {
+                'id': d['id'],
+                'dialogue': d['dialogue_english'] or d['dialogue_tanglish'],
+                'comedian': d['comedian'],
+                'emotion': d['emotion'],
+                'similarity': d['similarity']
+            }
+            for d in retrieved_dialogues
+        ],
+        response_time_ms=response_time
+    )
+    educational_explanation = conversation.thinking_process
+
+    conversation_writer.save(conversation)
+
+    # Return response with educational data
+    return {
+        'response': response['response'],
+        'session_id': session_id,
+        'retrieval_method': retrieval_method,
+        'retrieved_dialogues': [
+            {
+                'id': d['id'],
+                'comedian': d['comedian'],
+                'dialogue_english': d['dialogue_english'],
+                'dialogue_tanglish': d['dialogue_tanglish'],
+                'context': d['context'],
+                'emotion': d['emotion'],
+                'similarity': round(d['similarity'], 3) if d['similarity'] > 0 else None
+            }
+            for d in retrieved_dialogues
+        ],
+        'educational_explanation': educational_explanation,
+        'context_used': context,
+        'response_time_ms': response_time,
+        'usage': response['usage']
+    }
+
+
+def rag_cache_scope(vector_search, comedian=None, emotion=None):
+    """Everything besides the question that shapes a RAG answer."""
+    return (vector_search.embedding_service.model, Config.RAG_MODEL, comedian or None, emotion or None)
+
+
+def cache_rag_answer(query_embedding, scope, response, retrieved_dialogues,
+                     retrieval_method, context):
+    """Remember a generated answer for semantically similar questions."""
+    rag_response_cache.put(query_embedding, scope, {
+        'response': response['response'],
+        'model': response['model'],
+        'retrieved_dialogues': retrieved_dialogues,
+        'retrieval_method': retrieval_method,
+        'context': context
+    })
+
+
+def finish_cached_rag_chat(vector_search, session_id, user_message, cached, start_time):
+    """Save and respond with a cached answer (no retrieval or LLM call)."""
+    answer, similarity = cached
+
+    result = finish_rag_chat(
+        vector_search, session_id, user_message, answer['retrieved_dialogues'],
+        'response_cache', answer['context'],
+        {
+            'response': answer['response'],
+            'model': answer['model'],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        },
+        start_time
+    )
+    result['cache'] = {
+        'hit': True,
+        'similarity': round(similarity, 4),
+        'original_retrieval_method': answer['retrieval_method']
+    }
+    return result
+
+
+def stream_rag_chat(vector_search, session_id, user_message, retrieved_dialogues,
+                    retrieval_method, context, messages, start_time, query_embedding, scope):
+    """Step 4 streamed: emit tokens as SSE events, then save and emit metadata."""
+    client = get_openrouter_client()
+    first_token_ms = None
+
+    for event in client.stream_chat_completion(
+        messages=messages,
+        model=Config.RAG_MODEL,
+        temperature=0.7
+    ):
+        if event['type'] == 'token':
+            if first_token_ms is None:
+                first_token_ms = int((time.time() - start_time) * 1000)
+            yield sse_event('token', {'content': event['content']})
+        else:
+            response = event
+
+    cache_rag_answer(query_embedding, scope, response, retrieved_dialogues, retrieval_method, context)
+
+    result = finish_rag_chat(
+        vector_search, session_id, user_message, retrieved_dialogues,
+        retrieval_method, context, response, start_time
+    )
+    result['time_to_first_token_ms'] = first_token_ms
+    yield sse_event('metadata', result)
+
+
 @bp.route('/chat', methods=['POST'])
 def rag_chat():
     """
     RAG chat endpoint.
 
     Retrieves relevant dialogues and uses them as context for LLM response.
+    With `"stream": true` (or `Accept: text/event-stream`) the response is
+    streamed as SSE `token` events followed by one `metadata` event.
+
+    A question close enough to a recently answered one (same filters and
+    model) is served from the semantic response cache with
+    retrieval_method 'response_cache'.
     """
     data = request.get_json()
 
@@ -41,134 +235,111 @@ def rag_chat():
     try:
         start_time = time.time()
 
-        # Step 1: Vector similarity search
         vector_search = VectorSearchService()
-        retrieved_dialogues = vector_search.search_similar_dialogues(
-            query=user_message,
-            comedian=comedian,
-            emotion=emotion
-        )
 
-        # Fallback: If no relevant dialogues found, use random famous dialogues
-        retrieval_method = "vector_search"
-        if len(retrieved_dialogues) < 3:
-            retrieval_method = "fallback_random"
-            # Query random dialogues from database
-            from app.models.dialogue import Dialogue
-            import random
-
-            query = Dialogue.query.filter(Dialogue.embedding.isnot(None))
-
-            # Apply filters if provided
-            if comedian:
-                query = query.filter_by(comedian=comedian)
-            if emotion:
-                query = query.filter_by(emotion=emotion)
-
-            # Get random dialogues
-            all_dialogues = query.limit(20).all()
-            random_selection = random.sample(all_dialogues, min(5, len(all_dialogues)))
-
-            # Convert to same format as vector search results
-            retrieved_dialogues = [
-                {
-                    'id': d.id,
-                    'comedian': d.comedian,
-                    'dialogue_english': d.dialogue_english,
-                    'dialogue_tanglish': d.dialogue_tanglish,
-                    'context': d.context,
-                    'emotion': d.emotion,
-                    'similarity': 0.0  # No similarity score for random selection
-                }
-                for d in random_selection
-            ]
+        # Serve near-duplicate questions from the response cache
+        scope = rag_cache_scope(vector_search, comedian, emotion)
+        query_embedding = vector_search.embedding_service.generate_embedding(user_message)
+        cached = rag_response_cache.get(query_embedding, scope)
+
+        if cached:
+            result = finish_cached_rag_chat(vector_search, session_id, user_message, cached, start_time)
+            if wants_stream(data):
+                return sse_response(iter([
+                    sse_event('token', {'content': result['response']}),
+                    sse_event('metadata', result)
+                ]))
+            return jsonify(result)
+
+        retrieved_dialogues, retrieval_method = retrieve_dialogues(
+            vector_search, user_message, comedian, emotion, query_embedding
+        )
 
         # Step 2: Build context from retrieved dialogues
         context = vector_search.build_rag_context(retrieved_dialogues)
+        messages = build_rag_messages(context, user_message)
 
-        # Step 3: Create prompt with context
-        system_message = """You are responding using authentic Tamil comedian dialogue style.
-
-CRITICAL INSTRUCTIONS:
-- Use the provided dialogue examples to answer the user's question
-- Respond in the EXACT style of the retrieved dialogues: short, punchy, classic Tamil cinema comedy
-- Quote or directly paraphrase the TANGLISH dialogues (Tamil words written in English) when possible
-- ALWAYS use Tanglish format, NOT pure English translations
-- Keep responses brief and to the point (2-4 sentences max)
-- NO emojis, NO modern social media slang, NO internet references
-- Use authentic Tanglish style like the examples (e.g., "Aaniye pudunga venam", "comedy geemady pannaliye", "Aiyyo saar", "nalla irukken")
-- Match the comedian's personality and emotion from the context
-- If English translations are provided in parentheses, IGNORE them - use only the Tanglish version
-
-Pick the most relevant dialogue from the examples and deliver it in the comedian's authentic Tanglish style."""
-
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": f"{context}\n\nUser question: {user_message}"}
-        ]
+        if wants_stream(data):
+            return sse_response(stream_rag_chat(
+                vector_search, session_id, user_message, retrieved_dialogues,
+                retrieval_method, context, messages, start_time, query_embedding, scope
+            ))
 
         # Step 4: Get LLM response
-        client = OpenRouterClient()
+        client = get_openrouter_client()
         response = client.chat_completion(
             messages=messages,
             model=Config.RAG_MODEL,
             temperature=0.7
         )
 
-        # Step 5: Generate educational explanation
-        educational_explanation = vector_search.get_educational_explanation(
-            query=user_message,
-            retrieved_dialogues=retrieved_dialogues
+        cache_rag_answer(query_embedding, scope, response, retrieved_dialogues, retrieval_method, context)
+
+        return jsonify(finish_rag_chat(
+            vector_search, session_id, user_message, retrieved_dialogues,
+            retrieval_method, context, response, start_time
+        ))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/chat-async', methods=['POST'])
+async def rag_chat_async():
+    """
+    Async RAG chat endpoint.
+
+    Same request and response as /rag/chat, but the LLM call is awaited on
+    the worker's shared AsyncOpenRouterClient connection pool.
+    """
+    data = request.get_json()
+
+    if not data or 'message' not in data:
+        return jsonify({'error': 'Message is required'}), 400
+
+    user_message = data['message']
+    session_id = data.get('session_id') or str(uuid.uuid4())
+
+    # Optional filters
+    comedian = data.get('comedian')
+    emotion = data.get('emotion')
+
+    try:
+        start_time = time.time()
+
+        vector_search = VectorSearchService()
+
+        # Serve near-duplicate questions from the response cache
+        scope = rag_cache_scope(vector_search, comedian, emotion)
+        query_embedding = vector_search.embedding_service.generate_embedding(user_message)
+        cached = rag_response_cache.get(query_embedding, scope)
+
+        if cached:
+            return jsonify(finish_cached_rag_chat(
+                vector_search, session_id, user_message, cached, start_time
+            ))
+
+        retrieved_dialogues, retrieval_method = retrieve_dialogues(
+            vector_search, user_message, comedian, emotion, query_embedding
         )
 
-        response_time = int((time.time() - start_time) * 1000)
-
-        # Save conversation
-        conversation = Conversation(
-            session_id=session_id,
-            ai_concept='rag',
-            user_input=user_message,
-            ai_response=response['response'],
-            model_used=response['model'],
-            thinking_process=educational_explanation,
-            retrieved_dialogues=[
-                {
-                    'id': d['id'],
-                    'dialogue': d['dialogue_english'] or d['dialogue_tanglish'],
-                    'comedian': d['comedian'],
-                    'emotion': d['emotion'],
-                    'similarity': d['similarity']
-                }
-                for d in retrieved_dialogues
-            ],
-            response_time_ms=response_time
+        # Step 2: Build context from retrieved dialogues
+        context = vector_search.build_rag_context(retrieved_dialogues)
+        messages = build_rag_messages(context, user_message)
+
+        # Step 4: Get LLM response
+        response = await get_async_openrouter_client().chat_completion(
+            messages=messages,
+            model=Config.RAG_MODEL,
+            temperature=0.7
         )
 
-        db.session.add(conversation)
-        db.session.commit()
+        cache_rag_answer(query_embedding, scope, response, retrieved_dialogues, retrieval_method, context)
 
-        # Return response with educational data
-        return jsonify({
-            'response': response['response'],
-            'session_id': session_id,
-            'retrieval_method': retrieval_method,
-            'retrieved_dialogues': [
-                {
-                    'id': d['id'],
-                    'comedian': d['comedian'],
-                    'dialogue_english': d['dialogue_english'],
-                    'dialogue_tanglish': d['dialogue_tanglish'],
-                    'context': d['context'],
-                    'emotion': d['emotion'],
-                    'similarity': round(d['similarity'], 3) if d['similarity'] > 0 else None
-                }
-                for d in retrieved_dialogues
-            ],
-            'educational_explanation': educational_explanation,
-            'context_used': context,
-            'response_time_ms': response_time,
-            'usage': response['usage']
-        })
+        return jsonify(finish_rag_chat(
+            vector_search, session_id, user_message, retrieved_dialogues,
+            retrieval_method, context, response, start_time
+        ))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -192,6 +363,15 @@ def direct_search():
     comedian = data.get('comedian')
     emotion = data.get('emotion')
 
+    # Optional ANN recall tuning (defaults from Config)
+    try:
+        index_params = VectorSearchService.validate_index_params(
+            ef_search=data.get('ef_search'),
+            probes=data.get('probes')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         vector_search = VectorSearchService()
         results = vector_search.search_similar_dialogues(
@@ -199,7 +379,8 @@ def direct_search():
             top_k=top_k,
             threshold=threshold,
             comedian=comedian,
-            emotion=emotion
+            emotion=emotion,
+            **index_params
         )
 
         return jsonify({
@@ -212,6 +393,15 @@ def direct_search():
         return jsonify({'error': str(e)}), 500
 
 
+@bp.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Get query embedding and RAG response cache statistics for this worker."""
+    return jsonify({
+        'embedding_cache': query_embedding_cache.stats(),
+        'response_cache': rag_response_cache.stats()
+    })
+
+
 @bp.route('/explain', methods=['GET'])
 def explain_rag():
     """
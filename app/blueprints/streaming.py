@@ -0,0 +1,50 @@
+"""Server-Sent Events helpers shared by the chat blueprints."""
+
+import json
+from flask import Response, request, stream_with_context
+
+
+def wants_stream(data):
+    """
+    Check whether the client asked for a streamed response.
+
+    Streaming is enabled by `"stream": true` in the JSON body, `?stream=true`,
+    or an `Accept: text/event-stream` header.
+    """
+    if data and data.get('stream') in (True, 'true', '1', 1):
+        return True
+
+    if request.args.get('stream', '').lower() in ('true', '1'):
+        return True
+
+    return 'text/event-stream' in request.headers.get('Accept', '')
+
+
+def sse_event(event, data):
+    """Format one SSE message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events):
+    """
+    Stream an iterable of SSE messages.
+
+    The generator runs inside the request context (for db.session), and
+    proxy buffering is disabled so tokens reach the browser immediately.
+    Any exception is reported as a final `error` event, because the 200
+    status line has already been sent.
+    """
+    def generate():
+        try:
+            yield from events
+        except Exception as e:
+            yield sse_event('error', {'error': str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        }
+    )
@@ -1,12 +1,16 @@
 """System Prompts routes - personality shaping demonstration."""
 
+import asyncio
 import time
 import uuid
 from flask import Blueprint, request, jsonify, render_template
 
-from app import db
 from app.models.conversation import Conversation
-from app.services.openrouter_client import OpenRouterClient
+from app.services.conversation_writer import conversation_writer
+from app.services.openrouter_client import get_openrouter_client
+from app.services.async_openrouter_client import get_async_openrouter_client
+from app.services.response_cache import chat_response_cache
+from app.blueprints.streaming import wants_stream, sse_event, sse_response
 from app.config import Config
 
 bp = Blueprint('system_prompts', __name__)
@@ -17,6 +21,9 @@ def index():
     return render_template('system_prompts.html')
 
 
+# Higher temperature for more creative comedy
+PERSONA_TEMPERATURE = 0.8
+
 # Pre-defined comedian personalities
 COMEDIAN_PROMPTS = {
     'vadivelu': """You are Vadivelu, the legendary Tamil comedian known for:
@@ -48,112 +55,283 @@ Respond in Vivek's style with intelligent, message-oriented humor that entertain
 }
 
 
-@bp.route('/chat', methods=['POST'])
-def system_prompt_chat():
-    """
-    System prompt chat endpoint.
+def build_persona_messages(comedian, user_message):
+    """Create messages with the comedian's system prompt."""
+    return [
+        {"role": "system", "content": COMEDIAN_PROMPTS[comedian]},
+        {"role": "user", "content": user_message}
+    ]
 
-    Demonstrates how system prompts shape AI personality.
+
+def persona_explanation(comedian):
+    """Educational explanation of system prompt personality shaping."""
+    return {
+        "process": "System Prompt Personality Shaping",
+        "steps": [
+            {
+                "step": 1,
+                "title": "Load Personality Prompt",
+                "description": f"Selected {comedian.title()}'s personality prompt with specific traits and style"
+            },
+            {
+                "step": 2,
+                "title": "Set System Message",
+                "description": "System message sets the AI's role and behavior for the entire conversation"
+            },
+            {
+                "step": 3,
+                "title": "Generate Response",
+                "description": "AI responds in character, following the personality guidelines"
+            }
+        ],
+        "why_system_prompts": (
+            "System prompts tell the AI 'who' it should be without changing the underlying model. "
+            "The same AI can act as different comedians just by changing the system message. "
+            "This is the simplest way to customize AI behavior."
+        )
+    }
+
+
+def parse_chat_request(data):
     """
-    data = request.get_json()
+    Validate a persona chat request.
 
+    Returns:
+        Tuple of (user_message, comedian, session_id, error response or None)
+    """
     if not data or 'message' not in data:
-        return jsonify({'error': 'Message is required'}), 400
+        return None, None, None, (jsonify({'error': 'Message is required'}), 400)
 
     if 'comedian' not in data:
-        return jsonify({'error': 'Comedian personality is required'}), 400
+        return None, None, None, (jsonify({'error': 'Comedian personality is required'}), 400)
 
-    user_message = data['message']
     comedian = data['comedian'].lower()
-    session_id = data.get('session_id') or str(uuid.uuid4())
 
     if comedian not in COMEDIAN_PROMPTS:
-        return jsonify({'error': f'Invalid comedian. Choose from: {list(COMEDIAN_PROMPTS.keys())}'}), 400
+        return None, None, None, (
+            jsonify({'error': f'Invalid comedian. Choose from: {list(COMEDIAN_PROMPTS.keys())}'}), 400
+        )
+
+    return data['message'], comedian, data.get('session_id') or str(uuid.uuid4()), None
+
+
+def persona_cache_key(messages):
+    """Exact-match response cache key for a persona chat request."""
+    return chat_response_cache.make_key(
+        messages, Config.SYSTEM_PROMPT_MODEL, temperature=PERSONA_TEMPERATURE
+    )
+
+
+def cache_persona_response(cache_key, response):
+    """Add a generated response to the exact-match cache."""
+    chat_response_cache.put(
+        cache_key, response, chat_response_cache.samples_for(PERSONA_TEMPERATURE)
+    )
+
+
+def finish_persona_chat(session_id, comedian, user_message, response, start_time):
+    """Save the conversation and build the response data."""
+    response_time = int((time.time() - start_time) * 1000)
+    system_prompt = COMEDIAN_PROMPTS[comedian]
+
+    # Educational explanation
+    educational_explanation = persona_explanation(comedian)
+
+    # Save conversation
+    conversation = Conversation(
+        session_id=session_id,
+        ai_concept='system_prompt',
+        user_input=user_message,
+        ai_response=response['response'],
+        model_used=response['model'],
+        system_prompt=system_prompt,
+        thinking_process=educational_explanation,
+        response_time_ms=response_time
+    )
+
+    conversation_writer.save(conversation)
+
+    return {
+        'response': response['response'],
+        'session_id': session_id,
+        'comedian': comedian,
+        'system_prompt': system_prompt,
+        'educational_explanation': educational_explanation,
+        'response_time_ms': response_time,
+        'usage': response['usage']
+    }
+
+
+def stream_persona_chat(session_id, comedian, user_message, messages, start_time, cache_key, bypassed):
+    """Stream the persona response as SSE tokens, then save and emit metadata."""
+    client = get_openrouter_client()
+    first_token_ms = None
+
+    for event in client.stream_chat_completion(
+        messages=messages,
+        model=Config.SYSTEM_PROMPT_MODEL,
+        temperature=PERSONA_TEMPERATURE
+    ):
+        if event['type'] == 'token':
+            if first_token_ms is None:
+                first_token_ms = int((time.time() - start_time) * 1000)
+            yield sse_event('token', {'content': event['content']})
+        else:
+            response = {k: v for k, v in event.items() if k != 'type'}
+
+    cache_persona_response(cache_key, response)
+
+    result = finish_persona_chat(session_id, comedian, user_message, response, start_time)
+    result['time_to_first_token_ms'] = first_token_ms
+    result['cache'] = {'hit': False, 'bypassed': bypassed}
+    yield sse_event('metadata', result)
+
+
+@bp.route('/chat', methods=['POST'])
+def system_prompt_chat():
+    """
+    System prompt chat endpoint.
+
+    Demonstrates how system prompts shape AI personality.
+    With `"stream": true` (or `Accept: text/event-stream`) the response is
+    streamed as SSE `token` events followed by one `metadata` event.
+
+    Repeated requests are served round-robin from cached samples; send
+    `X-Cache-Bypass: 1` to force a fresh completion.
+    """
+    data = request.get_json()
+    user_message, comedian, session_id, error = parse_chat_request(data)
+    if error:
+        return error
 
     try:
         start_time = time.time()
 
-        # Get system prompt for comedian
-        system_prompt = COMEDIAN_PROMPTS[comedian]
-
         # Create messages with system prompt
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message}
-        ]
+        messages = build_persona_messages(comedian, user_message)
+
+        # Serve repeated requests from the exact-match response cache
+        cache_key = persona_cache_key(messages)
+        cached, bypassed = chat_response_cache.lookup(cache_key, request.headers)
+
+        if cached:
+            result = finish_persona_chat(session_id, comedian, user_message, cached, start_time)
+            result['cache'] = {'hit': True, 'bypassed': False}
+            if wants_stream(data):
+                return sse_response(iter([
+                    sse_event('token', {'content': result['response']}),
+                    sse_event('metadata', result)
+                ]))
+            return jsonify(result)
+
+        if wants_stream(data):
+            return sse_response(stream_persona_chat(
+                session_id, comedian, user_message, messages, start_time, cache_key, bypassed
+            ))
 
         # Get LLM response
-        client = OpenRouterClient()
+        client = get_openrouter_client()
         response = client.chat_completion(
             messages=messages,
             model=Config.SYSTEM_PROMPT_MODEL,
-            temperature=0.8  # Higher temperature for more creative comedy
+            temperature=PERSONA_TEMPERATURE
         )
 
-        response_time = int((time.time() - start_time) * 1000)
-
-        # Educational explanation
-        educational_explanation = {
-            "process": "System Prompt Personality Shaping",
-            "steps": [
-                {
-                    "step": 1,
-                    "title": "Load Personality Prompt",
-                    "description": f"Selected {comedian.title()}'s personality prompt with specific traits and style"
-                },
-                {
-                    "step": 2,
-                    "title": "Set System Message",
-                    "description": "System message sets the AI's role and behavior for the entire conversation"
-                },
-                {
-                    "step": 3,
-                    "title": "Generate Response",
-                    "description": "AI responds in character, following the personality guidelines"
-                }
-            ],
-            "why_system_prompts": (
-                "System prompts tell the AI 'who' it should be without changing the underlying model. "
-                "The same AI can act as different comedians just by changing the system message. "
-                "This is the simplest way to customize AI behavior."
-            )
-        }
-
-        # Save conversation
-        conversation = Conversation(
-            session_id=session_id,
-            ai_concept='system_prompt',
-            user_input=user_message,
-            ai_response=response['response'],
-            model_used=response['model'],
-            system_prompt=system_prompt,
-            thinking_process=educational_explanation,
-            response_time_ms=response_time
+        cache_persona_response(cache_key, response)
+
+        result = finish_persona_chat(session_id, comedian, user_message, response, start_time)
+        result['cache'] = {'hit': False, 'bypassed': bypassed}
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/chat-async', methods=['POST'])
+async def system_prompt_chat_async():
+    """
+    Async system prompt chat endpoint.
+
+    Same request and response as /system-prompts/chat, but the LLM call is
+    awaited on the worker's shared AsyncOpenRouterClient connection pool.
+    """
+    user_message, comedian, session_id, error = parse_chat_request(request.get_json())
+    if error:
+        return error
+
+    try:
+        start_time = time.time()
+
+        # Create messages with system prompt
+        messages = build_persona_messages(comedian, user_message)
+
+        # Serve repeated requests from the exact-match response cache
+        cache_key = persona_cache_key(messages)
+        cached, bypassed = chat_response_cache.lookup(cache_key, request.headers)
+
+        if cached:
+            result = finish_persona_chat(session_id, comedian, user_message, cached, start_time)
+            result['cache'] = {'hit': True, 'bypassed': False}
+            return jsonify(result)
+
+        # Get LLM response
+        response = await get_async_openrouter_client().chat_completion(
+            messages=messages,
+            model=Config.SYSTEM_PROMPT_MODEL,
+            temperature=PERSONA_TEMPERATURE
         )
 
-        db.session.add(conversation)
-        db.session.commit()
+        cache_persona_response(cache_key, response)
 
-        return jsonify({
-            'response': response['response'],
-            'session_id': session_id,
-            'comedian': comedian,
-            'system_prompt': system_prompt,
-            'educational_explanation': educational_explanation,
-            'response_time_ms': response_time,
-            'usage': response['usage']
-        })
+        result = finish_persona_chat(session_id, comedian, user_message, response, start_time)
+        result['cache'] = {'hit': False, 'bypassed': bypassed}
+        return jsonify(result)
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+async def compare_one(client, comedian, user_message):
+    """Get one persona's response for /compare, with a per-call timeout."""
+    start_time = time.time()
+    result = {
+        'comedian': comedian,
+        'system_prompt': COMEDIAN_PROMPTS[comedian]
+    }
+
+    try:
+        response = await asyncio.wait_for(
+            client.chat_completion(
+                messages=build_persona_messages(comedian, user_message),
+                model=Config.SYSTEM_PROMPT_MODEL,
+                temperature=PERSONA_TEMPERATURE
+            ),
+            timeout=Config.COMPARE_CALL_TIMEOUT_SECONDS
+        )
+        result.update(status='ok', response=response['response'], usage=response['usage'])
+
+    except asyncio.TimeoutError:
+        result.update(
+            status='timeout', response=None,
+            error=f'No response within {Config.COMPARE_CALL_TIMEOUT_SECONDS:g}s'
+        )
+    except Exception as e:
+        result.update(status='error', response=None, error=str(e))
+
+    result['response_time_ms'] = int((time.time() - start_time) * 1000)
+    return result
+
+
 @bp.route('/compare', methods=['POST'])
-def compare_personalities():
+async def compare_personalities():
     """
-    Compare responses from all three comedian personalities.
+    Compare responses from comedian personalities.
 
     Educational demonstration showing how system prompts change behavior.
+    All persona calls run concurrently, so latency is that of the slowest
+    call rather than the sum. Optional `comedians` limits (and orders) the
+    personas; results keep that order. A persona that fails or times out
+    is reported with its status and error while the others still return.
     """
     data = request.get_json()
 
@@ -162,32 +340,37 @@ def compare_personalities():
 
     user_message = data['message']
 
+    requested = data.get('comedians')
+    if requested is not None and (
+        not isinstance(requested, list) or not all(isinstance(c, str) for c in requested)
+    ):
+        return jsonify({'error': 'comedians must be a list of comedian names'}), 400
+
+    comedians = [c.lower() for c in requested or COMEDIAN_PROMPTS.keys()]
+    invalid = [c for c in comedians if c not in COMEDIAN_PROMPTS]
+    if invalid:
+        return jsonify({
+            'error': f'Invalid comedian(s): {invalid}. Choose from: {list(COMEDIAN_PROMPTS.keys())}'
+        }), 400
+
+    # Drop duplicates, keep request order
+    comedians = list(dict.fromkeys(comedians))
+
     try:
-        client = OpenRouterClient()
-        comparisons = []
-
-        # Get response from each comedian
-        for comedian, system_prompt in COMEDIAN_PROMPTS.items():
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ]
-
-            response = client.chat_completion(
-                messages=messages,
-                model=Config.SYSTEM_PROMPT_MODEL,
-                temperature=0.8
-            )
+        start_time = time.time()
+        client = get_async_openrouter_client()
 
-            comparisons.append({
-                'comedian': comedian,
-                'response': response['response'],
-                'system_prompt': system_prompt
-            })
+        # Get response from each comedian concurrently
+        comparisons = await asyncio.gather(*[
+            compare_one(client, comedian, user_message)
+            for comedian in comedians
+        ])
 
         return jsonify({
             'message': user_message,
             'comparisons': comparisons,
+            'failed': [c['comedian'] for c in comparisons if c['status'] != 'ok'],
+            'response_time_ms': int((time.time() - start_time) * 1000),
             'explanation': (
                 'Notice how the same AI model produces completely different responses '
                 'based only on the system prompt. This demonstrates the power of '
@@ -199,6 +382,14 @@ def compare_personalities():
         return jsonify({'error': str(e)}), 500
 
 
+@bp.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Get exact-match response cache statistics for this worker."""
+    return jsonify({
+        'response_cache': chat_response_cache.stats()
+    })
+
+
 @bp.route('/templates', methods=['GET'])
 def get_templates():
     """Get all available system prompt templates."""
@@ -29,19 +29,86 @@ class Config:
     OPENROUTER_SITE_URL = os.getenv('OPENROUTER_SITE_URL', 'http://localhost:5000')
     OPENROUTER_APP_NAME = os.getenv('OPENROUTER_APP_NAME', 'AI Comedy Lab')
 
+    # OpenRouter HTTP connection pool (per worker process)
+    OPENROUTER_TIMEOUT_SECONDS = float(os.getenv('OPENROUTER_TIMEOUT_SECONDS', 120))
+    OPENROUTER_CONNECT_TIMEOUT_SECONDS = float(os.getenv('OPENROUTER_CONNECT_TIMEOUT_SECONDS', 10))
+    OPENROUTER_MAX_CONNECTIONS = int(os.getenv('OPENROUTER_MAX_CONNECTIONS', 200))
+    OPENROUTER_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENROUTER_MAX_KEEPALIVE_CONNECTIONS', 50))
+    OPENROUTER_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv('OPENROUTER_KEEPALIVE_EXPIRY_SECONDS', 60))
+    OPENROUTER_HTTP2 = os.getenv('OPENROUTER_HTTP2', 'false').lower() == 'true'
+
     # OpenAI API (for Fine-Tuning)
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_BASE_URL = 'https://api.openai.com/v1'
 
     # Model Configuration
+    # Embedding backend: 'openrouter' (API) or 'hashing' (deterministic, offline)
+    EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'openrouter')
     EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'openai/text-embedding-ada-002')
-    EMBEDDING_DIMENSION = 1536  # OpenAI ada-002 dimension
+    # Stored vector size. ada-002 is fixed at 1536; text-embedding-3-* models
+    # accept smaller sizes (e.g. 256, 512). At most 2000 ('full' precision) or
+    # 4000 ('half') so the ANN index can be built. Changing it clears stored
+    # embeddings: run scripts/alter_embedding_column.py --dimension, then
+    # scripts/generate_embeddings.py.
+    EMBEDDING_DIMENSION = int(os.getenv('EMBEDDING_DIMENSION', 1536))
+
+    # Query embedding cache (per worker process, 0 entries disables it)
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', 1024))
+    EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv('EMBEDDING_CACHE_TTL_SECONDS', 3600))
+
+    # Conversation persistence: 'sync' (commit before responding) or, opt-in,
+    # 'async' (per-worker write-behind queue, batched multi-row INSERTs; rows
+    # still queued are lost if the worker crashes, and rows the database
+    # still rejects after a retry and a row-by-row attempt are dropped)
+    CONVERSATION_WRITE_MODE = os.getenv('CONVERSATION_WRITE_MODE', 'sync')
+    CONVERSATION_WRITE_BATCH_SIZE = int(os.getenv('CONVERSATION_WRITE_BATCH_SIZE', 100))
+    CONVERSATION_WRITE_FLUSH_SECONDS = float(os.getenv('CONVERSATION_WRITE_FLUSH_SECONDS', 1.0))
+    CONVERSATION_WRITE_MAX_QUEUE = int(os.getenv('CONVERSATION_WRITE_MAX_QUEUE', 10000))
+
+    # conversations is partitioned by month: partitions are created this many
+    # months ahead, and partitions older than the retention window are
+    # archived to gzip-compressed JSONL (scripts/archive_conversations.py)
+    CONVERSATION_PARTITION_MONTHS_AHEAD = int(os.getenv('CONVERSATION_PARTITION_MONTHS_AHEAD', 3))
+    CONVERSATION_RETENTION_MONTHS = int(os.getenv('CONVERSATION_RETENTION_MONTHS', 12))
+    CONVERSATION_ARCHIVE_PATH = os.getenv('CONVERSATION_ARCHIVE_PATH', 'data/archive')
+
+    # Dashboard statistics are recomputed at most this often (per worker)
+    DASHBOARD_STATS_TTL_SECONDS = int(os.getenv('DASHBOARD_STATS_TTL_SECONDS', 30))
+
+    # Semantic cache of RAG answers (per worker; 0 entries disables it)
+    RAG_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RAG_RESPONSE_CACHE_MAX_ENTRIES', 512))
+    RAG_RESPONSE_CACHE_TTL_SECONDS = int(os.getenv('RAG_RESPONSE_CACHE_TTL_SECONDS', 900))
+    RAG_RESPONSE_CACHE_THRESHOLD = float(os.getenv('RAG_RESPONSE_CACHE_THRESHOLD', 0.95))
+
+    # Exact-match cache of persona / fine-tuned chat responses (per worker; 0 keys disables it)
+    CHAT_RESPONSE_CACHE_MAX_KEYS = int(os.getenv('CHAT_RESPONSE_CACHE_MAX_KEYS', 1024))
+    CHAT_RESPONSE_CACHE_SAMPLES = int(os.getenv('CHAT_RESPONSE_CACHE_SAMPLES', 3))
+    CHAT_RESPONSE_CACHE_TTL_SECONDS = int(os.getenv('CHAT_RESPONSE_CACHE_TTL_SECONDS', 3600))
 
     # OpenRouter models (use openai/ prefix for OpenRouter)
     RAG_MODEL = os.getenv('RAG_MODEL', 'openai/gpt-3.5-turbo')
     SYSTEM_PROMPT_MODEL = os.getenv('SYSTEM_PROMPT_MODEL', 'openai/gpt-3.5-turbo')
     AGENT_MODEL = os.getenv('AGENT_MODEL', 'openai/gpt-4-turbo-preview')
 
+    # Max tool calls from one agent turn executed concurrently
+    AGENT_TOOL_WORKERS = int(os.getenv('AGENT_TOOL_WORKERS', 4))
+
+    # Cached results of the agent's stats tools, dropped when the dialogue
+    # corpus version changes (checked at most every N seconds)
+    AGENT_TOOL_CACHE_MAX_ENTRIES = int(os.getenv('AGENT_TOOL_CACHE_MAX_ENTRIES', 256))
+    AGENT_TOOL_CACHE_VERSION_CHECK_SECONDS = float(os.getenv('AGENT_TOOL_CACHE_VERSION_CHECK_SECONDS', 5))
+
+    # Random dialogue sampling: per-filter id arrays cached until the corpus
+    # version changes (checked at most every N seconds)
+    DIALOGUE_SAMPLER_MAX_FILTERS = int(os.getenv('DIALOGUE_SAMPLER_MAX_FILTERS', 64))
+    DIALOGUE_SAMPLER_VERSION_CHECK_SECONDS = float(os.getenv('DIALOGUE_SAMPLER_VERSION_CHECK_SECONDS', 5))
+
+    # Per-call timeout for side-by-side comparison endpoints (calls run concurrently)
+    COMPARE_CALL_TIMEOUT_SECONDS = float(os.getenv('COMPARE_CALL_TIMEOUT_SECONDS', 30))
+    # Models one fine-tuning comparison may request, and threads it may use
+    FINE_TUNE_COMPARE_MAX_MODELS = int(os.getenv('FINE_TUNE_COMPARE_MAX_MODELS', 8))
+    FINE_TUNE_COMPARE_WORKERS = int(os.getenv('FINE_TUNE_COMPARE_WORKERS', 8))
+
     # OpenAI model for fine-tuning (no prefix, direct OpenAI model name)
     FINE_TUNING_BASE_MODEL = os.getenv('FINE_TUNING_BASE_MODEL', 'gpt-4.1-mini-2025-04-14')
 
@@ -49,6 +116,28 @@ class Config:
     SIMILARITY_TOP_K = int(os.getenv('SIMILARITY_TOP_K', 5))
     SIMILARITY_THRESHOLD = float(os.getenv('SIMILARITY_THRESHOLD', 0.7))
 
+    # Vector search engine: 'pgvector' (query Postgres) or 'numpy' (in-process index)
+    VECTOR_ENGINE = os.getenv('VECTOR_ENGINE', 'pgvector')
+    NUMPY_INDEX_REFRESH_SECONDS = int(os.getenv('NUMPY_INDEX_REFRESH_SECONDS', 300))
+    # Shared snapshot built by scripts/build_vector_snapshot.py (empty disables)
+    VECTOR_SNAPSHOT_PATH = os.getenv('VECTOR_SNAPSHOT_PATH', '')
+    VECTOR_SNAPSHOT_CHECK_SECONDS = int(os.getenv('VECTOR_SNAPSHOT_CHECK_SECONDS', 10))
+
+    # Stored embedding type: 'full' (vector) or 'half' (halfvec, pgvector >= 0.7).
+    # Changing it on an up-to-date database: python scripts/alter_embedding_column.py
+    EMBEDDING_PRECISION = os.getenv('EMBEDDING_PRECISION', 'full')
+
+    # Vector Index Settings (pgvector ANN index on dialogues.embedding)
+    VECTOR_INDEX_TYPE = os.getenv('VECTOR_INDEX_TYPE', 'hnsw')  # 'hnsw' or 'ivfflat'
+    HNSW_M = int(os.getenv('HNSW_M', 16))
+    HNSW_EF_CONSTRUCTION = int(os.getenv('HNSW_EF_CONSTRUCTION', 64))
+    HNSW_EF_SEARCH = int(os.getenv('HNSW_EF_SEARCH', 40))  # Higher = better recall, slower
+    IVFFLAT_LISTS = int(os.getenv('IVFFLAT_LISTS', 100))
+    IVFFLAT_PROBES = int(os.getenv('IVFFLAT_PROBES', 10))  # Higher = better recall, slower
+
+    # Persistent embedding store used by scripts/generate_embeddings.py
+    EMBEDDING_STORE_PATH = os.getenv('EMBEDDING_STORE_PATH', 'data/embeddings')
+
     # Fine-tuning
     FINE_TUNING_DATA_PATH = 'data/processed/fine_tuning_dataset.jsonl'
 
@@ -78,6 +167,7 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
+    CONVERSATION_WRITE_MODE = 'sync'
     SQLALCHEMY_DATABASE_URI = os.getenv(
         'TEST_DATABASE_URL',
         'postgresql://localhost/ai_comedy_lab_test'
@@ -3,5 +3,6 @@
 from app.models.dialogue import Dialogue
 from app.models.conversation import Conversation
 from app.models.fine_tuning_job import FineTuningJob
+from app.models.payload_blob import PayloadBlob
 
-__all__ = ['Dialogue', 'Conversation', 'FineTuningJob']
+__all__ = ['Dialogue', 'Conversation', 'FineTuningJob', 'PayloadBlob']
@@ -1,9 +1,31 @@
 """Conversation model - stores user interactions and AI responses."""
 
+import base64
+import json
 from datetime import datetime
+from sqlalchemy import tuple_
 from sqlalchemy.dialects.postgresql import JSONB
 
 from app import db
+from app.models.payload_blob import PayloadBlob
+
+# Columns returned by the paginated listings unless asked for more
+SUMMARY_COLUMNS = (
+    'id', 'session_id', 'ai_concept', 'user_input', 'ai_response',
+    'model_used', 'response_time_ms', 'created_at'
+)
+# Large educational payloads, returned only when requested via `include`
+DETAIL_COLUMNS = ('thinking_process', 'retrieved_dialogues', 'system_prompt', 'agent_actions')
+# Payloads stored once in payload_blobs: attribute -> (inline column, hash column)
+BLOB_PAYLOADS = {
+    'thinking_process': ('inline_thinking_process', 'thinking_process_hash'),
+    'system_prompt': ('inline_system_prompt', 'system_prompt_hash'),
+}
+# thinking_process keys filled on read from another column, by ai_concept
+# (the value is already stored there, so the explanation omits it)
+THINKING_PROCESS_SOURCES = {
+    'agent': {'what_happened': 'agent_actions'},
+}
 
 
 class Conversation(db.Model):
@@ -12,20 +34,31 @@ class Conversation(db.Model):
 
     Stores conversation history along with educational metadata showing
     how each AI concept (RAG, system prompts, fine-tuning, agents) works.
+
+    In Postgres the table is range-partitioned by month on created_at (see
+    app/services/conversation_partitions.py); queries and inserts go
+    through the parent table as usual. Filtering on created_at lets the
+    planner skip partitions that cannot match.
     """
 
     __tablename__ = 'conversations'
+    __table_args__ = (
+        # Keyset pagination on (created_at, id) within a session / concept
+        db.Index('ix_conversations_session_id_created_at_id', 'session_id', 'created_at', 'id'),
+        db.Index('ix_conversations_ai_concept_created_at_id', 'ai_concept', 'created_at', 'id'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
 
-    id = db.Column(db.Integer, primary_key=True)
+    # Primary key is (id, created_at): Postgres requires the partition key in it
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
 
     # Session tracking
-    session_id = db.Column(db.String(100), nullable=False, index=True)
+    session_id = db.Column(db.String(100), nullable=False)
 
     # AI concept used
     ai_concept = db.Column(
         db.String(50),
-        nullable=False,
-        index=True
+        nullable=False
     )  # 'rag', 'system_prompt', 'fine_tuned', 'agent'
 
     # Conversation content
@@ -35,17 +68,111 @@ class Conversation(db.Model):
     # Model information
     model_used = db.Column(db.String(100))
 
-    # Educational metadata (varies by AI concept)
-    thinking_process = db.Column(JSONB)  # Step-by-step explanation
-    retrieved_dialogues = db.Column(JSONB)  # For RAG: what was retrieved
-    system_prompt = db.Column(db.Text)  # For system prompts: the prompt used
-    agent_actions = db.Column(JSONB)  # For agents: decision trail
+    # Educational metadata (varies by AI concept). thinking_process and
+    # system_prompt are stored once in payload_blobs and referenced by hash;
+    # read and assign them through the properties below. A thinking_process
+    # is split into its static explanation template (hashed, so shared by
+    # every request) and the per-request thinking_details overlaid on it
+    thinking_process_hash = db.Column(db.String(64))  # Step-by-step explanation
+    thinking_details = db.Column(JSONB(none_as_null=True))  # Per-request part of it
+    retrieved_dialogues = db.Column(JSONB(none_as_null=True))  # For RAG: what was retrieved
+    system_prompt_hash = db.Column(db.String(64))  # For system prompts: the prompt used
+    agent_actions = db.Column(JSONB(none_as_null=True))  # For agents: decision trail
+
+    # Pre-deduplication inline payloads (NULL once backfilled)
+    inline_thinking_process = db.Column('thinking_process', JSONB(none_as_null=True))
+    inline_system_prompt = db.Column('system_prompt', db.Text)
 
     # Performance metrics
     response_time_ms = db.Column(db.Integer)
 
-    # Timestamp
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Timestamp (partition key, so never NULL)
+    created_at = db.Column(db.DateTime, primary_key=True, default=datetime.utcnow, index=True)
+
+    def _get_payload(self, name):
+        inline_column, hash_column = BLOB_PAYLOADS[name]
+        inline = getattr(self, inline_column)
+        if inline is not None:
+            return inline
+
+        hash_ = getattr(self, hash_column)
+        pending = self.__dict__.get('_pending_blobs', {})
+        if hash_ in pending:
+            return pending[hash_][1]
+        return PayloadBlob.load(hash_)
+
+    def _set_payload(self, name, value):
+        inline_column, hash_column = BLOB_PAYLOADS[name]
+        setattr(self, inline_column, None)
+
+        if value is None:
+            setattr(self, hash_column, None)
+            return
+
+        hash_ = PayloadBlob.digest(value)
+        self.__dict__.setdefault('_pending_blobs', {})[hash_] = (name, value)
+        setattr(self, hash_column, hash_)
+
+    @staticmethod
+    def merge_thinking_process(template, details, ai_concept=None, columns=None):
+        """
+        Rebuild a full thinking_process from its stored parts.
+
+        Args:
+            template: Static explanation (from payload_blobs)
+            details: Per-request overlay: top-level keys, plus 'steps' mapping
+                a step number (as a string) to fields of that step
+            ai_concept: Row's concept, for THINKING_PROCESS_SOURCES
+            columns: Row values of the columns named in THINKING_PROCESS_SOURCES
+
+        Returns:
+            The explanation dict, or None if there is no template
+        """
+        if template is None:
+            return None
+
+        merged = dict(template)
+
+        if details:
+            step_details = details.get('steps') or {}
+            merged.update((k, v) for k, v in details.items() if k != 'steps')
+            if step_details and 'steps' in merged:
+                merged['steps'] = [
+                    dict(step, **step_details.get(str(step.get('step')), {}))
+                    for step in merged['steps']
+                ]
+
+        for key, column in THINKING_PROCESS_SOURCES.get(ai_concept, {}).items():
+            value = (columns or {}).get(column)
+            if key not in merged and value is not None:
+                merged[key] = value
+
+        return merged
+
+    @property
+    def thinking_process(self):
+        return self.merge_thinking_process(
+            self._get_payload('thinking_process'),
+            self.thinking_details,
+            self.ai_concept,
+            {'agent_actions': self.agent_actions}
+        )
+
+    @thinking_process.setter
+    def thinking_process(self, value):
+        self._set_payload('thinking_process', value)
+
+    @property
+    def system_prompt(self):
+        return self._get_payload('system_prompt')
+
+    @system_prompt.setter
+    def system_prompt(self, value):
+        self._set_payload('system_prompt', value)
+
+    def pending_blobs(self):
+        """Payloads assigned on this instance, as hash -> (kind, content), to store with it."""
+        return dict(self.__dict__.get('_pending_blobs', {}))
 
     def __repr__(self):
         return f'<Conversation {self.id}: {self.ai_concept} - {self.session_id}>'
@@ -73,6 +200,118 @@ class Conversation(db.Model):
         return cls.query.filter_by(session_id=session_id).order_by(cls.created_at).all()
 
     @classmethod
-    def get_by_concept(cls, ai_concept):
-        """Get all conversations for a specific AI concept."""
-        return cls.query.filter_by(ai_concept=ai_concept).order_by(cls.created_at.desc()).all()
+    def get_by_concept(cls, ai_concept, limit=100, since=None):
+        """
+        Get the most recent conversations for a specific AI concept.
+
+        Args:
+            ai_concept: Concept name
+            limit: Maximum rows to return (None for all)
+            since: Only rows created at or after this datetime; bounds the
+                partitions scanned
+        """
+        query = cls.query.filter_by(ai_concept=ai_concept)
+
+        if since is not None:
+            query = query.filter(cls.created_at >= since)
+
+        query = query.order_by(cls.created_at.desc())
+
+        if limit is not None:
+            query = query.limit(limit)
+
+        return query.all()
+
+    @staticmethod
+    def encode_cursor(created_at, conversation_id):
+        """Opaque pagination cursor for the position after a row."""
+        payload = json.dumps([created_at.isoformat(), conversation_id]).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode a cursor from encode_cursor.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, conversation_id = json.loads(base64.urlsafe_b64decode(padded))
+            return datetime.fromisoformat(created_at), int(conversation_id)
+        except Exception:
+            raise ValueError('Invalid cursor')
+
+    @classmethod
+    def paginate(cls, limit=20, cursor=None, include=(), newest_first=False, **filters):
+        """
+        Keyset-paginated listing ordered by (created_at, id).
+
+        Each page is an index range scan that starts right after the
+        cursor, so late pages cost the same as the first one.
+
+        Args:
+            limit: Rows per page
+            cursor: Cursor from the previous page's next_cursor
+            include: Extra DETAIL_COLUMNS to return
+            newest_first: Order descending instead of ascending
+            **filters: Equality filters, e.g. session_id=... or ai_concept=...
+
+        Returns:
+            Tuple of (list of row dicts, next_cursor or None on the last page)
+        """
+        columns = SUMMARY_COLUMNS + tuple(c for c in DETAIL_COLUMNS if c in include)
+        blob_columns = [c for c in columns if c in BLOB_PAYLOADS]
+        key = tuple_(cls.created_at, cls.id)
+
+        selected = []
+        for column in columns:
+            selected.extend(BLOB_PAYLOADS.get(column, (column,)))
+
+        # Parts of thinking_process stored outside its blob
+        merge_columns = ['thinking_details', 'agent_actions'] if 'thinking_process' in columns else []
+        selected.extend(c for c in merge_columns if c not in selected)
+
+        query = db.session.query(*[getattr(cls, c) for c in selected]).filter_by(**filters)
+
+        if cursor:
+            position = tuple_(*cls.decode_cursor(cursor))
+            query = query.filter(key < position if newest_first else key > position)
+
+        if newest_first:
+            query = query.order_by(cls.created_at.desc(), cls.id.desc())
+        else:
+            query = query.order_by(cls.created_at, cls.id)
+
+        # One extra row tells us whether there is a next page
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Rehydrate hashed payloads with one lookup for the whole page
+        blobs = PayloadBlob.load_many(
+            row._mapping[BLOB_PAYLOADS[c][1]] for row in rows for c in blob_columns
+        ) if blob_columns else {}
+
+        items = []
+        for row in rows:
+            item = dict(row._mapping)
+            for column in blob_columns:
+                inline_column, hash_column = BLOB_PAYLOADS[column]
+                inline, hash_ = item.pop(inline_column), item.pop(hash_column)
+                item[column] = inline if inline is not None else blobs.get(hash_)
+            if merge_columns:
+                item['thinking_process'] = cls.merge_thinking_process(
+                    item['thinking_process'],
+                    item.pop('thinking_details'),
+                    item['ai_concept'],
+                    {'agent_actions': item['agent_actions']}
+                )
+                if 'agent_actions' not in columns:
+                    item.pop('agent_actions')
+            item['created_at'] = row.created_at.isoformat() if row.created_at else None
+            items.append(item)
+
+        next_cursor = cls.encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+        return items, next_cursor
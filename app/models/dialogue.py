@@ -1,9 +1,25 @@
 """Dialogue model - stores comedian dialogues with vector embeddings."""
 
 from datetime import datetime
-from pgvector.sqlalchemy import Vector
+import numpy as np
+from pgvector.sqlalchemy import Vector, HALFVEC
+from sqlalchemy.orm import deferred
 
 from app import db
+from app.config import Config
+
+# Stored embedding type for each EMBEDDING_PRECISION: float32 vector, or
+# float16 halfvec (half the bytes; pgvector >= 0.7)
+EMBEDDING_TYPES = {'full': Vector, 'half': HALFVEC}
+
+if Config.EMBEDDING_PRECISION not in EMBEDDING_TYPES:
+    raise ValueError(
+        f"Unknown EMBEDDING_PRECISION '{Config.EMBEDDING_PRECISION}'. "
+        f"Choose from: {list(EMBEDDING_TYPES)}"
+    )
+
+# Text columns for read paths that never need the embeddings
+RECORD_COLUMNS = ('id', 'comedian', 'dialogue_english', 'dialogue_tanglish', 'context', 'emotion')
 
 
 class Dialogue(db.Model):
@@ -12,6 +28,11 @@ class Dialogue(db.Model):
 
     This model stores Tamil comedian dialogues in a minimal schema focused on
     core AI functionality (RAG, system prompts, fine-tuning, agents).
+
+    The embedding is stored once, as vector or halfvec depending on
+    Config.EMBEDDING_PRECISION. It is deferred: loading a Dialogue never
+    transfers or parses the vector unless it is accessed, or the query asks
+    for it with undefer_group('embeddings'). Vector search reads it in SQL.
     """
 
     __tablename__ = 'dialogues'
@@ -30,7 +51,10 @@ class Dialogue(db.Model):
     emotion = db.Column(db.String(50), index=True)  # Comedy type: sarcasm, wisdom, etc.
 
     # Vector embedding for RAG
-    embedding = db.Column(Vector(1536))  # OpenAI ada-002 dimension
+    embedding = deferred(
+        db.Column(EMBEDDING_TYPES[Config.EMBEDDING_PRECISION](Config.EMBEDDING_DIMENSION)),
+        group='embeddings'
+    )
 
     # Timestamp
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -50,6 +74,13 @@ class Dialogue(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
 
+    @staticmethod
+    def embedding_array(value):
+        """A loaded embedding (ndarray for vector, HalfVector for halfvec) as float32."""
+        if hasattr(value, 'to_numpy'):
+            value = value.to_numpy()
+        return np.asarray(value, dtype=np.float32)
+
     @classmethod
     def search_by_comedian(cls, comedian_name):
         """Get all dialogues for a specific comedian."""
@@ -59,3 +90,31 @@ class Dialogue(db.Model):
     def search_by_emotion(cls, emotion):
         """Get all dialogues with a specific emotion."""
         return cls.query.filter_by(emotion=emotion).all()
+
+    @classmethod
+    def records(cls, limit=None, columns=RECORD_COLUMNS, **filters):
+        """
+        Column-projected dialogues as named tuples (no ORM objects, no embeddings).
+
+        Args:
+            limit: Maximum rows to return (None for all)
+            columns: Column names to select
+            **filters: Equality filters, e.g. comedian=...; empty values are ignored
+
+        Returns:
+            List of rows with attribute access, e.g. row.comedian, ordered by id
+        """
+        query = db.session.query(*[getattr(cls, c) for c in columns]).filter_by(
+            **{k: v for k, v in filters.items() if v}
+        ).order_by(cls.id)
+
+        if limit is not None:
+            query = query.limit(limit)
+
+        return query.all()
+
+    @classmethod
+    def records_by_id(cls, ids, columns=RECORD_COLUMNS):
+        """Column-projected dialogues for a list of ids, in no particular order."""
+        columns = columns if 'id' in columns else ('id',) + tuple(columns)
+        return db.session.query(*[getattr(cls, c) for c in columns]).filter(cls.id.in_(ids)).all()
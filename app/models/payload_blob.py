@@ -0,0 +1,172 @@
+"""Payload blob model - content-addressed storage for repeated conversation payloads."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB, insert
+
+from app import db
+
+# Blobs are immutable, so a hash -> content entry never goes stale
+_cache: "OrderedDict[str, object]" = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_MAX_ENTRIES = 4096
+
+# Hashes this worker committed, by time. store_many skips them only this
+# long: delete_orphans may remove a blob no live conversation references,
+# and a worker that last wrote it earlier than this writes it again. It is
+# also how stale last_used_at may get before store_many refreshes it
+_stored: "OrderedDict[str, float]" = OrderedDict()
+STORED_RECHECK_SECONDS = 3600
+
+
+class PayloadBlob(db.Model):
+    """
+    Content-addressed payload referenced from conversations by hash.
+
+    System prompts are identical for every message to a persona, and many
+    thinking_process explanations repeat verbatim, so each distinct payload
+    is stored once and conversations keep only its SHA-256. Content is
+    never updated; the retention job deletes blobs no live conversation
+    references and no writer has used lately (archives inline their
+    payloads).
+    """
+
+    __tablename__ = 'payload_blobs'
+
+    # SHA-256 of the canonical JSON encoding of content
+    hash = db.Column(db.String(64), primary_key=True)
+
+    # What the payload is: 'system_prompt' or 'thinking_process'
+    kind = db.Column(db.String(30), nullable=False)
+
+    # Text payloads are stored as a JSON string
+    content = db.Column(JSONB, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Refreshed by writers that reference the blob (at most hourly)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<PayloadBlob {self.kind}: {self.hash[:12]}>'
+
+    @staticmethod
+    def digest(content):
+        """SHA-256 of a payload's canonical JSON encoding."""
+        payload = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _remember(hash_, content):
+        with _cache_lock:
+            _cache[hash_] = content
+            _cache.move_to_end(hash_)
+            while len(_cache) > CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+
+    @classmethod
+    def store_many(cls, blobs, session=None):
+        """
+        Insert blobs that are not stored yet (no commit).
+
+        Hashes this worker committed in the last STORED_RECHECK_SECONDS
+        are skipped without a round trip; the rest go in one INSERT ...
+        ON CONFLICT DO UPDATE that refreshes last_used_at when it is older
+        than that. The update row-locks the blob until commit, so a
+        concurrent delete_orphans rechecks the new last_used_at and keeps
+        it. Call remember() once the transaction has committed.
+
+        Args:
+            blobs: Dict of hash -> (kind, content)
+            session: Session to execute in (defaults to db.session)
+        """
+        recent = time.monotonic() - STORED_RECHECK_SECONDS
+        with _cache_lock:
+            missing = {h: blob for h, blob in blobs.items() if _stored.get(h, recent) <= recent}
+
+        if not missing:
+            return
+
+        now = datetime.utcnow()
+        statement = insert(cls.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=['hash'],
+            set_={'last_used_at': statement.excluded.last_used_at},
+            where=cls.last_used_at < now - timedelta(seconds=STORED_RECHECK_SECONDS)
+        )
+
+        # Sorted so concurrent writers lock shared blobs in the same order
+        (session or db.session).execute(
+            statement,
+            [{'hash': h, 'kind': kind, 'content': content, 'created_at': now, 'last_used_at': now}
+             for h, (kind, content) in sorted(missing.items())]
+        )
+
+    @classmethod
+    def remember(cls, blobs):
+        """Record committed blobs (hash -> (kind, content)) in the worker cache."""
+        now = time.monotonic()
+        for h, (_, content) in blobs.items():
+            cls._remember(h, content)
+            with _cache_lock:
+                _stored[h] = now
+                _stored.move_to_end(h)
+                while len(_stored) > CACHE_MAX_ENTRIES:
+                    _stored.popitem(last=False)
+
+    @classmethod
+    def load_many(cls, hashes):
+        """
+        Fetch payloads by hash, from the worker cache where possible.
+
+        Returns:
+            Dict of hash -> content for the hashes found
+        """
+        wanted = {h for h in hashes if h}
+        found = {}
+
+        with _cache_lock:
+            for h in wanted:
+                if h in _cache:
+                    _cache.move_to_end(h)
+                    found[h] = _cache[h]
+
+        missing = wanted - found.keys()
+        if missing:
+            rows = db.session.query(cls.hash, cls.content).filter(cls.hash.in_(missing)).all()
+            for h, content in rows:
+                cls._remember(h, content)
+                found[h] = content
+
+        return found
+
+    @classmethod
+    def load(cls, hash_):
+        """Fetch one payload by hash (None if missing)."""
+        return cls.load_many([hash_]).get(hash_) if hash_ else None
+
+    @classmethod
+    def delete_orphans(cls, min_age_days: int = 1):
+        """
+        Delete blobs no conversation references any more (commits).
+
+        Once a partition is archived (with its payloads inlined), blobs
+        only it referenced are dead weight. Blobs a writer stored or
+        referenced within min_age_days are kept: a conversation that uses
+        one may not be committed yet (see store_many).
+
+        Returns:
+            Number of blobs deleted
+        """
+        deleted = db.session.execute(text(
+            "DELETE FROM payload_blobs b WHERE b.last_used_at < :before "
+            "AND NOT EXISTS (SELECT 1 FROM conversations c WHERE c.system_prompt_hash = b.hash) "
+            "AND NOT EXISTS (SELECT 1 FROM conversations c WHERE c.thinking_process_hash = b.hash)"
+        ), {'before': datetime.utcnow() - timedelta(days=min_age_days)}).rowcount
+        db.session.commit()
+        return deleted
@@ -1,7 +1,20 @@
 """Services for AI Comedy Lab."""
 
 from app.services.openrouter_client import OpenRouterClient
+from app.services.async_openrouter_client import AsyncOpenRouterClient
+from app.services.embedding_backends import (
+    EmbeddingBackend, OpenRouterEmbeddingBackend, HashingEmbeddingBackend
+)
+from app.services.embedding_cache import EmbeddingCache
+from app.services.response_cache import SemanticResponseCache, ExactResponseCache
+from app.services.corpus_version import CorpusVersionTracker
+from app.services.tool_cache import ToolResultCache
+from app.services.dialogue_sampler import DialogueSampler
 from app.services.embedding_service import EmbeddingService
+from app.services.numpy_index import NumpyVectorIndex
 from app.services.vector_search import VectorSearchService
 
-__all__ = ['OpenRouterClient', 'EmbeddingService', 'VectorSearchService']
+__all__ = ['OpenRouterClient', 'AsyncOpenRouterClient', 'EmbeddingBackend',
+           'OpenRouterEmbeddingBackend', 'HashingEmbeddingBackend', 'EmbeddingCache',
+           'SemanticResponseCache', 'ExactResponseCache', 'CorpusVersionTracker', 'ToolResultCache',
+           'DialogueSampler', 'EmbeddingService', 'NumpyVectorIndex', 'VectorSearchService']
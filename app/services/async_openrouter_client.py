@@ -0,0 +1,199 @@
+"""Async OpenRouter API client sharing one connection pool per worker."""
+
+import asyncio
+import os
+import threading
+from typing import List, Dict, Any, Optional
+
+from openai import AsyncOpenAI
+
+from app.services.openrouter_client import OpenRouterClient, build_http_client
+from app.config import Config
+
+
+class _SharedLoop:
+    """
+    Background event loop that owns this worker's async HTTP connections.
+
+    httpx connection pools are bound to the event loop that first uses
+    them, while Flask runs each async view in its own short-lived loop.
+    Running every upstream call on one long-lived loop lets all requests
+    share (and keep alive) the same pooled connections.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread on first use (again after a fork)."""
+        if self.loop is None or self.pid != os.getpid():
+            with self._lock:
+                if self.loop is None or self.pid != os.getpid():
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(
+                        target=loop.run_forever,
+                        name='openrouter-async-loop',
+                        daemon=True
+                    )
+                    thread.start()
+                    self.loop, self.pid = loop, os.getpid()
+        return self.loop
+
+    async def run(self, coro):
+        """Await a coroutine on the shared loop from any event loop."""
+        loop = self.get()
+        try:
+            if asyncio.get_running_loop() is loop:
+                return await coro
+        except RuntimeError:
+            pass
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def run_sync(self, coro):
+        """Run a coroutine on the shared loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.get()).result()
+
+
+shared_loop = _SharedLoop()
+
+
+class AsyncOpenRouterClient:
+    """
+    Async wrapper for OpenRouter API using the OpenAI SDK.
+
+    Returns the same dictionaries as OpenRouterClient. One instance per
+    worker (see get_async_openrouter_client) holds a single long-lived,
+    connection-pooled httpx.AsyncClient, so a worker can keep many upstream
+    calls in flight while each request awaits its own. Concurrency per
+    worker still depends on the server model (e.g. gthread/gevent workers
+    or an ASGI server); a sync gunicorn worker serves one request at a time.
+    """
+
+    def __init__(self):
+        """Initialize async OpenRouter client."""
+        self.api_key = Config.OPENROUTER_API_KEY
+        self.base_url = Config.OPENROUTER_BASE_URL
+
+        if not self.api_key:
+            raise ValueError(
+                "OPENROUTER_API_KEY not found. "
+                "Please set it in your .env file."
+            )
+
+        self.http_client = build_http_client(is_async=True)
+
+        self.client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=self.http_client,
+            default_headers={
+                "HTTP-Referer": Config.OPENROUTER_SITE_URL,
+                "X-Title": Config.OPENROUTER_APP_NAME,
+            }
+        )
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a chat completion using OpenRouter.
+
+        Same arguments and return value as OpenRouterClient.chat_completion.
+        """
+        params = OpenRouterClient.build_chat_params(
+            messages, model, temperature, max_tokens, tools, tool_choice
+        )
+
+        async def call():
+            return await self.client.chat.completions.create(**params)
+
+        try:
+            response = await shared_loop.run(call())
+            return OpenRouterClient.format_chat_response(response)
+
+        except Exception as e:
+            raise Exception(f"OpenRouter API error: {str(e)}")
+
+    async def create_embedding(
+        self,
+        text: str,
+        model: Optional[str] = None,
+        dimensions: Optional[int] = None
+    ) -> List[float]:
+        """
+        Generate embedding vector for text.
+
+        Same arguments and return value as OpenRouterClient.create_embedding.
+        """
+        params = {"model": model or Config.EMBEDDING_MODEL, "input": text}
+        if dimensions:
+            params["dimensions"] = dimensions
+
+        async def call():
+            return await self.client.embeddings.create(**params)
+
+        try:
+            response = await shared_loop.run(call())
+            return response.data[0].embedding
+
+        except Exception as e:
+            raise Exception(f"Embedding generation error: {str(e)}")
+
+    async def batch_create_embeddings(
+        self,
+        texts: List[str],
+        model: Optional[str] = None,
+        dimensions: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for multiple texts in batch.
+
+        Same arguments and return value as OpenRouterClient.batch_create_embeddings.
+        """
+        params = {"model": model or Config.EMBEDDING_MODEL, "input": texts}
+        if dimensions:
+            params["dimensions"] = dimensions
+
+        async def call():
+            return await self.client.embeddings.create(**params)
+
+        try:
+            response = await shared_loop.run(call())
+
+            # Sort by index to ensure correct order
+            embeddings = sorted(response.data, key=lambda x: x.index)
+            return [e.embedding for e in embeddings]
+
+        except Exception as e:
+            raise Exception(f"Batch embedding generation error: {str(e)}")
+
+
+_async_client: Optional[AsyncOpenRouterClient] = None
+_async_client_pid: Optional[int] = None
+_async_client_lock = threading.Lock()
+
+
+def get_async_openrouter_client() -> AsyncOpenRouterClient:
+    """
+    Get this worker's shared AsyncOpenRouterClient (created on first use).
+
+    Like get_openrouter_client(), a forked worker builds its own client: the
+    parent's httpx pool is bound to the parent's sockets and event loop.
+    """
+    global _async_client, _async_client_pid
+
+    if _async_client is None or _async_client_pid != os.getpid():
+        with _async_client_lock:
+            if _async_client is None or _async_client_pid != os.getpid():
+                _async_client = AsyncOpenRouterClient()
+                _async_client_pid = os.getpid()
+
+    return _async_client
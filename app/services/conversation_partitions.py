@@ -0,0 +1,224 @@
+"""Monthly range partitions of the conversations table: creation, retention and archival."""
+
+import gzip
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app import db
+
+PARENT_TABLE = 'conversations'
+DEFAULT_PARTITION = 'conversations_default'
+_partition_pattern = re.compile(r'^conversations_(\d{4})_(\d{2})$')
+
+
+def month_start(value: date) -> date:
+    """First day of the month containing `value`."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after `month` (may be negative)."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Partition table name for a month, e.g. conversations_2026_01."""
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+def list_partitions() -> Dict[date, str]:
+    """Monthly partitions currently attached to conversations, by month."""
+    names = db.session.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    ), {'parent': PARENT_TABLE}).scalars()
+
+    partitions = {}
+    for name in names:
+        match = _partition_pattern.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def list_detached_partitions() -> List[str]:
+    """
+    Monthly partition tables that exist but are no longer attached.
+
+    Left behind when an archive run failed after detaching, before the
+    table was dropped.
+    """
+    names = db.session.execute(text(
+        "SELECT c.relname FROM pg_class c "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relkind = 'r' AND n.nspname = current_schema() "
+        "AND c.relname LIKE :prefix "
+        "AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)"
+    ), {'prefix': f"{PARENT_TABLE}\\_%"}).scalars()
+
+    return sorted(name for name in names if _partition_pattern.match(name))
+
+
+def create_partition(month: date) -> str:
+    """
+    Create the partition for one month.
+
+    Rows for that month that already landed in the default partition are
+    moved into the new partition (Postgres refuses to create a partition
+    that the default partition has rows for).
+
+    Returns:
+        Partition table name
+    """
+    name = partition_name(month)
+    bounds = {'start': month, 'end': add_months(month, 1)}
+    in_range = "created_at >= :start AND created_at < :end"
+
+    stray_rows = db.session.execute(text(
+        f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"
+    ), bounds).scalar()
+
+    if stray_rows:
+        db.session.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"
+        ))
+
+    db.session.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+
+    if stray_rows:
+        db.session.execute(text(
+            f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"
+        ), bounds)
+        db.session.execute(text(
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"
+        ), bounds)
+        db.session.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+        ))
+
+    db.session.commit()
+    return name
+
+
+def ensure_partitions(months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """
+    Create any missing partitions from this month to `months_ahead` months out.
+
+    Returns:
+        Names of partitions created
+    """
+    current = month_start(today or datetime.utcnow().date())
+    existing = list_partitions()
+
+    return [
+        create_partition(month)
+        for month in (add_months(current, i) for i in range(months_ahead + 1))
+        if month not in existing
+    ]
+
+
+def archive_partition(name: str, directory: Path, batch_size: int = 1000,
+                      attached: bool = True) -> Dict[str, object]:
+    """
+    Write a partition's rows to gzip-compressed JSONL, then detach and drop it.
+
+    Payload blobs stay in payload_blobs (other partitions may share them).
+
+    The archive is written from the partition while it is still attached,
+    to a temporary file renamed into place once complete. Only then is the
+    partition detached and dropped, in one transaction, so a failure at
+    any point leaves the partition attached (the next run archives it
+    again) or a complete archive.
+
+    Args:
+        name: Partition table name
+        directory: Archive directory
+        batch_size: Rows fetched per round trip
+        attached: False for a table an earlier run already detached
+
+    Returns:
+        Dict with the partition name, archive path and row count
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.jsonl.gz"
+    tmp_path = directory / f".{name}.jsonl.gz.tmp"
+
+    # Inline the deduplicated payloads so the archive stands on its own
+    rows = 0
+    result = db.session.execute(
+        text(
+            f"SELECT (to_jsonb(t) || jsonb_build_object("
+            f"'system_prompt', coalesce(to_jsonb(t.system_prompt), sp.content), "
+            f"'thinking_process', coalesce(t.thinking_process, tp.content)))::text "
+            f"FROM {name} t "
+            f"LEFT JOIN payload_blobs sp ON sp.hash = t.system_prompt_hash "
+            f"LEFT JOIN payload_blobs tp ON tp.hash = t.thinking_process_hash "
+            f"ORDER BY t.created_at, t.id"
+        ).execution_options(stream_results=True, yield_per=batch_size)
+    )
+
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for (line,) in result:
+            f.write(line)
+            f.write('\n')
+            rows += 1
+
+    os.replace(tmp_path, path)
+
+    # Ends the read transaction, so DETACH does not wait on our own snapshot
+    db.session.commit()
+
+    if attached:
+        db.session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    db.session.execute(text(f"DROP TABLE {name}"))
+    db.session.commit()
+
+    return {'partition': name, 'archive': str(path), 'rows': rows}
+
+
+def apply_retention(retention_months: int, directory: Path, dry_run: bool = False,
+                    today: Optional[date] = None) -> List[Dict[str, object]]:
+    """
+    Archive every monthly partition older than the retention window.
+
+    Partition tables left detached by an earlier failed run are archived
+    and dropped too.
+
+    Args:
+        retention_months: Months of history to keep online (current month included)
+        directory: Archive directory
+        dry_run: Only report which partitions would be archived
+
+    Returns:
+        One entry per partition archived (or due, when dry_run)
+
+    Raises:
+        ValueError: If retention_months < 1 (the current month's partition,
+            which live writes go to, would be archived and dropped)
+    """
+    if retention_months < 1:
+        raise ValueError(f"retention_months must be at least 1, got {retention_months}")
+
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -(retention_months - 1))
+    expired = sorted((month, name) for month, name in list_partitions().items() if month < cutoff)
+
+    detached = list_detached_partitions()
+
+    if dry_run:
+        return [{'partition': name, 'archive': None, 'rows': None}
+                for name in detached + [name for _, name in expired]]
+
+    return (
+        [archive_partition(name, directory, attached=False) for name in detached] +
+        [archive_partition(name, directory) for _, name in expired]
+    )
@@ -0,0 +1,240 @@
+"""Write-behind batched persistence for Conversation rows."""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from app import db
+from app.models.conversation import Conversation
+from app.models.payload_blob import PayloadBlob
+
+
+class ConversationWriter:
+    """
+    Persists Conversation rows, optionally off the request path.
+
+    Durability modes (Config.CONVERSATION_WRITE_MODE):
+        sync:  add + commit before the response is returned (no loss on crash)
+        async: rows go onto a bounded per-worker queue; a background thread
+               writes them with one multi-row INSERT per batch, flushing when
+               a batch is full, every flush interval, and at shutdown. A
+               crash can lose rows still queued (at most max_queue).
+
+    When the queue is full the row is written synchronously instead, so
+    memory stays bounded without dropping conversations. Either way the
+    row's deduplicated payloads (system prompt, thinking process) are
+    written to payload_blobs in the same transaction.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.mode = 'sync'
+        self.batch_size = 100
+        self.flush_seconds = 1.0
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.sync_writes = 0
+        self.failed = 0
+
+    def init_app(self, app):
+        """Read settings from the app config and flush at interpreter exit."""
+        self.app = app
+        self.mode = app.config.get('CONVERSATION_WRITE_MODE', 'sync')
+        self.batch_size = max(int(app.config.get('CONVERSATION_WRITE_BATCH_SIZE', 100)), 1)
+        self.flush_seconds = float(app.config.get('CONVERSATION_WRITE_FLUSH_SECONDS', 1.0))
+        self._queue = queue.Queue(maxsize=int(app.config.get('CONVERSATION_WRITE_MAX_QUEUE', 10000)))
+
+        if self.mode not in ('sync', 'async'):
+            raise ValueError(
+                f"Unknown CONVERSATION_WRITE_MODE '{self.mode}'. Choose from: ['sync', 'async']"
+            )
+
+        atexit.register(self.shutdown)
+
+    @staticmethod
+    def to_row(conversation: Conversation) -> Dict[str, Any]:
+        """Column values for an INSERT (every column, so rows batch together)."""
+        row = {
+            attr.key: getattr(conversation, attr.key)
+            for attr in Conversation.__mapper__.column_attrs
+            if attr.key != 'id'
+        }
+        # Stamp now, not at flush time, so created_at reflects the request
+        row['created_at'] = row['created_at'] or datetime.utcnow()
+        return row
+
+    def save(self, conversation: Conversation) -> None:
+        """
+        Persist a conversation according to the durability mode.
+
+        Args:
+            conversation: Unsaved Conversation instance
+        """
+        blobs = conversation.pending_blobs()
+
+        if self.mode == 'async' and self._queue is not None:
+            self._ensure_thread()
+            try:
+                self._queue.put_nowait((self.to_row(conversation), blobs))
+                with self._lock:
+                    self.enqueued += 1
+                return
+            except queue.Full:
+                pass
+
+        PayloadBlob.store_many(blobs)
+        db.session.add(conversation)
+        db.session.commit()
+        PayloadBlob.remember(blobs)
+
+        with self._lock:
+            self.sync_writes += 1
+
+    def _ensure_thread(self):
+        """Start the flush thread on first use (again after a fork)."""
+        if self._thread is None or self._pid != os.getpid():
+            with self._lock:
+                if self._thread is None or self._pid != os.getpid():
+                    self._stop.clear()
+                    self._thread = threading.Thread(
+                        target=self._run,
+                        name='conversation-writer',
+                        daemon=True
+                    )
+                    self._thread.start()
+                    self._pid = os.getpid()
+
+    def _take_batch(self, timeout: float) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Wait up to `timeout` for the first row, then drain up to batch_size."""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """Flush thread: write a batch when full or every flush interval."""
+        while not self._stop.is_set():
+            deadline = time.monotonic() + self.flush_seconds
+            batch = []
+
+            while len(batch) < self.batch_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                batch.extend(self._take_batch(min(remaining, 0.25)))
+
+            if batch:
+                self._write(batch)
+
+    @staticmethod
+    def _insert(rows: List[Dict[str, Any]], blobs: Dict[str, Any]) -> None:
+        """Insert blobs, then rows with one multi-row INSERT, in one transaction."""
+        PayloadBlob.store_many(blobs)
+        db.session.execute(insert(Conversation), rows)
+        db.session.commit()
+        PayloadBlob.remember(blobs)
+
+    def _write(self, batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        """
+        Write a batch, retrying once, then row by row.
+
+        A transient failure (dropped connection, deadlock) usually clears on
+        the retry. If the batch fails twice, each row is written in its own
+        transaction so one bad row loses only itself.
+        """
+        rows = [row for row, _ in batch]
+        blobs = {h: blob for _, row_blobs in batch for h, blob in row_blobs.items()}
+
+        with self._flush_lock, self.app.app_context():
+            try:
+                for attempt in (1, 2):
+                    try:
+                        self._insert(rows, blobs)
+                        with self._lock:
+                            self.written += len(rows)
+                            self.batches += 1
+                        return
+
+                    except Exception as e:
+                        db.session.rollback()
+                        self.app.logger.warning(
+                            f'Failed to write {len(rows)} conversations '
+                            f'(attempt {attempt}): {str(e)}'
+                        )
+
+                for row, row_blobs in batch:
+                    try:
+                        self._insert([row], row_blobs)
+                        with self._lock:
+                            self.written += 1
+
+                    except Exception as e:
+                        db.session.rollback()
+                        with self._lock:
+                            self.failed += 1
+                        self.app.logger.error(
+                            f'Failed to write conversation for session '
+                            f'{row.get("session_id")}: {str(e)}'
+                        )
+
+            finally:
+                db.session.remove()
+
+    def flush(self) -> None:
+        """Write everything currently queued (blocking)."""
+        if self._queue is None:
+            return
+
+        while True:
+            batch = self._take_batch(timeout=0)
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self) -> None:
+        """Stop the flush thread and write any queued rows."""
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.flush_seconds + 1)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and write counters for this worker."""
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'queued': self._queue.qsize() if self._queue is not None else 0,
+                'max_queue': self._queue.maxsize if self._queue is not None else 0,
+                'batch_size': self.batch_size,
+                'flush_seconds': self.flush_seconds,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'batches': self.batches,
+                'sync_writes': self.sync_writes,
+                'failed': self.failed,
+            }
+
+
+# Process-wide writer, configured in create_app
+conversation_writer = ConversationWriter()
@@ -0,0 +1,74 @@
+"""Dialogue corpus version, for caches that must drop entries when the corpus changes."""
+
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from app import db
+
+CORPUS_NAME = 'dialogues'
+
+
+def corpus_version(name: str = CORPUS_NAME) -> Optional[int]:
+    """
+    Current version of a corpus from corpus_versions.
+
+    A statement-level trigger on dialogues bumps the version on every
+    INSERT, UPDATE, DELETE or TRUNCATE, so ingestion scripts, migrations
+    and manual edits all invalidate caches keyed on it.
+
+    Read on its own pooled connection, so a failure never rolls back (and
+    a success never opens) a transaction on the caller's session.
+
+    Returns:
+        Version number, or None if it cannot be read (e.g. the table is
+        missing), in which case callers should not cache
+    """
+    try:
+        with db.engine.connect() as connection:
+            return connection.execute(
+                text("SELECT version FROM corpus_versions WHERE name = :name"),
+                {'name': name}
+            ).scalar()
+    except Exception:
+        return None
+
+
+class CorpusVersionTracker:
+    """
+    Corpus version re-read at most every check_seconds.
+
+    Each cache keeps its own tracker and compares the version it returns
+    with the one its entries were built against. Safe to share between
+    threads.
+    """
+
+    def __init__(self, check_seconds: float, name: str = CORPUS_NAME):
+        """
+        Initialize corpus version tracker.
+
+        Args:
+            check_seconds: Seconds between corpus version reads
+            name: Corpus name in corpus_versions
+        """
+        self.check_seconds = check_seconds
+        self.name = name
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[int]:
+        """Corpus version, re-read when the last read is too old (or found nothing)."""
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._checked_at < self.check_seconds:
+                return self._version
+
+        version = corpus_version(self.name)
+
+        with self._lock:
+            self._version = version
+            self._checked_at = now
+            return version
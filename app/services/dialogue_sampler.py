@@ -0,0 +1,139 @@
+"""Uniform random sampling of dialogues without scanning or loading embeddings."""
+
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app import db
+from app.config import Config
+from app.models.dialogue import Dialogue
+from app.services.corpus_version import CorpusVersionTracker
+
+
+class DialogueSampler:
+    """
+    Samples k random dialogues in O(k), optionally filtered.
+
+    For each filter combination (comedian, emotion, embedded-only) the
+    matching ids are loaded once into an int array; a sample picks k
+    positions from it and fetches just those rows by primary key. The id
+    arrays are rebuilt when the dialogue corpus version changes (re-read at
+    most every version_check_seconds), and the least recently used filter
+    is dropped beyond max_filters. Safe to share between threads.
+    """
+
+    def __init__(self, max_filters: int, version_check_seconds: float):
+        """
+        Initialize dialogue sampler.
+
+        Args:
+            max_filters: Maximum number of cached per-filter id arrays
+            version_check_seconds: Seconds between corpus version checks
+        """
+        self.max_filters = max_filters
+        self.version_check_seconds = version_check_seconds
+        self._ids: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._tracker = CorpusVersionTracker(version_check_seconds)
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.samples = 0
+        self.id_loads = 0
+
+    def _check_version(self) -> Optional[int]:
+        """Drop every id array if the corpus version moved."""
+        version = self._tracker.current()
+
+        with self._lock:
+            if version != self._version:
+                self._ids.clear()
+                self._version = version
+            return version
+
+    @staticmethod
+    def _load_ids(comedian: Optional[str], emotion: Optional[str], embedded_only: bool) -> np.ndarray:
+        """Ids of the dialogues matching a filter (one narrow index-friendly query)."""
+        query = db.session.query(Dialogue.id)
+
+        if comedian:
+            query = query.filter(Dialogue.comedian == comedian)
+        if emotion:
+            query = query.filter(Dialogue.emotion == emotion)
+        if embedded_only:
+            query = query.filter(Dialogue.embedding.isnot(None))
+
+        return np.fromiter((row[0] for row in query), dtype=np.int64)
+
+    def _ids_for(self, key: Tuple) -> np.ndarray:
+        """Cached id array for a filter key, loading it on first use."""
+        version = self._check_version()
+
+        with self._lock:
+            ids = self._ids.get(key)
+            if ids is not None:
+                self._ids.move_to_end(key)
+                return ids
+
+        ids = self._load_ids(*key)
+
+        with self._lock:
+            self.id_loads += 1
+            # Without a corpus version there is nothing to invalidate on: don't cache
+            if version is not None and version == self._version:
+                self._ids[key] = ids
+                while len(self._ids) > self.max_filters:
+                    self._ids.popitem(last=False)
+
+        return ids
+
+    def sample(self, k: int, comedian: Optional[str] = None, emotion: Optional[str] = None,
+               embedded_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Pick up to k distinct dialogues uniformly at random.
+
+        Args:
+            k: Number of dialogues wanted
+            comedian: Optional comedian filter
+            emotion: Optional emotion filter
+            embedded_only: Only dialogues that have an embedding
+
+        Returns:
+            List of dialogue dicts (Dialogue RECORD_COLUMNS), in random order
+        """
+        ids = self._ids_for((comedian or None, emotion or None, embedded_only))
+        k = min(max(int(k), 0), len(ids))
+
+        if k == 0:
+            return []
+
+        chosen = [int(ids[i]) for i in random.sample(range(len(ids)), k)]
+
+        rows = Dialogue.records_by_id(chosen)
+
+        with self._lock:
+            self.samples += 1
+
+        # Keep the random order (IN returns rows in any order)
+        by_id = {row.id: dict(row._mapping) for row in rows}
+        return [by_id[i] for i in chosen if i in by_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cached filter count, corpus version and counters."""
+        with self._lock:
+            return {
+                'filters': len(self._ids),
+                'max_filters': self.max_filters,
+                'cached_ids': int(sum(len(ids) for ids in self._ids.values())),
+                'corpus_version': self._version,
+                'samples': self.samples,
+                'id_loads': self.id_loads,
+            }
+
+
+# Process-wide sampler shared by the agent tools and the RAG fallback
+dialogue_sampler = DialogueSampler(
+    max_filters=Config.DIALOGUE_SAMPLER_MAX_FILTERS,
+    version_check_seconds=Config.DIALOGUE_SAMPLER_VERSION_CHECK_SECONDS
+)
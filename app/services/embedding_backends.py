@@ -0,0 +1,199 @@
+"""Embedding backends used by EmbeddingService."""
+
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+
+from app.services.embedding_schema import validate_dimension
+from app.services.openrouter_client import get_openrouter_client
+from app.config import Config
+
+# Native output size of known embedding models. Models listed in
+# FIXED_DIMENSION_MODELS cannot be shortened with the `dimensions` parameter.
+NATIVE_EMBEDDING_DIMENSIONS = {
+    'openai/text-embedding-ada-002': 1536,
+    'openai/text-embedding-3-small': 1536,
+    'openai/text-embedding-3-large': 3072,
+}
+FIXED_DIMENSION_MODELS = {'openai/text-embedding-ada-002'}
+
+
+class EmbeddingBackend:
+    """
+    Base class for embedding providers.
+
+    Subclasses turn a batch of texts into vectors of `dimension` floats.
+    `model` identifies the vector space and is used as the cache/store key,
+    so two backends must never share a model name.
+    """
+
+    name = None
+
+    def __init__(self, model: str, dimension: int):
+        """
+        Initialize backend.
+
+        Args:
+            model: Model identifier for this vector space
+            dimension: Output vector size
+
+        Raises:
+            ValueError: If the dimension is too wide for the embedding index
+        """
+        validate_dimension(dimension, Config.EMBEDDING_PRECISION)
+
+        self.model = model
+        self.dimension = dimension
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Non-empty texts to embed
+
+        Returns:
+            One embedding per text, in input order
+        """
+        raise NotImplementedError
+
+    def embed_one(self, text: str) -> List[float]:
+        """Embed a single text."""
+        return self.embed([text])[0]
+
+
+class OpenRouterEmbeddingBackend(EmbeddingBackend):
+    """Embeddings from the OpenRouter API (OpenAI embedding models)."""
+
+    name = 'openrouter'
+
+    def __init__(self, model: str, dimension: int):
+        super().__init__(model, dimension)
+
+        native = NATIVE_EMBEDDING_DIMENSIONS.get(model)
+
+        if model in FIXED_DIMENSION_MODELS and dimension != native:
+            raise ValueError(
+                f"{model} only produces {native}-dimensional embeddings; "
+                f"EMBEDDING_DIMENSION is {dimension}"
+            )
+
+        # Only ask for shortened vectors when they differ from the native size
+        self.request_dimensions = None if dimension == native else dimension
+        self.client = get_openrouter_client()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.client.batch_create_embeddings(
+            texts,
+            model=self.model,
+            dimensions=self.request_dimensions
+        )
+
+    def embed_one(self, text: str) -> List[float]:
+        return self.client.create_embedding(
+            text,
+            model=self.model,
+            dimensions=self.request_dimensions
+        )
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Deterministic offline embeddings from hashed character n-grams.
+
+    Each text's character n-grams are hashed into `dimension` signed buckets
+    (the hashing trick, i.e. a sparse random projection) and the result is
+    L2-normalized. Texts sharing many n-grams get high cosine similarity.
+    No network, no API key, identical output in every process, and the
+    whole batch is hashed with vectorized NumPy operations.
+
+    Not a semantic model: use it for benchmarks, load tests and CI.
+    """
+
+    name = 'hashing'
+    ngram_sizes = (2, 3, 4)
+
+    def __init__(self, model: str, dimension: int):
+        # Namespaced so cached/stored vectors never mix with API embeddings
+        super().__init__(f"local/hashing-ngram-{'-'.join(map(str, self.ngram_sizes))}", dimension)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Returns:
+            (len(texts), dimension) float32 array with L2-normalized rows
+        """
+        output = np.zeros((len(texts), self.dimension), dtype=np.float32)
+
+        if not texts:
+            return output
+
+        # One byte buffer for the whole batch; pad with spaces so n-grams
+        # see word boundaries at the start and end of each text
+        encoded = [f" {' '.join(t.lower().split())} ".encode('utf-8') for t in texts]
+        lengths = np.array([len(e) for e in encoded])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+        row_of_byte = np.repeat(np.arange(len(texts)), lengths)
+
+        with np.errstate(over='ignore'):
+            for n in self.ngram_sizes:
+                windows = len(data) - n + 1
+                if windows <= 0:
+                    continue
+
+                # Polynomial hash of each n-gram (uint64 arithmetic wraps)
+                hashes = np.full(windows, n, dtype=np.uint64)
+                for offset in range(n):
+                    hashes = hashes * np.uint64(257) + data[offset:offset + windows]
+                hashes *= np.uint64(0x9E3779B97F4A7C15)
+
+                # Skip n-grams spanning two texts
+                rows = row_of_byte[:windows]
+                valid = rows == row_of_byte[n - 1:]
+
+                buckets = (hashes >> np.uint64(32)) % np.uint64(self.dimension)
+                signs = ((hashes >> np.uint64(31)) & np.uint64(1)).astype(np.float32) * 2 - 1
+
+                np.add.at(
+                    output,
+                    (rows[valid], buckets[valid].astype(np.int64)),
+                    signs[valid]
+                )
+
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return output / norms
+
+
+EMBEDDING_BACKENDS: Dict[str, Type[EmbeddingBackend]] = {
+    OpenRouterEmbeddingBackend.name: OpenRouterEmbeddingBackend,
+    HashingEmbeddingBackend.name: HashingEmbeddingBackend,
+}
+
+
+def get_embedding_backend(name: Optional[str] = None) -> EmbeddingBackend:
+    """
+    Create the configured embedding backend.
+
+    Args:
+        name: Backend name (defaults to Config.EMBEDDING_BACKEND)
+
+    Returns:
+        EmbeddingBackend instance
+    """
+    name = name or Config.EMBEDDING_BACKEND
+
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend '{name}'. "
+            f"Choose from: {list(EMBEDDING_BACKENDS.keys())}"
+        )
+
+    return EMBEDDING_BACKENDS[name](
+        model=Config.EMBEDDING_MODEL,
+        dimension=Config.EMBEDDING_DIMENSION
+    )
@@ -0,0 +1,137 @@
+"""In-process LRU + TTL cache for query embeddings."""
+
+import re
+import string
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import Config
+
+
+class EmbeddingCache:
+    """
+    Bounded cache of query embeddings keyed on (model, normalized text).
+
+    Entries are stored as float32 arrays (half the size of Python float lists)
+    and evicted least-recently-used once max_entries is reached, or dropped
+    on lookup once older than ttl_seconds. Safe to share between threads.
+    """
+
+    _whitespace = re.compile(r'\s+')
+    _edge_chars = string.whitespace + string.punctuation
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize embedding cache.
+
+        Args:
+            max_entries: Maximum number of cached embeddings (0 disables caching)
+            ttl_seconds: Seconds an entry stays valid (0 means no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """
+        Normalize query text so trivial variants share a cache entry.
+
+        "traffic", "Traffic " and "traffic?" all normalize to "traffic".
+        """
+        text = cls._whitespace.sub(' ', text.lower())
+        return text.strip(cls._edge_chars)
+
+    def get(self, text: str, model: str) -> Optional[List[float]]:
+        """
+        Look up a cached embedding.
+
+        Args:
+            text: Query text (normalized internally)
+            model: Embedding model name
+
+        Returns:
+            Embedding as list of floats, or None on a miss
+        """
+        if self.max_entries <= 0:
+            return None
+
+        key = (model, self.normalize(text))
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and self.ttl_seconds > 0:
+                if time.monotonic() - entry[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            vector = entry[1]
+
+        return vector.tolist()
+
+    def put(self, text: str, model: str, embedding: List[float]) -> None:
+        """
+        Store an embedding, evicting the least recently used entry if full.
+
+        Args:
+            text: Query text (normalized internally)
+            model: Embedding model name
+            embedding: Embedding vector
+        """
+        if self.max_entries <= 0:
+            return
+
+        key = (model, self.normalize(text))
+        vector = np.asarray(embedding, dtype=np.float32)
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Get cache size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Process-wide cache shared by every EmbeddingService instance in this worker
+query_embedding_cache = EmbeddingCache(
+    max_entries=Config.EMBEDDING_CACHE_MAX_ENTRIES,
+    ttl_seconds=Config.EMBEDDING_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,147 @@
+"""Type and ANN index of the dialogues.embedding column (shared by migrations and scripts)."""
+
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+
+from app.config import Config
+
+# pgvector type and index operator class for each EMBEDDING_PRECISION
+VECTOR_TYPES = {
+    'full': ('vector', 'vector_cosine_ops'),
+    'half': ('halfvec', 'halfvec_cosine_ops'),
+}
+
+# pgvector's HNSW and IVFFlat indexes reject wider columns
+MAX_INDEXED_DIMENSIONS = {'full': 2000, 'half': 4000}
+
+ANN_INDEXES = ('ix_dialogues_embedding_hnsw', 'ix_dialogues_embedding_ivfflat')
+
+
+def validate_dimension(dimension: int, precision: str) -> None:
+    """
+    Check that embeddings of `dimension` can be indexed at `precision`.
+
+    Raises:
+        ValueError: If the ANN index could not be built on the column
+    """
+    limit = MAX_INDEXED_DIMENSIONS[precision]
+    if dimension > limit:
+        raise ValueError(
+            f"EMBEDDING_DIMENSION is {dimension}, but {VECTOR_TYPES[precision][0]} "
+            f"columns can only be indexed up to {limit} dimensions"
+        )
+
+
+def column_type(connection, column: str = 'embedding') -> Optional[Tuple[str, int]]:
+    """
+    Current pgvector type and dimension of a dialogues column.
+
+    Returns:
+        Tuple of ('vector' | 'halfvec', dimension), or None if the column is missing
+    """
+    row = connection.execute(text(
+        "SELECT t.typname, a.atttypmod FROM pg_attribute a "
+        "JOIN pg_type t ON t.oid = a.atttypid "
+        "WHERE a.attrelid = 'dialogues'::regclass AND a.attname = :column "
+        "AND NOT a.attisdropped"
+    ), {'column': column}).first()
+
+    return (row[0], row[1]) if row else None
+
+
+def drop_ann_indexes(connection) -> None:
+    """Drop every ANN index on dialogues embeddings (autocommit connection)."""
+    for name in ANN_INDEXES:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+def create_ann_index(connection, precision: str) -> None:
+    """Build the configured HNSW/IVFFlat index on dialogues.embedding (autocommit connection)."""
+    _, ops = VECTOR_TYPES[precision]
+
+    if Config.VECTOR_INDEX_TYPE == 'ivfflat':
+        connection.execute(text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_dialogues_embedding_ivfflat "
+            f"ON dialogues USING ivfflat (embedding {ops}) "
+            f"WITH (lists = {int(Config.IVFFLAT_LISTS)})"
+        ))
+    else:
+        connection.execute(text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_dialogues_embedding_hnsw "
+            f"ON dialogues USING hnsw (embedding {ops}) "
+            f"WITH (m = {int(Config.HNSW_M)}, "
+            f"ef_construction = {int(Config.HNSW_EF_CONSTRUCTION)})"
+        ))
+
+
+def convert_precision(connection, precision: str) -> bool:
+    """
+    Store dialogues.embedding at `precision`, converting vectors in place.
+
+    Casting between vector and halfvec keeps every embedding (halfvec
+    rounds to float16), and only the configured type's index is rebuilt.
+    Does nothing if the column already has that type. Converting to
+    'half' requires pgvector >= 0.7.
+
+    Args:
+        connection: Autocommit connection (indexes are built concurrently)
+        precision: 'full' or 'half'
+
+    Returns:
+        True if the column was converted
+    """
+    vector_type, _ = VECTOR_TYPES[precision]
+    current, dimension = column_type(connection)
+
+    if current == vector_type:
+        return False
+
+    validate_dimension(dimension, precision)
+
+    drop_ann_indexes(connection)
+    connection.execute(text(
+        f"ALTER TABLE dialogues ALTER COLUMN embedding "
+        f"TYPE {vector_type}({int(dimension)}) USING embedding::{vector_type}({int(dimension)})"
+    ))
+    create_ann_index(connection, precision)
+    return True
+
+
+def count_embeddings(connection) -> int:
+    """Number of dialogues that have an embedding."""
+    return connection.execute(text(
+        "SELECT count(*) FROM dialogues WHERE embedding IS NOT NULL"
+    )).scalar()
+
+
+def resize(connection, dimension: int) -> bool:
+    """
+    Change dialogues.embedding to `dimension`, keeping its vector type.
+
+    Vectors cannot be converted between sizes, so every stored embedding
+    is cleared; callers must check count_embeddings() and confirm first.
+    Does nothing if the column already has that dimension.
+
+    Args:
+        connection: Autocommit connection (indexes are built concurrently)
+        dimension: New vector size
+
+    Returns:
+        True if the column was resized
+    """
+    vector_type, current = column_type(connection)
+    dimension = int(dimension)
+
+    if current == dimension:
+        return False
+
+    precision = 'half' if vector_type == 'halfvec' else 'full'
+    validate_dimension(dimension, precision)
+
+    drop_ann_indexes(connection)
+    connection.execute(text(
+        f"ALTER TABLE dialogues ALTER COLUMN embedding TYPE {vector_type}({dimension}) USING NULL"
+    ))
+    create_ann_index(connection, precision)
+    return True
@@ -1,28 +1,51 @@
 """Embedding generation service for vector search."""
 
 from typing import List, Optional
-from app.services.openrouter_client import OpenRouterClient
-from app.config import Config
+from app.services.embedding_backends import get_embedding_backend
+from app.services.embedding_cache import query_embedding_cache
 
 
 class EmbeddingService:
     """
     Service for generating text embeddings.
 
-    Uses OpenRouter API to generate embeddings for semantic search
-    and RAG (Retrieval Augmented Generation).
+    Generates embeddings for semantic search and RAG (Retrieval Augmented
+    Generation) through the backend selected by Config.EMBEDDING_BACKEND:
+    the OpenRouter API, or a deterministic offline hashing model.
     """
 
     def __init__(self):
         """Initialize embedding service."""
-        self.client = OpenRouterClient()
-        self.model = Config.EMBEDDING_MODEL
-        self.dimension = Config.EMBEDDING_DIMENSION
+        self.backend = get_embedding_backend()
+        self.model = self.backend.model
+        self.dimension = self.backend.dimension
+        self.cache = query_embedding_cache
+
+    def validate_embedding(self, embedding: List[float]) -> List[float]:
+        """
+        Check that an embedding has the configured dimension.
+
+        Args:
+            embedding: Embedding vector returned by the API
+
+        Returns:
+            The same embedding
+        """
+        if len(embedding) != self.dimension:
+            raise ValueError(
+                f"Expected embedding dimension {self.dimension}, "
+                f"got {len(embedding)}"
+            )
+
+        return embedding
 
     def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding vector for a single text.
 
+        Results are served from the per-worker query embedding cache when
+        the same (normalized) text was embedded recently.
+
         Args:
             text: Text to generate embedding for
 
@@ -35,15 +58,17 @@ class EmbeddingService:
         # Clean text
         text = text.strip()
 
+        cached = self.cache.get(text, self.model)
+        if cached is not None:
+            return cached
+
         # Generate embedding
-        embedding = self.client.create_embedding(text, model=self.model)
+        embedding = self.backend.embed_one(text)
 
         # Verify dimension
-        if len(embedding) != self.dimension:
-            raise ValueError(
-                f"Expected embedding dimension {self.dimension}, "
-                f"got {len(embedding)}"
-            )
+        self.validate_embedding(embedding)
+
+        self.cache.put(text, self.model, embedding)
 
         return embedding
 
@@ -78,11 +103,10 @@ class EmbeddingService:
             batch = texts[i:i + batch_size]
 
             try:
-                batch_embeddings = self.client.batch_create_embeddings(
-                    batch,
-                    model=self.model
+                batch_embeddings = self.backend.embed(batch)
+                all_embeddings.extend(
+                    self.validate_embedding(e) for e in batch_embeddings
                 )
-                all_embeddings.extend(batch_embeddings)
 
             except Exception as e:
                 raise Exception(
@@ -0,0 +1,171 @@
+"""Persistent content-addressed embedding store for ingestion scripts."""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import Config
+
+
+class EmbeddingStore:
+    """
+    On-disk embedding store keyed by SHA-256 of (model, text).
+
+    Embeddings survive database rebuilds, so re-running
+    scripts/generate_embeddings.py on unchanged text costs no API calls.
+
+    Each model gets one .npy file holding a structured array of
+    (32-byte key, float32 vector) rows, memory-mapped read-only on load.
+    save() only appends the new rows to a journal file next to it, so
+    saving after every batch costs O(batch) I/O; load() folds the journal
+    into the .npy file (write temp file, then rename) once per run. A torn
+    trailing record left by a crash is discarded.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        dimension: Optional[int] = None,
+        directory: Optional[str] = None
+    ):
+        """
+        Initialize embedding store.
+
+        Args:
+            model: Embedding model (defaults to Config.EMBEDDING_MODEL)
+            dimension: Vector dimension (defaults to Config.EMBEDDING_DIMENSION)
+            directory: Store directory (defaults to Config.EMBEDDING_STORE_PATH)
+        """
+        self.model = model or Config.EMBEDDING_MODEL
+        self.dimension = dimension or Config.EMBEDDING_DIMENSION
+        self.directory = Path(directory or Config.EMBEDDING_STORE_PATH)
+
+        slug = self.model.replace('/', '__')
+        self.path = self.directory / f"{slug}-{self.dimension}.npy"
+        self.journal_path = self.directory / f"{slug}-{self.dimension}.journal"
+
+        self.dtype = np.dtype([
+            ('key', 'S32'),
+            ('embedding', '<f4', (self.dimension,)),
+        ])
+
+        self._rows = np.empty(0, dtype=self.dtype)
+        self._index: Dict[bytes, int] = {}
+        self._journaled: Dict[bytes, np.ndarray] = {}
+        self._pending: Dict[bytes, np.ndarray] = {}
+
+        self.load()
+
+    def key(self, text: str) -> bytes:
+        """SHA-256 digest of model name and text."""
+        return hashlib.sha256(f"{self.model}\0{text}".encode('utf-8')).digest()
+
+    def load(self) -> None:
+        """Memory-map the store file if it exists, folding in any journal first."""
+        if self.journal_path.exists():
+            self._compact()
+
+        if not self.path.exists():
+            return
+
+        rows = np.load(self.path, mmap_mode='r')
+
+        if rows.dtype != self.dtype:
+            print(f"Warning: ignoring embedding store {self.path} (layout mismatch)")
+            return
+
+        self._rows = rows
+        self._index = {bytes(k): i for i, k in enumerate(rows['key'])}
+
+    def _compact(self) -> None:
+        """Rewrite the .npy file with the journal's rows appended, then drop the journal."""
+        rows = np.load(self.path) if self.path.exists() else np.empty(0, dtype=self.dtype)
+        if rows.dtype != self.dtype:
+            rows = np.empty(0, dtype=self.dtype)
+
+        data = self.journal_path.read_bytes()
+        journal = np.frombuffer(data[:len(data) - len(data) % self.dtype.itemsize], dtype=self.dtype)
+
+        # A crash between rename and unlink leaves rows that are already folded in
+        known = {bytes(k) for k in rows['key']}
+        fresh = np.fromiter((bytes(k) not in known for k in journal['key']), dtype=bool, count=len(journal))
+
+        tmp_path = self.path.with_suffix('.tmp.npy')
+        np.save(tmp_path, np.concatenate([rows, journal[fresh]]))
+        os.replace(tmp_path, self.path)
+        self.journal_path.unlink()
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._journaled) + len(self._pending)
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """
+        Look up a stored embedding.
+
+        Args:
+            text: Exact text that was embedded
+
+        Returns:
+            Embedding as list of floats, or None if not stored
+        """
+        key = self.key(text)
+
+        vector = self._pending.get(key)
+        if vector is None:
+            vector = self._journaled.get(key)
+        if vector is not None:
+            return vector.tolist()
+
+        row = self._index.get(key)
+        if row is None:
+            return None
+
+        return self._rows[row]['embedding'].tolist()
+
+    def put(self, text: str, embedding: List[float]) -> None:
+        """
+        Stage an embedding for the next save().
+
+        Args:
+            text: Exact text that was embedded
+            embedding: Embedding vector
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+
+        if vector.shape != (self.dimension,):
+            raise ValueError(
+                f"Expected embedding dimension {self.dimension}, "
+                f"got {vector.shape[0]}"
+            )
+
+        key = self.key(text)
+        if key not in self._index and key not in self._journaled:
+            self._pending[key] = vector
+
+    def save(self) -> int:
+        """
+        Append staged embeddings to the journal.
+
+        Returns:
+            Number of new embeddings written
+        """
+        if not self._pending:
+            return 0
+
+        new_rows = np.empty(len(self._pending), dtype=self.dtype)
+        new_rows['key'] = list(self._pending.keys())
+        new_rows['embedding'] = np.stack(list(self._pending.values()))
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, 'ab') as f:
+            f.write(new_rows.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._journaled.update(self._pending)
+        self._pending.clear()
+
+        return len(new_rows)
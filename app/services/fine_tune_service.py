@@ -1,8 +1,9 @@
 """Fine-tuning service for creating custom comedian models."""
 
 import time
-from typing import Optional, Dict, Any
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+from openai import OpenAI, APITimeoutError
 
 from app import db
 from app.models.fine_tuning_job import FineTuningJob
@@ -208,6 +209,67 @@ class FineTuneService:
         except Exception as e:
             raise Exception(f"Failed to use fine-tuned model: {str(e)}")
 
+    def compare_models(
+        self,
+        models: List[str],
+        prompt: str,
+        temperature: float = 0.7
+    ) -> List[Dict[str, Any]]:
+        """
+        Run one prompt against several models concurrently.
+
+        Calls run on up to Config.FINE_TUNE_COMPARE_WORKERS threads, each
+        with a per-call timeout of Config.COMPARE_CALL_TIMEOUT_SECONDS, so
+        total latency is that of the slowest model when every model gets a
+        thread. A failing model does not fail the others.
+
+        Args:
+            models: Model IDs (base and/or fine-tuned checkpoints)
+            prompt: User prompt
+            temperature: Sampling temperature
+
+        Returns:
+            One result per model, in input order, with status ('ok',
+            'timeout' or 'error'), response, latency_ms and usage
+        """
+        messages = [{"role": "user", "content": prompt}]
+        client = self.client.with_options(timeout=Config.COMPARE_CALL_TIMEOUT_SECONDS)
+
+        def run(model):
+            start_time = time.time()
+            result = {"model": model}
+
+            try:
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature
+                )
+                result.update(
+                    status="ok",
+                    response=response.choices[0].message.content,
+                    usage={
+                        "prompt_tokens": response.usage.prompt_tokens,
+                        "completion_tokens": response.usage.completion_tokens,
+                        "total_tokens": response.usage.total_tokens,
+                    }
+                )
+
+            except APITimeoutError:
+                result.update(
+                    status="timeout", response=None, usage=None,
+                    error=f"No response within {Config.COMPARE_CALL_TIMEOUT_SECONDS:g}s"
+                )
+            except Exception as e:
+                result.update(status="error", response=None, usage=None, error=str(e))
+
+            result["latency_ms"] = int((time.time() - start_time) * 1000)
+            return result
+
+        workers = max(min(len(models), Config.FINE_TUNE_COMPARE_WORKERS), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, models))
+
     def compare_base_vs_finetuned(
         self,
         base_model: str,
@@ -217,6 +279,8 @@ class FineTuneService:
         """
         Compare responses from base model vs fine-tuned model.
 
+        Both models are called concurrently (see compare_models).
+
         Args:
             base_model: Base model ID
             finetuned_model: Fine-tuned model ID
@@ -225,32 +289,33 @@ class FineTuneService:
         Returns:
             Comparison of both responses
         """
-        messages = [{"role": "user", "content": prompt}]
+        base, fine_tuned = self.compare_models([base_model, finetuned_model], prompt)
 
-        # Get base model response
-        base_response = self.client.chat.completions.create(
-            model=base_model,
-            messages=messages,
-            temperature=0.7
-        )
+        for result in (base, fine_tuned):
+            if result["status"] != "ok":
+                raise Exception(f"{result['model']}: {result['error']}")
 
-        # Get fine-tuned model response
-        ft_response = self.client.chat.completions.create(
-            model=finetuned_model,
-            messages=messages,
-            temperature=0.7
-        )
+        return self.pair_comparison(prompt, base, fine_tuned)
 
+    @staticmethod
+    def pair_comparison(
+        prompt: str,
+        base: Dict[str, Any],
+        fine_tuned: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the base vs fine-tuned summary from two compare_models results."""
         return {
             "prompt": prompt,
             "base_model": {
-                "model": base_model,
-                "response": base_response.choices[0].message.content,
-                "tokens": base_response.usage.total_tokens
+                "model": base["model"],
+                "response": base["response"],
+                "tokens": base["usage"]["total_tokens"],
+                "latency_ms": base["latency_ms"]
             },
             "fine_tuned": {
-                "model": finetuned_model,
-                "response": ft_response.choices[0].message.content,
-                "tokens": ft_response.usage.total_tokens
+                "model": fine_tuned["model"],
+                "response": fine_tuned["response"],
+                "tokens": fine_tuned["usage"]["total_tokens"],
+                "latency_ms": fine_tuned["latency_ms"]
             }
         }
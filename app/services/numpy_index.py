@@ -0,0 +1,336 @@
+"""In-process brute-force vector index built on NumPy."""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, NamedTuple, Optional
+
+import numpy as np
+
+from app import db
+from app.models.dialogue import Dialogue
+from app.config import Config
+
+
+class IndexState(NamedTuple):
+    """One immutable generation of indexed data (matrix rows match records)."""
+
+    matrix: np.ndarray
+    records: List[Dict[str, Any]]
+    comedian_masks: Dict[str, np.ndarray]
+    emotion_masks: Dict[str, np.ndarray]
+    loaded_at: Optional[float]
+    source: Optional[str]  # 'database' or snapshot directory
+
+
+class NumpyVectorIndex:
+    """
+    Exact cosine-similarity search over an in-memory embedding matrix.
+
+    All dialogue embeddings are held in one contiguous float32 matrix with
+    L2-normalized rows, so a query is a single matrix-vector product followed
+    by argpartition. Comedian/emotion filters use precomputed boolean masks.
+    Results have the same shape as VectorSearchService's pgvector path.
+
+    The matrix is either loaded from the database into private memory, or
+    memory-mapped read-only from a published snapshot so that all gunicorn
+    workers share the same pages through the OS page cache.
+
+    All indexed data lives in one IndexState that is replaced with a single
+    assignment, and search() reads that reference once, so a refresh racing
+    a search never mixes matrix, records and masks from different loads.
+    """
+
+    def __init__(self):
+        """Initialize an empty index (call load() before searching)."""
+        self.state = IndexState(
+            matrix=np.empty((0, Config.EMBEDDING_DIMENSION), dtype=np.float32),
+            records=[],
+            comedian_masks={},
+            emotion_masks={},
+            loaded_at=None,
+            source=None
+        )
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self.state.matrix
+
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        return self.state.records
+
+    @property
+    def loaded_at(self) -> Optional[float]:
+        return self.state.loaded_at
+
+    @property
+    def source(self) -> Optional[str]:
+        return self.state.source
+
+    @staticmethod
+    def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """L2-normalize rows in place (zero rows are left as zeros)."""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        return matrix
+
+    @staticmethod
+    def build_masks(values: List[Optional[str]]) -> Dict[str, np.ndarray]:
+        """Build one boolean row mask per distinct non-empty value."""
+        column = np.array(values, dtype=object)
+        return {
+            value: column == value
+            for value in set(values) if value
+        }
+
+    @staticmethod
+    def fetch_from_database():
+        """
+        Read all embedded dialogues from the database.
+
+        Returns:
+            Tuple of (normalized float32 matrix, records in row order)
+        """
+        rows = db.session.query(
+            Dialogue.id,
+            Dialogue.comedian,
+            Dialogue.dialogue_english,
+            Dialogue.dialogue_tanglish,
+            Dialogue.context,
+            Dialogue.emotion,
+            Dialogue.embedding
+        ).filter(
+            Dialogue.embedding.isnot(None)
+        ).order_by(Dialogue.id).all()
+
+        matrix = np.empty((len(rows), Config.EMBEDDING_DIMENSION), dtype=np.float32)
+        records = []
+
+        for i, row in enumerate(rows):
+            matrix[i] = Dialogue.embedding_array(row.embedding)
+            records.append({
+                'id': row.id,
+                'comedian': row.comedian,
+                'dialogue_english': row.dialogue_english,
+                'dialogue_tanglish': row.dialogue_tanglish,
+                'context': row.context,
+                'emotion': row.emotion,
+            })
+
+        return NumpyVectorIndex.normalize_rows(matrix), records
+
+    def load(self) -> None:
+        """Load all embedded dialogues from the database into memory."""
+        matrix, records = self.fetch_from_database()
+        self.set_data(matrix, records, source='database')
+
+    def load_snapshot(self, directory: Path) -> None:
+        """
+        Memory-map a published snapshot (see publish_snapshot).
+
+        Args:
+            directory: Snapshot directory containing embeddings.npy and records.json
+        """
+        matrix = np.load(directory / 'embeddings.npy', mmap_mode='r')
+
+        with open(directory / 'records.json', 'r', encoding='utf-8') as f:
+            records = json.load(f)
+
+        if matrix.shape != (len(records), Config.EMBEDDING_DIMENSION):
+            raise ValueError(
+                f"Snapshot {directory} has matrix shape {matrix.shape} "
+                f"for {len(records)} records"
+            )
+
+        self.set_data(matrix, records, source=str(directory))
+
+    def set_data(
+        self,
+        matrix: np.ndarray,
+        records: List[Dict[str, Any]],
+        source: Optional[str] = None
+    ) -> None:
+        """
+        Replace the indexed data.
+
+        Args:
+            matrix: (N, D) float32 matrix with L2-normalized rows
+            records: N dialogue dictionaries, in matrix row order
+            source: Where the data came from
+        """
+        # Publish in one assignment so concurrent searches never see a mix
+        self.state = IndexState(
+            matrix=matrix,
+            records=records,
+            comedian_masks=self.build_masks([r['comedian'] for r in records]),
+            emotion_masks=self.build_masks([r['emotion'] for r in records]),
+            loaded_at=time.time(),
+            source=source
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        threshold: float,
+        comedian: Optional[str] = None,
+        emotion: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the top_k most similar dialogues above threshold.
+
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results to return
+            threshold: Minimum cosine similarity (exclusive)
+            comedian: Filter by specific comedian
+            emotion: Filter by specific emotion
+
+        Returns:
+            List of dictionaries containing dialogue and similarity score
+        """
+        # Read the state once: everything below comes from the same load
+        state = self.state
+        matrix, records = state.matrix, state.records
+
+        if not records or top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+
+        scores = matrix @ (query / norm)
+
+        mask = None
+        if comedian:
+            mask = state.comedian_masks.get(comedian, np.zeros(len(records), dtype=bool))
+        if emotion:
+            emotion_mask = state.emotion_masks.get(emotion, np.zeros(len(records), dtype=bool))
+            mask = emotion_mask if mask is None else mask & emotion_mask
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+
+        k = min(top_k, len(records))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        return [
+            dict(records[i], similarity=float(scores[i]))
+            for i in candidates
+            if scores[i] > threshold
+        ]
+
+
+def publish_snapshot(
+    root: Path,
+    matrix: np.ndarray,
+    records: List[Dict[str, Any]],
+    keep: int = 3
+) -> Path:
+    """
+    Write a new snapshot and atomically make it the current one.
+
+    Layout under root:
+        snapshot-<timestamp>/embeddings.npy   normalized float32 matrix
+        snapshot-<timestamp>/records.json     id/metadata per matrix row
+        CURRENT                               name of the active snapshot
+
+    Workers that still map an older snapshot keep reading it until they
+    switch; removed files stay valid for existing mappings.
+
+    Args:
+        root: Snapshot root directory
+        matrix: (N, D) float32 matrix with L2-normalized rows
+        records: N dialogue dictionaries, in matrix row order
+        keep: Number of snapshots to retain (including the new one)
+
+    Returns:
+        Path of the new snapshot directory
+    """
+    root.mkdir(parents=True, exist_ok=True)
+
+    name = f"snapshot-{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}"
+    directory = root / name
+    directory.mkdir()
+
+    np.save(directory / 'embeddings.npy', np.ascontiguousarray(matrix, dtype=np.float32))
+    with open(directory / 'records.json', 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False)
+
+    # Swap the pointer in one rename so readers never see a partial snapshot
+    tmp_pointer = root / 'CURRENT.tmp'
+    tmp_pointer.write_text(name)
+    os.replace(tmp_pointer, root / 'CURRENT')
+
+    # Prune old snapshots
+    snapshots = sorted(p for p in root.glob('snapshot-*') if p.is_dir())
+    for old in snapshots[:-keep] if keep > 0 else []:
+        for child in old.iterdir():
+            child.unlink()
+        old.rmdir()
+
+    return directory
+
+
+def current_snapshot(root: Path) -> Optional[Path]:
+    """Get the currently published snapshot directory, if any."""
+    try:
+        name = (root / 'CURRENT').read_text().strip()
+    except FileNotFoundError:
+        return None
+
+    directory = root / name
+    return directory if directory.is_dir() else None
+
+
+_index = NumpyVectorIndex()
+_index_lock = threading.Lock()
+_snapshot_checked_at = 0.0
+
+
+def get_numpy_index() -> NumpyVectorIndex:
+    """
+    Get this worker's NumPy index, loading or refreshing it when stale.
+
+    With Config.VECTOR_SNAPSHOT_PATH set, the worker maps the published
+    snapshot and switches to a newer one (checked every
+    VECTOR_SNAPSHOT_CHECK_SECONDS). Otherwise, or until a snapshot exists,
+    the index is loaded from the database and reloaded at most once every
+    Config.NUMPY_INDEX_REFRESH_SECONDS (0 disables periodic refresh).
+    """
+    global _snapshot_checked_at
+
+    if Config.VECTOR_SNAPSHOT_PATH:
+        now = time.time()
+        if _index.loaded_at is None or now - _snapshot_checked_at > Config.VECTOR_SNAPSHOT_CHECK_SECONDS:
+            with _index_lock:
+                # Another thread may have checked while we waited
+                if _index.loaded_at is None or now - _snapshot_checked_at > Config.VECTOR_SNAPSHOT_CHECK_SECONDS:
+                    _snapshot_checked_at = now
+                    snapshot = current_snapshot(Path(Config.VECTOR_SNAPSHOT_PATH))
+                    if snapshot is not None and str(snapshot) != _index.source:
+                        _index.load_snapshot(snapshot)
+
+        if _index.source not in (None, 'database'):
+            return _index
+
+    refresh = Config.NUMPY_INDEX_REFRESH_SECONDS
+    loaded_at = _index.loaded_at
+
+    if loaded_at is None or (refresh > 0 and time.time() - loaded_at > refresh):
+        with _index_lock:
+            # Another thread may have loaded it while we waited
+            if _index.loaded_at == loaded_at:
+                _index.load()
+
+    return _index
@@ -1,19 +1,110 @@
 """OpenRouter API client for LLM interactions."""
 
 import os
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Iterator, Optional
+import httpx
 from openai import OpenAI
 import tiktoken
 
 from app.config import Config
 
 
+class ConnectionStats:
+    """
+    Counts upstream requests and newly opened connections for this worker.
+
+    Fed by httpcore's trace extension, so it sees every new TCP connection
+    and TLS handshake. Requests minus connections opened = reused connections.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    def record(self, event: str) -> None:
+        """Record one httpcore trace event."""
+        with self._lock:
+            if event == 'connection.connect_tcp.complete':
+                self.connections_opened += 1
+            elif event == 'connection.start_tls.complete':
+                self.tls_handshakes += 1
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get counters and the connection reuse rate."""
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                'pid': os.getpid(),
+                'requests': self.requests,
+                'connections_opened': self.connections_opened,
+                'tls_handshakes': self.tls_handshakes,
+                'connections_reused': reused,
+                'reuse_rate': round(reused / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+connection_stats = ConnectionStats()
+
+
+def build_http_client(is_async: bool = False):
+    """
+    Build the pooled httpx client used under the OpenAI SDK.
+
+    Pool limits, keep-alive, timeouts and HTTP/2 come from Config; every
+    request is traced into connection_stats.
+
+    Args:
+        is_async: Build an httpx.AsyncClient instead of httpx.Client
+    """
+    options = {
+        'http2': Config.OPENROUTER_HTTP2,
+        'timeout': httpx.Timeout(
+            Config.OPENROUTER_TIMEOUT_SECONDS,
+            connect=Config.OPENROUTER_CONNECT_TIMEOUT_SECONDS
+        ),
+        'limits': httpx.Limits(
+            max_connections=Config.OPENROUTER_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.OPENROUTER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=Config.OPENROUTER_KEEPALIVE_EXPIRY_SECONDS
+        ),
+    }
+
+    if is_async:
+        async def trace(event, info):
+            connection_stats.record(event)
+
+        async def on_request(request):
+            connection_stats.record_request()
+            request.extensions['trace'] = trace
+
+        return httpx.AsyncClient(event_hooks={'request': [on_request]}, **options)
+
+    def trace(event, info):
+        connection_stats.record(event)
+
+    def on_request(request):
+        connection_stats.record_request()
+        request.extensions['trace'] = trace
+
+    return httpx.Client(event_hooks={'request': [on_request]}, **options)
+
+
 class OpenRouterClient:
     """
     Wrapper for OpenRouter API using OpenAI SDK format.
 
     OpenRouter provides access to multiple LLMs through a unified API
     that follows the OpenAI format.
+
+    Use get_openrouter_client() rather than constructing this directly, so
+    that all blueprints and services in a worker share one connection pool.
     """
 
     def __init__(self):
@@ -27,9 +118,12 @@ class OpenRouterClient:
                 "Please set it in your .env file."
             )
 
+        self.http_client = build_http_client()
+
         self.client = OpenAI(
             api_key=self.api_key,
             base_url=self.base_url,
+            http_client=self.http_client,
             default_headers={
                 "HTTP-Referer": Config.OPENROUTER_SITE_URL,
                 "X-Title": Config.OPENROUTER_APP_NAME,
@@ -64,69 +158,186 @@ class OpenRouterClient:
                 - tool_calls: If agent made tool calls
         """
         try:
-            # Prepare API call parameters
-            params = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-            }
+            params = self.build_chat_params(
+                messages, model, temperature, max_tokens, tools, tool_choice
+            )
 
-            if max_tokens:
-                params["max_tokens"] = max_tokens
+            # Make API call
+            response = self.client.chat.completions.create(**params)
 
-            if tools:
-                params["tools"] = tools
-                if tool_choice:
-                    params["tool_choice"] = tool_choice
+            return self.format_chat_response(response)
 
-            # Log the request
-            print(f"\n{'='*60}")
-            print(f"OpenRouter Request:")
-            print(f"Model: {model}")
-            print(f"Tools: {len(tools) if tools else 0}")
-            print(f"Tool Choice: {tool_choice}")
-            print(f"{'='*60}\n")
+        except Exception as e:
+            raise Exception(f"OpenRouter API error: {str(e)}")
 
-            # Make API call
-            response = self.client.chat.completions.create(**params)
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Create a streaming chat completion using OpenRouter.
 
-            # Extract response
-            message = response.choices[0].message
+        Same arguments as chat_completion.
+
+        Yields:
+            {"type": "token", "content": str} for each text delta, then one
+            {"type": "done", **response} where response has the same keys
+            as chat_completion's return value (tool calls are reassembled
+            from their streamed fragments)
+        """
+        try:
+            params = self.build_chat_params(
+                messages, model, temperature, max_tokens, tools, tool_choice
+            )
+            params["stream"] = True
+            params["stream_options"] = {"include_usage": True}
+
+            stream = self.client.chat.completions.create(**params)
+
+            content = []
+            tool_calls = {}
+            usage = None
+            finish_reason = None
+            response_model = model
+
+            for chunk in stream:
+                response_model = chunk.model or response_model
+
+                # The final chunk carries usage and no choices
+                if chunk.usage:
+                    usage = chunk.usage
+
+                if not chunk.choices:
+                    continue
+
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                delta = choice.delta
+
+                if delta.content:
+                    content.append(delta.content)
+                    yield {"type": "token", "content": delta.content}
+
+                # Tool call names/arguments arrive in fragments keyed by index
+                for tc in delta.tool_calls or []:
+                    call = tool_calls.setdefault(tc.index, {
+                        "id": None,
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""},
+                    })
+                    if tc.id:
+                        call["id"] = tc.id
+                    if tc.function and tc.function.name:
+                        call["function"]["name"] += tc.function.name
+                    if tc.function and tc.function.arguments:
+                        call["function"]["arguments"] += tc.function.arguments
 
             result = {
-                "response": message.content if message.content else "",
+                "type": "done",
+                "response": "".join(content),
                 "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens,
+                    "prompt_tokens": usage.prompt_tokens if usage else 0,
+                    "completion_tokens": usage.completion_tokens if usage else 0,
+                    "total_tokens": usage.total_tokens if usage else 0,
                 },
-                "model": response.model,
-                "finish_reason": response.choices[0].finish_reason,
+                "model": response_model,
+                "finish_reason": finish_reason,
             }
 
-            # Add tool calls if present (for agents)
-            if hasattr(message, 'tool_calls') and message.tool_calls:
-                result["tool_calls"] = [
-                    {
-                        "id": tc.id,
-                        "type": tc.type,
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments,
-                        }
-                    }
-                    for tc in message.tool_calls
-                ]
+            if tool_calls:
+                result["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
 
-            return result
+            yield result
 
         except Exception as e:
             raise Exception(f"OpenRouter API error: {str(e)}")
 
+    @staticmethod
+    def build_chat_params(
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build chat completion API parameters (and log the request).
+
+        Shared by the sync and async clients; see chat_completion for args.
+        """
+        # Prepare API call parameters
+        params = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+        }
+
+        if max_tokens:
+            params["max_tokens"] = max_tokens
+
+        if tools:
+            params["tools"] = tools
+            if tool_choice:
+                params["tool_choice"] = tool_choice
+
+        # Log the request
+        print(f"\n{'='*60}")
+        print(f"OpenRouter Request:")
+        print(f"Model: {model}")
+        print(f"Tools: {len(tools) if tools else 0}")
+        print(f"Tool Choice: {tool_choice}")
+        print(f"{'='*60}\n")
+
+        return params
+
+    @staticmethod
+    def format_chat_response(response) -> Dict[str, Any]:
+        """
+        Convert an SDK chat completion into our response dictionary.
+
+        Shared by the sync and async clients; see chat_completion for keys.
+        """
+        # Extract response
+        message = response.choices[0].message
+
+        result = {
+            "response": message.content if message.content else "",
+            "usage": {
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "total_tokens": response.usage.total_tokens,
+            },
+            "model": response.model,
+            "finish_reason": response.choices[0].finish_reason,
+        }
+
+        # Add tool calls if present (for agents)
+        if hasattr(message, 'tool_calls') and message.tool_calls:
+            result["tool_calls"] = [
+                {
+                    "id": tc.id,
+                    "type": tc.type,
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments,
+                    }
+                }
+                for tc in message.tool_calls
+            ]
+
+        return result
+
     def create_embedding(
         self,
         text: str,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        dimensions: Optional[int] = None
     ) -> List[float]:
         """
         Generate embedding vector for text.
@@ -134,6 +345,7 @@ class OpenRouterClient:
         Args:
             text: Text to embed
             model: Embedding model (defaults to Config.EMBEDDING_MODEL)
+            dimensions: Shortened output size, for models that support it
 
         Returns:
             List of floats representing the embedding vector
@@ -142,10 +354,11 @@ class OpenRouterClient:
             model = Config.EMBEDDING_MODEL
 
         try:
-            response = self.client.embeddings.create(
-                model=model,
-                input=text
-            )
+            params = {"model": model, "input": text}
+            if dimensions:
+                params["dimensions"] = dimensions
+
+            response = self.client.embeddings.create(**params)
 
             return response.data[0].embedding
 
@@ -155,7 +368,8 @@ class OpenRouterClient:
     def batch_create_embeddings(
         self,
         texts: List[str],
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        dimensions: Optional[int] = None
     ) -> List[List[float]]:
         """
         Generate embeddings for multiple texts in batch.
@@ -163,6 +377,7 @@ class OpenRouterClient:
         Args:
             texts: List of texts to embed
             model: Embedding model (defaults to Config.EMBEDDING_MODEL)
+            dimensions: Shortened output size, for models that support it
 
         Returns:
             List of embedding vectors
@@ -171,10 +386,11 @@ class OpenRouterClient:
             model = Config.EMBEDDING_MODEL
 
         try:
-            response = self.client.embeddings.create(
-                model=model,
-                input=texts
-            )
+            params = {"model": model, "input": texts}
+            if dimensions:
+                params["dimensions"] = dimensions
+
+            response = self.client.embeddings.create(**params)
 
             # Sort by index to ensure correct order
             embeddings = sorted(response.data, key=lambda x: x.index)
@@ -237,3 +453,27 @@ class OpenRouterClient:
         )
 
         return round(cost, 6)
+
+
+_client: Optional[OpenRouterClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def get_openrouter_client() -> OpenRouterClient:
+    """
+    Get this worker's shared OpenRouterClient (created on first use).
+
+    Reusing one client keeps TLS connections to openrouter.ai alive across
+    requests instead of handshaking for every request. A forked worker
+    builds its own client rather than inheriting its parent's sockets.
+    """
+    global _client, _client_pid
+
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = OpenRouterClient()
+                _client_pid = os.getpid()
+
+    return _client
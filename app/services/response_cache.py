@@ -0,0 +1,319 @@
+"""In-process response caches for LLM answers."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import Config
+
+
+class SemanticResponseCache:
+    """
+    Bounded cache of answers keyed on query meaning rather than exact text.
+
+    Each entry holds a unit-normalized query embedding, a scope (everything
+    besides the query that shapes the answer: models and filters) and the
+    cached answer. A lookup returns the most similar entry in the same scope
+    if its cosine similarity reaches the threshold. Entries are evicted
+    least-recently-used once max_entries is reached, or dropped on lookup
+    once older than ttl_seconds. Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, threshold: float):
+        """
+        Initialize response cache.
+
+        Args:
+            max_entries: Maximum number of cached answers (0 disables caching)
+            ttl_seconds: Seconds an entry stays valid (0 means no expiry)
+            threshold: Minimum cosine similarity for a hit
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, Tuple[Hashable, float, np.ndarray, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, embedding: List[float], scope: Hashable) -> Optional[Tuple[Any, float]]:
+        """
+        Find the cached answer for the most similar query in the same scope.
+
+        Args:
+            embedding: Query embedding
+            scope: Hashable key that must match exactly (e.g. models + filters)
+
+        Returns:
+            Tuple of (cached value, similarity), or None on a miss
+        """
+        if self.max_entries <= 0:
+            return None
+
+        query = self._unit(embedding)
+        now = time.monotonic()
+
+        with self._lock:
+            if self.ttl_seconds > 0:
+                expired = [
+                    entry_id for entry_id, (_, created, _, _) in self._entries.items()
+                    if now - created > self.ttl_seconds
+                ]
+                for entry_id in expired:
+                    del self._entries[entry_id]
+                self.expirations += len(expired)
+
+            candidates = [
+                (entry_id, vector) for entry_id, (entry_scope, _, vector, _) in self._entries.items()
+                if entry_scope == scope and len(vector) == len(query)
+            ]
+
+            if candidates:
+                scores = np.stack([vector for _, vector in candidates]) @ query
+                best = int(np.argmax(scores))
+
+                if scores[best] >= self.threshold:
+                    entry_id = candidates[best][0]
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return self._entries[entry_id][3], float(scores[best])
+
+            self.misses += 1
+            return None
+
+    def put(self, embedding: List[float], scope: Hashable, value: Any) -> None:
+        """
+        Store an answer, evicting the least recently used entry if full.
+
+        Args:
+            embedding: Query embedding
+            scope: Hashable key that lookups must match exactly
+            value: Answer to cache (treated as read-only by callers)
+        """
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[self._next_id] = (scope, time.monotonic(), self._unit(embedding), value)
+            self._next_id += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Get cache size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+class ExactResponseCache:
+    """
+    Cache of LLM responses keyed on the exact request.
+
+    The key is a hash of the full message list, model and sampling
+    parameters. Each key collects up to `samples` distinct responses before
+    it is served from; once full, hits rotate round-robin through the
+    samples so high-temperature personas still vary. Deterministic requests
+    (temperature 0) need only one sample. Keys are evicted least-recently-used
+    beyond max_keys, or dropped on lookup once older than ttl_seconds. Safe to
+    share between threads.
+    """
+
+    BYPASS_HEADER = 'X-Cache-Bypass'
+
+    def __init__(self, max_keys: int, samples: int, ttl_seconds: float):
+        """
+        Initialize response cache.
+
+        Args:
+            max_keys: Maximum number of cached requests (0 disables caching)
+            samples: Distinct responses to collect per request before serving
+            ttl_seconds: Seconds a key stays valid (0 means no expiry)
+        """
+        self.max_keys = max_keys
+        self.samples = max(samples, 1)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(messages: List[Dict[str, Any]], model: str, **params) -> str:
+        """Hash the message list, model and sampling parameters."""
+        payload = json.dumps(
+            {'messages': messages, 'model': model, 'params': params},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def bypass_requested(cls, headers) -> bool:
+        """Check request headers for `X-Cache-Bypass: 1` or `Cache-Control: no-cache`."""
+        if headers.get(cls.BYPASS_HEADER, '').lower() in ('1', 'true', 'yes'):
+            return True
+        return 'no-cache' in headers.get('Cache-Control', '').lower()
+
+    def lookup(self, key: str, headers) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        get() unless the request headers ask to bypass the cache.
+
+        A served response reports zero token usage, since no tokens were spent.
+
+        Returns:
+            Tuple of (cached response or None, whether the cache was bypassed)
+        """
+        if self.bypass_requested(headers):
+            with self._lock:
+                self.bypasses += 1
+            return None, True
+
+        response = self.get(key)
+        if response is not None:
+            response = dict(response, usage={'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0})
+        return response, False
+
+    def samples_for(self, temperature: float) -> int:
+        """Samples to collect for a request at this temperature."""
+        return 1 if not temperature else self.samples
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the next cached response for a key, once its samples are full.
+
+        Returns:
+            Cached response, or None on a miss (the caller should call the
+            LLM and put() the result)
+        """
+        if self.max_keys <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and self.ttl_seconds > 0:
+                if time.monotonic() - entry['created'] > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+
+            if entry is None or not entry['full']:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            response = entry['samples'][entry['cursor'] % len(entry['samples'])]
+            entry['cursor'] += 1
+            return response
+
+    def put(self, key: str, response: Dict[str, Any], samples: int) -> None:
+        """
+        Add a response sample for a key.
+
+        Duplicate response texts are not stored twice. A key counts as full
+        once it has `samples` distinct responses, or after twice that many
+        attempts (so a model that keeps repeating itself still gets cached).
+
+        Args:
+            key: Key from make_key
+            response: Response dictionary to cache (treated as read-only)
+            samples: Distinct samples wanted for this key (see samples_for)
+        """
+        if self.max_keys <= 0:
+            return
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {'created': time.monotonic(), 'samples': [], 'attempts': 0,
+                         'cursor': 0, 'full': False}
+                self._entries[key] = entry
+
+            self._entries.move_to_end(key)
+
+            if entry['full']:
+                return
+
+            entry['attempts'] += 1
+            if all(s['response'] != response['response'] for s in entry['samples']):
+                entry['samples'].append(response)
+
+            entry['full'] = (len(entry['samples']) >= samples or
+                             entry['attempts'] >= 2 * samples)
+
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Get cache size and hit/miss/bypass/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'keys': len(self._entries),
+                'full_keys': sum(1 for e in self._entries.values() if e['full']),
+                'max_keys': self.max_keys,
+                'samples_per_key': self.samples,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypasses': self.bypasses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Process-wide cache of RAG answers shared by every request in this worker
+rag_response_cache = SemanticResponseCache(
+    max_entries=Config.RAG_RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=Config.RAG_RESPONSE_CACHE_TTL_SECONDS,
+    threshold=Config.RAG_RESPONSE_CACHE_THRESHOLD
+)
+
+# Process-wide cache of exact-match persona / fine-tuned chat responses
+chat_response_cache = ExactResponseCache(
+    max_keys=Config.CHAT_RESPONSE_CACHE_MAX_KEYS,
+    samples=Config.CHAT_RESPONSE_CACHE_SAMPLES,
+    ttl_seconds=Config.CHAT_RESPONSE_CACHE_TTL_SECONDS
+)
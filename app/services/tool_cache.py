@@ -0,0 +1,121 @@
+"""Cache of agent tool results, invalidated when the dialogue corpus changes."""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import Config
+from app.services.corpus_version import CorpusVersionTracker
+
+class ToolResultCache:
+    """
+    Bounded LRU cache of tool results keyed by tool name and arguments.
+
+    Every entry belongs to one corpus version. The version is re-read at
+    most every version_check_seconds; when it has moved, all entries are
+    dropped, so results are at most that many seconds stale after an
+    ingestion run. Safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int, version_check_seconds: float):
+        """
+        Initialize tool result cache.
+
+        Args:
+            max_entries: Maximum number of cached results (0 disables caching)
+            version_check_seconds: Seconds between corpus version checks
+        """
+        self.max_entries = max_entries
+        self.version_check_seconds = version_check_seconds
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._tracker = CorpusVersionTracker(version_check_seconds)
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Canonical key: tool name plus arguments with sorted keys and empty values dropped."""
+        canonical = {k: v for k, v in arguments.items() if v not in (None, '', [])}
+        return f"{tool_name}:{json.dumps(canonical, sort_keys=True, ensure_ascii=False)}"
+
+    def _current_version(self) -> Optional[int]:
+        """Corpus version, dropping every entry if it moved."""
+        version = self._tracker.current()
+
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+            return version
+
+    def get_or_compute(self, tool_name: str, arguments: Dict[str, Any],
+                       compute: Callable[[], str]) -> Tuple[str, str]:
+        """
+        Return the cached result for a call, computing and storing it on a miss.
+
+        Args:
+            tool_name: Tool name
+            arguments: Tool arguments
+            compute: Produces the result (a JSON string) on a miss
+
+        Returns:
+            Tuple of (result, 'hit' | 'miss')
+        """
+        if self.max_entries <= 0 or self._current_version() is None:
+            with self._lock:
+                self.misses += 1
+            return compute(), 'miss'
+
+        key = self.make_key(tool_name, arguments)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key], 'hit'
+            self.misses += 1
+            version = self._version
+
+        result = compute()
+
+        with self._lock:
+            # Don't store a result computed against a corpus that has since changed
+            if version == self._version:
+                self._entries[key] = result
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return result, 'miss'
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size, corpus version and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'corpus_version': self._version,
+                'version_check_seconds': self.version_check_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Process-wide cache of agent stats tool results
+agent_tool_cache = ToolResultCache(
+    max_entries=Config.AGENT_TOOL_CACHE_MAX_ENTRIES,
+    version_check_seconds=Config.AGENT_TOOL_CACHE_VERSION_CHECK_SECONDS
+)
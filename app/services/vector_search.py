@@ -1,13 +1,50 @@
 """Vector similarity search service for RAG."""
 
-from typing import List, Dict, Any, Optional
-from sqlalchemy import text
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from sqlalchemy import text, bindparam
+from pgvector.sqlalchemy import Vector
 
 from app import db
 from app.models.dialogue import Dialogue
 from app.services.embedding_service import EmbeddingService
+from app.services.numpy_index import get_numpy_index
 from app.config import Config
 
+# pgvector type of dialogues.embedding for each EMBEDDING_PRECISION
+VECTOR_TYPES = {
+    'full': 'vector',
+    'half': 'halfvec',
+}
+
+# Upper bounds pgvector accepts for hnsw.ef_search / ivfflat.probes
+MAX_EF_SEARCH = 1000
+MAX_PROBES = 32768
+
+# Similarity search statement (psycopg "pyformat" placeholders).
+# Each filter combination yields one distinct statement text, which psycopg
+# prepares once per pooled connection and then reuses. {vector_type} is the
+# stored type of the embedding column (vector or halfvec).
+SEARCH_SQL = """
+SELECT nearest.*, 1 - nearest.distance AS similarity
+FROM (
+    SELECT
+        id,
+        comedian,
+        dialogue_english,
+        dialogue_tanglish,
+        context,
+        emotion,
+        embedding <=> CAST(%(embedding)b AS {vector_type}) AS distance
+    FROM dialogues
+    WHERE embedding IS NOT NULL {filters}
+    ORDER BY distance
+    LIMIT %(top_k)s
+) AS nearest
+WHERE nearest.distance < %(max_distance)s
+ORDER BY nearest.distance
+"""
+
 
 class VectorSearchService:
     """
@@ -29,7 +66,10 @@ class VectorSearchService:
         top_k: Optional[int] = None,
         threshold: Optional[float] = None,
         comedian: Optional[str] = None,
-        emotion: Optional[str] = None
+        emotion: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for dialogues similar to the query using vector similarity.
@@ -40,6 +80,10 @@ class VectorSearchService:
             threshold: Minimum similarity score (defaults to Config.SIMILARITY_THRESHOLD)
             comedian: Filter by specific comedian
             emotion: Filter by specific emotion
+            ef_search: HNSW candidate list size (defaults to Config.HNSW_EF_SEARCH)
+            probes: IVFFlat lists to probe (defaults to Config.IVFFLAT_PROBES)
+            query_embedding: Embedding of query if the caller already has it
+                (skips generating it again)
 
         Returns:
             List of dictionaries containing dialogue and similarity score
@@ -54,51 +98,49 @@ class VectorSearchService:
             threshold = self.threshold
 
         # Generate query embedding
-        query_embedding = self.embedding_service.generate_embedding(query)
+        if query_embedding is None:
+            query_embedding = self.embedding_service.generate_embedding(query)
+
+        # In-process engine: no database round trip on the hot path
+        if Config.VECTOR_ENGINE == 'numpy':
+            return get_numpy_index().search(
+                query_embedding,
+                top_k=top_k,
+                threshold=threshold,
+                comedian=comedian,
+                emotion=emotion
+            )
 
-        # Format embedding as PostgreSQL array literal
-        embedding_str = '[' + ','.join(str(x) for x in query_embedding) + ']'
+        # Tune ANN recall for this transaction only
+        self._apply_index_params(ef_search=ef_search, probes=probes)
 
         # Build SQL query with pgvector
-        # Note: Using f-string for embedding since it's safe (just numbers)
-        # and :param for other parameters to avoid SQLAlchemy escaping issues
-        sql_query = f"""
-        SELECT
-            id,
-            comedian,
-            dialogue_english,
-            dialogue_tanglish,
-            context,
-            emotion,
-            1 - (embedding <=> '{embedding_str}'::vector) as similarity
-        FROM dialogues
-        WHERE
-            embedding IS NOT NULL
-            AND 1 - (embedding <=> '{embedding_str}'::vector) > :threshold
-        """
-
-        # Add optional filters
+        # The inner query is a plain "ORDER BY distance LIMIT k" so the planner
+        # can walk the HNSW/IVFFlat index; the similarity threshold is applied
+        # afterwards on the k candidates instead of on every row.
+        # The embedding is sent once as a bound parameter, never as a literal.
+        filters = []
         params = {
-            'threshold': threshold,
+            'embedding': np.asarray(query_embedding, dtype=np.float32),
+            'max_distance': 1 - threshold,
             'top_k': top_k
         }
 
         if comedian:
-            sql_query += " AND comedian = :comedian"
+            filters.append("AND comedian = %(comedian)s")
             params['comedian'] = comedian
 
         if emotion:
-            sql_query += " AND emotion = :emotion"
+            filters.append("AND emotion = %(emotion)s")
             params['emotion'] = emotion
 
-        # Order by similarity and limit
-        sql_query += f"""
-        ORDER BY embedding <=> '{embedding_str}'::vector
-        LIMIT :top_k
-        """
+        sql_query = SEARCH_SQL.format(
+            vector_type=VECTOR_TYPES[Config.EMBEDDING_PRECISION],
+            filters=" ".join(filters)
+        )
 
         # Execute query
-        result = db.session.execute(text(sql_query), params)
+        result = self._execute_search(sql_query, params)
 
         # Format results
         dialogues = []
@@ -115,6 +157,119 @@ class VectorSearchService:
 
         return dialogues
 
+    def _execute_search(self, sql_query: str, params: Dict[str, Any]) -> list:
+        """
+        Run the similarity statement on the session's connection.
+
+        With psycopg 3 the embedding is sent in pgvector's binary format and
+        the statement is executed as a server-side prepared statement, so
+        Postgres parses and plans it once per pooled connection. Other
+        drivers fall back to a SQLAlchemy bound parameter (text format).
+
+        Args:
+            sql_query: SEARCH_SQL with filters substituted
+            params: Statement parameters
+
+        Returns:
+            List of result rows with attribute access
+        """
+        connection = db.session.connection()
+
+        if connection.dialect.driver != 'psycopg':
+            # Translate %(name)s / %(name)b placeholders to :name
+            portable_sql = sql_query
+            for name in params:
+                for fmt in ('s', 'b'):
+                    portable_sql = portable_sql.replace(f'%({name}){fmt}', f':{name}')
+            statement = text(portable_sql).bindparams(
+                bindparam('embedding', type_=Vector(Config.EMBEDDING_DIMENSION))
+            )
+            return connection.execute(statement, params).fetchall()
+
+        from psycopg.rows import namedtuple_row
+        from pgvector.psycopg import register_vector
+
+        # Pool-level info dict lives as long as the DBAPI connection itself
+        dbapi_connection = connection.connection
+        raw_connection = dbapi_connection.driver_connection
+        if not dbapi_connection.info.get('pgvector_registered'):
+            register_vector(raw_connection)
+            dbapi_connection.info['pgvector_registered'] = True
+
+        with raw_connection.cursor(row_factory=namedtuple_row) as cursor:
+            cursor.execute(sql_query, params, prepare=True)
+            return cursor.fetchall()
+
+    @staticmethod
+    def validate_index_params(
+        ef_search: Optional[Any] = None,
+        probes: Optional[Any] = None
+    ) -> Dict[str, Optional[int]]:
+        """
+        Check ANN search parameters supplied by a client.
+
+        Args:
+            ef_search: HNSW candidate list size (1..MAX_EF_SEARCH) or None
+            probes: IVFFlat lists to probe (1..MAX_PROBES) or None
+
+        Returns:
+            Dict with the parameters as ints (None where not given)
+
+        Raises:
+            ValueError: If a parameter is not a positive integer within bounds
+        """
+        params = {}
+
+        for name, value, maximum in (('ef_search', ef_search, MAX_EF_SEARCH),
+                                     ('probes', probes, MAX_PROBES)):
+            if value is None:
+                params[name] = None
+                continue
+
+            if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdigit():
+                raise ValueError(f"{name} must be a positive integer")
+
+            value = int(value)
+            if not 1 <= value <= maximum:
+                raise ValueError(f"{name} must be between 1 and {maximum}")
+            params[name] = value
+
+        return params
+
+    def _apply_index_params(
+        self,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> None:
+        """
+        Set ANN index search parameters for the current transaction.
+
+        Equivalent to SET LOCAL, so the setting is discarded on commit or
+        rollback and never leaks to other requests using the same connection.
+
+        Args:
+            ef_search: HNSW candidate list size
+            probes: IVFFlat lists to probe
+
+        Raises:
+            ValueError: If a parameter is out of bounds (see validate_index_params)
+        """
+        params = self.validate_index_params(ef_search=ef_search, probes=probes)
+        ef_search, probes = params['ef_search'], params['probes']
+
+        if Config.VECTOR_INDEX_TYPE == 'ivfflat':
+            name = 'ivfflat.probes'
+            value = probes if probes is not None else Config.IVFFLAT_PROBES
+        else:
+            name = 'hnsw.ef_search'
+            value = ef_search if ef_search is not None else Config.HNSW_EF_SEARCH
+
+        # SET LOCAL does not accept bind parameters; set_config(..., true) does
+        db.session.execute(
+            text("SELECT set_config(:name, :value, true)"),
+            {'name': name, 'value': str(int(value))}
+        )
+
     def build_rag_context(
         self,
         retrieved_dialogues: List[Dict[str, Any]],
@@ -165,49 +320,67 @@ class VectorSearchService:
 
         return "".join(context_parts)
 
+    def _search_technical_note(self) -> str:
+        """Describe how the active vector engine performs the search."""
+        if Config.VECTOR_ENGINE == 'numpy':
+            return "In-memory NumPy matrix: normalized_embeddings @ query_vector, then argpartition for top k"
+        return f"PostgreSQL pgvector {Config.VECTOR_INDEX_TYPE.upper()} index: ORDER BY embedding <=> query_vector LIMIT k"
+
     def get_educational_explanation(
         self,
         query: str,
         retrieved_dialogues: List[Dict[str, Any]]
-    ) -> Dict[str, Any]:
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
         Generate educational explanation of the RAG process.
 
+        The explanation is returned in two parts so the static text is
+        stored once: see Conversation.merge_thinking_process.
+
         Args:
             query: User's original query
             retrieved_dialogues: Retrieved dialogues with similarity scores
 
         Returns:
-            Dictionary with step-by-step explanation
+            Tuple of (explanation template, per-request details)
         """
-        return {
+        details = {
+            "steps": {
+                "2": {
+                    "description": f"Searched {Dialogue.query.count()} dialogues using cosine similarity"
+                },
+                "3": {
+                    "description": f"Found {len(retrieved_dialogues)} relevant dialogues above threshold {self.threshold}",
+                    "results": [
+                        {
+                            "dialogue": d['dialogue_tanglish'] or d['dialogue_english'],
+                            "comedian": d['comedian'],
+                            "emotion": d['emotion'],
+                            "similarity": round(d['similarity'], 3)
+                        }
+                        for d in retrieved_dialogues
+                    ]
+                }
+            }
+        }
+
+        template = {
             "process": "RAG (Retrieval Augmented Generation)",
             "steps": [
                 {
                     "step": 1,
                     "title": "Query Embedding",
                     "description": f"Converted your query into a {Config.EMBEDDING_DIMENSION}-dimensional vector",
-                    "technical": "Used OpenAI's ada-002 embedding model via OpenRouter"
+                    "technical": f"Used the {self.embedding_service.model} embedding model ({Config.EMBEDDING_BACKEND} backend)"
                 },
                 {
                     "step": 2,
                     "title": "Similarity Search",
-                    "description": f"Searched {Dialogue.query.count()} dialogues using cosine similarity",
-                    "technical": f"PostgreSQL pgvector extension: ORDER BY embedding <=> query_vector"
+                    "technical": self._search_technical_note()
                 },
                 {
                     "step": 3,
-                    "title": "Retrieved Context",
-                    "description": f"Found {len(retrieved_dialogues)} relevant dialogues above threshold {self.threshold}",
-                    "results": [
-                        {
-                            "dialogue": d['dialogue_tanglish'] or d['dialogue_english'],
-                            "comedian": d['comedian'],
-                            "emotion": d['emotion'],
-                            "similarity": round(d['similarity'], 3)
-                        }
-                        for d in retrieved_dialogues
-                    ]
+                    "title": "Retrieved Context"
                 },
                 {
                     "step": 4,
@@ -222,3 +395,5 @@ class VectorSearchService:
                 "from our dialogue database to generate more accurate, grounded responses."
             )
         }
+
+        return template, details
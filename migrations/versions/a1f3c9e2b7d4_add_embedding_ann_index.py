@@ -0,0 +1,40 @@
+"""Add pgvector ANN index (HNSW or IVFFlat) on dialogues.embedding
+
+Revision ID: a1f3c9e2b7d4
+Revises: df823f4e0b27
+Create Date: 2026-01-12 10:14:32.118204
+
+"""
+from alembic import op
+
+from app.config import Config
+
+# revision identifiers, used by Alembic.
+revision = 'a1f3c9e2b7d4'
+down_revision = 'df823f4e0b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        if Config.VECTOR_INDEX_TYPE == 'ivfflat':
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_dialogues_embedding_ivfflat "
+                "ON dialogues USING ivfflat (embedding vector_cosine_ops) "
+                f"WITH (lists = {int(Config.IVFFLAT_LISTS)})"
+            )
+        else:
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_dialogues_embedding_hnsw "
+                "ON dialogues USING hnsw (embedding vector_cosine_ops) "
+                f"WITH (m = {int(Config.HNSW_M)}, "
+                f"ef_construction = {int(Config.HNSW_EF_CONSTRUCTION)})"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_dialogues_embedding_ivfflat")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_dialogues_embedding_hnsw")
@@ -0,0 +1,49 @@
+"""Track a dialogue corpus version bumped by a trigger on every change
+
+Revision ID: a9d4e7f20b38
+Revises: f1b7c3d92e64
+Create Date: 2026-02-23 11:48:09.530174
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4e7f20b38'
+down_revision = 'f1b7c3d92e64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'corpus_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO corpus_versions (name, version, updated_at) VALUES ('dialogues', 0, now())")
+
+    # Statement-level, so a bulk ingestion bumps the version once per statement
+    op.execute("""
+        CREATE FUNCTION bump_corpus_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE corpus_versions
+            SET version = version + 1, updated_at = now()
+            WHERE name = TG_ARGV[0];
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER dialogues_bump_corpus_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON dialogues
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_corpus_version('dialogues')
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER dialogues_bump_corpus_version ON dialogues")
+    op.execute("DROP FUNCTION bump_corpus_version()")
+    op.drop_table('corpus_versions')
@@ -0,0 +1,34 @@
+"""Store embeddings as halfvec when EMBEDDING_PRECISION is 'half'
+
+Revision ID: b7e2d5a90c13
+Revises: a1f3c9e2b7d4
+Create Date: 2026-01-19 15:42:08.530917
+
+"""
+from alembic import op
+
+from app.config import Config
+from app.services import embedding_schema
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d5a90c13'
+down_revision = 'a1f3c9e2b7d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # With 'full' nothing changes, so pgvector >= 0.7 (halfvec) is only
+    # needed by installs that opt in to half precision
+    if Config.EMBEDDING_PRECISION != 'half':
+        return
+
+    # Converts dialogues.embedding in place and swaps its ANN index;
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        embedding_schema.convert_precision(op.get_bind(), 'half')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        embedding_schema.convert_precision(op.get_bind(), 'full')
@@ -0,0 +1,44 @@
+"""Resize embedding columns to Config.EMBEDDING_DIMENSION
+
+Revision ID: c5a8f1e36d20
+Revises: b7e2d5a90c13
+Create Date: 2026-01-26 11:07:51.402736
+
+"""
+from alembic import op
+
+from app.config import Config
+from app.services import embedding_schema
+
+# revision identifiers, used by Alembic.
+revision = 'c5a8f1e36d20'
+down_revision = 'b7e2d5a90c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only resizes a column that holds no embeddings yet (a fresh install).
+    # Resizing clears every vector, so on a populated table this is left to
+    # scripts/alter_embedding_column.py --dimension, which asks first.
+    bind = op.get_bind()
+    _, current = embedding_schema.column_type(bind)
+
+    if current == Config.EMBEDDING_DIMENSION:
+        return
+
+    if embedding_schema.count_embeddings(bind):
+        print(
+            f"dialogues.embedding has dimension {current}, EMBEDDING_DIMENSION is "
+            f"{Config.EMBEDDING_DIMENSION}: left unchanged because it holds embeddings. "
+            "Run scripts/alter_embedding_column.py --dimension to resize it."
+        )
+        return
+
+    with op.get_context().autocommit_block():
+        embedding_schema.resize(bind, Config.EMBEDDING_DIMENSION)
+
+
+def downgrade():
+    # Never clears embeddings; resize with scripts/alter_embedding_column.py
+    pass
@@ -0,0 +1,114 @@
+"""Partition conversations by month on created_at
+
+Revision ID: d3b9e4f17a52
+Revises: c5a8f1e36d20
+Create Date: 2026-02-02 09:31:17.664020
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import Config
+
+# revision identifiers, used by Alembic.
+revision = 'd3b9e4f17a52'
+down_revision = 'c5a8f1e36d20'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "id, session_id, ai_concept, user_input, ai_response, model_used, "
+    "thinking_process, retrieved_dialogues, system_prompt, agent_actions, "
+    "response_time_ms, created_at"
+)
+
+COLUMN_DEFINITIONS = """
+    id INTEGER NOT NULL DEFAULT nextval('conversations_id_seq'),
+    session_id VARCHAR(100) NOT NULL,
+    ai_concept VARCHAR(50) NOT NULL,
+    user_input TEXT NOT NULL,
+    ai_response TEXT NOT NULL,
+    model_used VARCHAR(100),
+    thinking_process JSONB,
+    retrieved_dialogues JSONB,
+    system_prompt TEXT,
+    agent_actions JSONB,
+    response_time_ms INTEGER,
+"""
+
+INDEXES = ('ai_concept', 'created_at', 'session_id')
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_indexes(primary_key):
+    op.execute(f"ALTER TABLE conversations ADD CONSTRAINT conversations_pkey PRIMARY KEY ({primary_key})")
+    for column in INDEXES:
+        op.execute(f"CREATE INDEX ix_conversations_{column} ON conversations ({column})")
+
+
+def upgrade():
+    op.execute("ALTER TABLE conversations RENAME TO conversations_legacy")
+    op.execute("ALTER SEQUENCE conversations_id_seq OWNED BY NONE")
+
+    # The partition key cannot be NULL
+    op.execute(
+        "UPDATE conversations_legacy SET created_at = now() AT TIME ZONE 'utc' "
+        "WHERE created_at IS NULL"
+    )
+
+    op.execute(
+        f"CREATE TABLE conversations ({COLUMN_DEFINITIONS} "
+        f"created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL) "
+        f"PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER SEQUENCE conversations_id_seq OWNED BY conversations.id")
+
+    # One partition per month from the oldest row to a few months ahead,
+    # plus a default partition so an insert never fails for lack of one
+    oldest = op.get_bind().execute(sa.text(
+        "SELECT min(created_at) FROM conversations_legacy"
+    )).scalar()
+    current = datetime.utcnow().date().replace(day=1)
+    month = (oldest.date() if oldest else current).replace(day=1)
+    last = add_months(current, Config.CONVERSATION_PARTITION_MONTHS_AHEAD)
+
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE conversations_{month:%Y_%m} PARTITION OF conversations "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+        month = add_months(month, 1)
+
+    op.execute("CREATE TABLE conversations_default PARTITION OF conversations DEFAULT")
+
+    # Copy before building indexes (faster), then free the old names
+    op.execute(f"INSERT INTO conversations ({COLUMNS}) SELECT {COLUMNS} FROM conversations_legacy")
+    op.execute("DROP TABLE conversations_legacy")
+
+    # Primary key must include the partition key
+    create_indexes('id, created_at')
+    op.execute("ANALYZE conversations")
+
+
+def downgrade():
+    op.execute("ALTER TABLE conversations RENAME TO conversations_partitioned")
+    op.execute("ALTER SEQUENCE conversations_id_seq OWNED BY NONE")
+
+    op.execute(
+        f"CREATE TABLE conversations ({COLUMN_DEFINITIONS} "
+        f"created_at TIMESTAMP WITHOUT TIME ZONE)"
+    )
+    op.execute("ALTER SEQUENCE conversations_id_seq OWNED BY conversations.id")
+
+    op.execute(f"INSERT INTO conversations ({COLUMNS}) SELECT {COLUMNS} FROM conversations_partitioned")
+
+    # Dropping the parent drops every partition
+    op.execute("DROP TABLE conversations_partitioned")
+
+    create_indexes('id')
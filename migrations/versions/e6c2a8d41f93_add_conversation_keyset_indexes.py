@@ -0,0 +1,39 @@
+"""Add (session_id | ai_concept, created_at, id) indexes for keyset pagination
+
+Revision ID: e6c2a8d41f93
+Revises: d3b9e4f17a52
+Create Date: 2026-02-09 14:22:05.317846
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e6c2a8d41f93'
+down_revision = 'd3b9e4f17a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # conversations is partitioned, and CREATE INDEX CONCURRENTLY is not
+    # supported on a partitioned parent: this briefly blocks inserts
+    op.create_index(
+        'ix_conversations_session_id_created_at_id', 'conversations',
+        ['session_id', 'created_at', 'id']
+    )
+    op.create_index(
+        'ix_conversations_ai_concept_created_at_id', 'conversations',
+        ['ai_concept', 'created_at', 'id']
+    )
+
+    # Covered by the composite indexes' leading column
+    op.drop_index('ix_conversations_session_id', table_name='conversations')
+    op.drop_index('ix_conversations_ai_concept', table_name='conversations')
+
+
+def downgrade():
+    op.create_index('ix_conversations_ai_concept', 'conversations', ['ai_concept'])
+    op.create_index('ix_conversations_session_id', 'conversations', ['session_id'])
+
+    op.drop_index('ix_conversations_ai_concept_created_at_id', table_name='conversations')
+    op.drop_index('ix_conversations_session_id_created_at_id', table_name='conversations')
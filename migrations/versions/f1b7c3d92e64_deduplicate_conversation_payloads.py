@@ -0,0 +1,233 @@
+"""Store conversation system prompts and thinking process templates once in payload_blobs
+
+Revision ID: f1b7c3d92e64
+Revises: e6c2a8d41f93
+Create Date: 2026-02-16 10:04:41.902315
+
+"""
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'f1b7c3d92e64'
+down_revision = 'e6c2a8d41f93'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Inline column -> hash column
+PAYLOADS = {
+    'system_prompt': 'system_prompt_hash',
+    'thinking_process': 'thinking_process_hash',
+}
+
+# Per-request parts of a thinking_process, by ai_concept: top-level keys,
+# and step number -> fields of that step. Must match what the explanation
+# builders return as details (VectorSearchService.get_educational_explanation,
+# agents.routes.agent_explanation), so old rows share the new templates
+THINKING_DETAILS = {
+    'rag': ((), {2: ('description',), 3: ('description', 'results')}),
+    'agent': (('tool_cache',), {2: ('description',), 3: ('description',)}),
+}
+# Keys filled on read from another column (Conversation.THINKING_PROCESS_SOURCES)
+THINKING_SOURCES = {
+    'agent': {'what_happened': 'agent_actions'},
+}
+
+
+def digest(content):
+    # Must match PayloadBlob.digest
+    payload = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def split_thinking_process(content, ai_concept, columns):
+    """Split an inline thinking_process into (template, details) like the runtime does."""
+    if not isinstance(content, dict):
+        return content, None
+
+    keys, step_fields = THINKING_DETAILS.get(ai_concept, ((), {}))
+    template = dict(content)
+    details = {}
+
+    for key, column in THINKING_SOURCES.get(ai_concept, {}).items():
+        if key in template and template[key] == columns.get(column):
+            del template[key]
+
+    for key in keys:
+        if key in template:
+            details[key] = template.pop(key)
+
+    if step_fields and isinstance(template.get('steps'), list):
+        steps = []
+        for step in template['steps']:
+            fields = step_fields.get(step.get('step'), ()) if isinstance(step, dict) else ()
+            moved = {field: step[field] for field in fields if field in step}
+            if moved:
+                details.setdefault('steps', {})[str(step['step'])] = moved
+                step = {k: v for k, v in step.items() if k not in moved}
+            steps.append(step)
+        template['steps'] = steps
+
+    return template, details or None
+
+
+def merge_thinking_process(template, details, ai_concept, columns):
+    """Inverse of split_thinking_process (Conversation.merge_thinking_process)."""
+    if not isinstance(template, dict):
+        return template
+
+    merged = dict(template)
+
+    if details:
+        step_details = details.get('steps') or {}
+        merged.update((k, v) for k, v in details.items() if k != 'steps')
+        if step_details and 'steps' in merged:
+            merged['steps'] = [
+                dict(step, **step_details.get(str(step.get('step')), {}))
+                for step in merged['steps']
+            ]
+
+    for key, column in THINKING_SOURCES.get(ai_concept, {}).items():
+        if key not in merged and columns.get(column) is not None:
+            merged[key] = columns[column]
+
+    return merged
+
+
+def batches(bind, columns, where, join=""):
+    """Yield conversations matching where, BATCH_SIZE rows at a time in keyset order."""
+    position = None
+
+    while True:
+        after = "AND (c.created_at, c.id) > (:created_at, :id)" if position else ""
+        rows = bind.execute(sa.text(
+            f"SELECT c.id, c.created_at, {columns} FROM conversations c {join} "
+            f"WHERE ({where}) {after} "
+            f"ORDER BY c.created_at, c.id LIMIT :limit"
+        ), dict(position or {}, limit=BATCH_SIZE)).all()
+
+        if not rows:
+            return
+
+        yield rows
+        position = {'created_at': rows[-1].created_at, 'id': rows[-1].id}
+
+
+def backfill(bind):
+    """Move inline payloads into payload_blobs, one keyset batch at a time."""
+    for rows in batches(
+        bind,
+        "c.ai_concept, c.agent_actions, c.system_prompt, c.thinking_process",
+        "c.system_prompt IS NOT NULL OR c.thinking_process IS NOT NULL"
+    ):
+        blobs = {}
+        updates = []
+        for row in rows:
+            template, details = split_thinking_process(
+                row.thinking_process, row.ai_concept, {'agent_actions': row.agent_actions}
+            )
+            update = {
+                'id': row.id,
+                'created_at': row.created_at,
+                'thinking_details': json.dumps(details) if details is not None else None,
+            }
+            for column, content in (('system_prompt', row.system_prompt), ('thinking_process', template)):
+                hash_column = PAYLOADS[column]
+                update[hash_column] = digest(content) if content is not None else None
+                if content is not None:
+                    blobs[update[hash_column]] = (column, content)
+            updates.append(update)
+
+        bind.execute(
+            sa.text(
+                "INSERT INTO payload_blobs (hash, kind, content, created_at, last_used_at) "
+                "VALUES (:hash, :kind, CAST(:content AS JSONB), "
+                "now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc') "
+                "ON CONFLICT (hash) DO NOTHING"
+            ),
+            [{'hash': h, 'kind': kind, 'content': json.dumps(content)}
+             for h, (kind, content) in blobs.items()]
+        )
+
+        # created_at in the WHERE clause prunes the update to one partition
+        bind.execute(
+            sa.text(
+                "UPDATE conversations SET system_prompt_hash = :system_prompt_hash, "
+                "thinking_process_hash = :thinking_process_hash, "
+                "thinking_details = CAST(:thinking_details AS JSONB), "
+                "system_prompt = NULL, thinking_process = NULL "
+                "WHERE id = :id AND created_at = :created_at"
+            ),
+            updates
+        )
+
+
+def restore(bind):
+    """Inline each thinking_process again, merged with its details."""
+    for rows in batches(
+        bind,
+        "c.ai_concept, c.agent_actions, c.thinking_details, b.content AS template",
+        "c.thinking_process IS NULL",
+        join="JOIN payload_blobs b ON b.hash = c.thinking_process_hash"
+    ):
+        bind.execute(
+            sa.text(
+                "UPDATE conversations SET thinking_process = CAST(:thinking_process AS JSONB) "
+                "WHERE id = :id AND created_at = :created_at"
+            ),
+            [
+                {
+                    'id': row.id,
+                    'created_at': row.created_at,
+                    'thinking_process': json.dumps(merge_thinking_process(
+                        row.template, row.thinking_details, row.ai_concept,
+                        {'agent_actions': row.agent_actions}
+                    )),
+                }
+                for row in rows
+            ]
+        )
+
+
+def upgrade():
+    op.create_table(
+        'payload_blobs',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('kind', sa.String(length=30), nullable=False),
+        sa.Column('content', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('last_used_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('hash')
+    )
+
+    op.add_column('conversations', sa.Column('thinking_process_hash', sa.String(length=64), nullable=True))
+    op.add_column('conversations', sa.Column('system_prompt_hash', sa.String(length=64), nullable=True))
+    op.add_column('conversations', sa.Column(
+        'thinking_details', postgresql.JSONB(astext_type=sa.Text()), nullable=True
+    ))
+
+    backfill(op.get_bind())
+
+    # The freed TOAST space is reused by new rows; VACUUM FULL (or
+    # pg_repack) each partition to return it to the filesystem
+    op.execute("ANALYZE conversations")
+
+
+def downgrade():
+    # system_prompt blobs are JSON strings: #>> '{}' unwraps them to text
+    op.execute(
+        "UPDATE conversations c SET system_prompt = b.content #>> '{}' FROM payload_blobs b "
+        "WHERE b.hash = c.system_prompt_hash AND c.system_prompt IS NULL"
+    )
+    restore(op.get_bind())
+
+    op.drop_column('conversations', 'thinking_details')
+    op.drop_column('conversations', 'system_prompt_hash')
+    op.drop_column('conversations', 'thinking_process_hash')
+    op.drop_table('payload_blobs')
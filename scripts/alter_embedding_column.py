@@ -0,0 +1,89 @@
+"""
+Script to change how dialogues.embedding is stored.
+
+This script:
+1. Reads the column's current pgvector type and dimension
+2. With --dimension, resizes it to EMBEDDING_DIMENSION. Vectors cannot be
+   converted between sizes, so this CLEARS every stored embedding; it shows
+   how many would be lost and asks for confirmation (or --yes)
+3. Converts it to the configured EMBEDDING_PRECISION in place (vector <-> halfvec
+   keeps every embedding; halfvec rounds to float16)
+4. Rebuilds the configured ANN index on it
+
+It is idempotent: a column that already matches is left alone. Migrations
+apply the precision once, at upgrade time, and only resize an empty column;
+run this after changing EMBEDDING_PRECISION or EMBEDDING_DIMENSION on a
+database that is already up to date.
+
+Usage:
+    EMBEDDING_PRECISION=half python scripts/alter_embedding_column.py
+    EMBEDDING_DIMENSION=512 python scripts/alter_embedding_column.py --dimension [--yes]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app, db
+from app.config import Config
+from app.services import embedding_schema
+
+
+def alter_embedding_column(resize=False, assume_yes=False):
+    """Bring dialogues.embedding to the configured dimension and precision."""
+    app = create_app('development')
+
+    with app.app_context():
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        with db.engine.connect() as connection:
+            connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+
+            current = embedding_schema.column_type(connection)
+            if current is None:
+                print("dialogues.embedding not found. Run: flask db upgrade")
+                return
+
+            print(f"Current column: {current[0]}({current[1]})")
+
+            dimension = Config.EMBEDDING_DIMENSION
+            if current[1] != dimension:
+                if not resize:
+                    print(f"EMBEDDING_DIMENSION is {dimension}. "
+                          f"Re-run with --dimension to resize the column.")
+                    return
+
+                stored = embedding_schema.count_embeddings(connection)
+                if stored:
+                    print(f"\nWARNING: resizing to {dimension} dimensions deletes "
+                          f"all {stored} stored embeddings.")
+                    print("Regenerate them afterwards with scripts/generate_embeddings.py.")
+
+                    if not assume_yes:
+                        answer = input("Type 'yes' to continue: ")
+                        if answer.strip().lower() != 'yes':
+                            print("Aborted, nothing changed")
+                            return
+
+                embedding_schema.resize(connection, dimension)
+                print(f"Resized to {dimension} dimensions")
+
+            precision = Config.EMBEDDING_PRECISION
+            if embedding_schema.convert_precision(connection, precision):
+                print(f"Converted to {embedding_schema.VECTOR_TYPES[precision][0]} "
+                      f"and rebuilt the {Config.VECTOR_INDEX_TYPE} index")
+            else:
+                print(f"Already stored at precision '{precision}'")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--dimension', action='store_true',
+                        help='Resize to EMBEDDING_DIMENSION (clears stored embeddings)')
+    parser.add_argument('--yes', action='store_true',
+                        help='Do not ask before clearing embeddings')
+    args = parser.parse_args()
+
+    alter_embedding_column(args.dimension, args.yes)
@@ -0,0 +1,85 @@
+"""
+Script to maintain the monthly partitions of the conversations table.
+
+This script:
+1. Creates partitions for the current month and
+   CONVERSATION_PARTITION_MONTHS_AHEAD months ahead
+2. Archives partitions older than CONVERSATION_RETENTION_MONTHS to
+   CONVERSATION_ARCHIVE_PATH/<partition>.jsonl.gz
+3. Detaches and drops each archived partition (and finishes any partition
+   an earlier failed run left detached)
+4. Deletes payload blobs no remaining conversation references
+
+Run it daily (e.g. from cron) so new months always have a partition and
+the live table only holds the retention window.
+
+Usage:
+    python scripts/archive_conversations.py [--dry-run] [--retention-months 12]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app
+from app.config import Config
+from app.models.payload_blob import PayloadBlob
+from app.services.conversation_partitions import ensure_partitions, apply_retention
+
+
+def positive_int(value):
+    """argparse type: an integer >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def maintain_partitions(retention_months, dry_run=False):
+    """Create upcoming partitions and archive expired ones."""
+    app = create_app('development')
+
+    with app.app_context():
+        print(f"\n{'='*60}")
+        print("Conversation partition maintenance")
+        print(f"{'='*60}")
+
+        if dry_run:
+            print("Dry run: no partitions will be created or archived\n")
+        else:
+            created = ensure_partitions(Config.CONVERSATION_PARTITION_MONTHS_AHEAD)
+            print(f"Partitions created: {', '.join(created) if created else 'none'}\n")
+
+        archived = apply_retention(
+            retention_months,
+            Path(Config.CONVERSATION_ARCHIVE_PATH),
+            dry_run=dry_run
+        )
+
+        if not archived:
+            print(f"No partitions older than {retention_months} months")
+
+        for entry in archived:
+            if dry_run:
+                print(f"Would archive {entry['partition']}")
+            else:
+                print(f"Archived {entry['partition']}: {entry['rows']} rows -> {entry['archive']}")
+
+        if not dry_run:
+            print(f"Orphaned payload blobs deleted: {PayloadBlob.delete_orphans()}")
+
+        print(f"{'='*60}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--retention-months', type=positive_int,
+                        default=Config.CONVERSATION_RETENTION_MONTHS)
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only list partitions that would be archived')
+    args = parser.parse_args()
+
+    maintain_partitions(args.retention_months, args.dry_run)
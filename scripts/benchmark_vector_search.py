@@ -0,0 +1,321 @@
+"""
+Script to benchmark the vector similarity search query paths.
+
+This script:
+1. Picks query vectors from existing dialogue embeddings (no API calls)
+2. Times the legacy query (embedding pasted as a '...'::vector literal)
+3. Times the embedding as a bound text parameter, and as a binary bound
+   parameter without server-side prepare, to show where the saving comes from
+4. Times VectorSearchService's bound-parameter / prepared-statement path
+5. Prints per-query latency (mean, p50, p95) for each
+
+With --precision it instead measures what halfvec costs in recall. The
+full-precision embeddings (from the embedding store, or from the column
+while it is still a vector) are copied into two temporary tables, one
+vector and one halfvec, each with the configured ANN index. Both are
+searched in the same run and scored by latency and recall@k against an
+exact float32 ranking.
+
+Usage:
+    python scripts/benchmark_vector_search.py [--iterations 200] [--top-k 5]
+    python scripts/benchmark_vector_search.py --precision [--top-k 10]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import bindparam, text
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app, db
+from app.config import Config
+from app.models.dialogue import Dialogue
+from app.services import embedding_schema
+from app.services.embedding_service import EmbeddingService
+from app.services.embedding_store import EmbeddingStore
+from app.services.vector_search import (
+    VectorSearchService, SEARCH_SQL, VECTOR_TYPES
+)
+
+
+def legacy_search(query_embedding, top_k, threshold):
+    """Original implementation: decimal literal repeated in the SQL text."""
+    embedding_str = '[' + ','.join(str(x) for x in query_embedding) + ']'
+    vector_type = VECTOR_TYPES[Config.EMBEDDING_PRECISION]
+    sql_query = f"""
+    SELECT
+        id, comedian, dialogue_english, dialogue_tanglish, context, emotion,
+        1 - (embedding <=> '{embedding_str}'::{vector_type}) as similarity
+    FROM dialogues
+    WHERE
+        embedding IS NOT NULL
+        AND 1 - (embedding <=> '{embedding_str}'::{vector_type}) > :threshold
+    ORDER BY embedding <=> '{embedding_str}'::{vector_type}
+    LIMIT :top_k
+    """
+    return db.session.execute(
+        text(sql_query), {'threshold': threshold, 'top_k': top_k}
+    ).fetchall()
+
+
+def search_statement(query_embedding, top_k, threshold):
+    """SEARCH_SQL without filters and its parameters."""
+    vector_type = VECTOR_TYPES[Config.EMBEDDING_PRECISION]
+    params = {
+        'embedding': np.asarray(query_embedding, dtype=np.float32),
+        'max_distance': 1 - threshold,
+        'top_k': top_k
+    }
+    return SEARCH_SQL.format(vector_type=vector_type, filters=""), params
+
+
+def text_bound_search(query_embedding, top_k, threshold):
+    """Embedding as a SQLAlchemy bound parameter (pgvector text format)."""
+    sql_query, params = search_statement(query_embedding, top_k, threshold)
+    for name in params:
+        for fmt in ('s', 'b'):
+            sql_query = sql_query.replace(f'%({name}){fmt}', f':{name}')
+    statement = text(sql_query).bindparams(
+        bindparam('embedding', type_=Vector(Config.EMBEDDING_DIMENSION))
+    )
+    return db.session.execute(statement, params).fetchall()
+
+
+def binary_unprepared_search(query_embedding, top_k, threshold):
+    """Embedding in pgvector's binary format, statement parsed and planned every time."""
+    from pgvector.psycopg import register_vector
+
+    sql_query, params = search_statement(query_embedding, top_k, threshold)
+    dbapi_connection = db.session.connection().connection
+    raw_connection = dbapi_connection.driver_connection
+    if not dbapi_connection.info.get('pgvector_registered'):
+        register_vector(raw_connection)
+        dbapi_connection.info['pgvector_registered'] = True
+    with raw_connection.cursor() as cursor:
+        cursor.execute(sql_query, params, prepare=False)
+        return cursor.fetchall()
+
+
+def bound_search(service, query_embedding, top_k, threshold):
+    """Current implementation: one binary bound parameter, prepared statement."""
+    sql_query, params = search_statement(query_embedding, top_k, threshold)
+    return service._execute_search(sql_query, params)
+
+
+def load_samples(limit):
+    """Get (id, embedding) pairs for dialogues that have embeddings."""
+    return [
+        (row.id, Dialogue.embedding_array(row.embedding)) for row in db.session.query(
+            Dialogue.id, Dialogue.embedding
+        ).filter(
+            Dialogue.embedding.isnot(None)
+        ).order_by(Dialogue.id).limit(limit).all()
+    ]
+
+
+def summarize(label, timings):
+    """Print latency summary in milliseconds."""
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<28} mean {statistics.mean(timings):7.2f} ms   "
+          f"p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def run_benchmark(iterations=200, top_k=5, threshold=0.0):
+    """Time both query paths against the same query vectors."""
+    app = create_app('development')
+
+    with app.app_context():
+        samples = [embedding for _, embedding in load_samples(50)]
+
+        if not samples:
+            print("No dialogues with embeddings found!")
+            print("Run: python scripts/generate_embeddings.py")
+            return
+
+        # Avoid constructing EmbeddingService (needs an API key)
+        service = VectorSearchService.__new__(VectorSearchService)
+
+        variants = [
+            ('legacy literal SQL', lambda e: legacy_search(e, top_k, threshold)),
+            ('bound text parameter', lambda e: text_bound_search(e, top_k, threshold)),
+        ]
+        if db.engine.dialect.driver == 'psycopg':
+            variants.append(
+                ('bound binary, unprepared', lambda e: binary_unprepared_search(e, top_k, threshold))
+            )
+        variants.append(
+            ('bound binary + prepared', lambda e: bound_search(service, e, top_k, threshold))
+        )
+
+        results = {}
+        for label, search in variants:
+            # Warm up caches and prepared statements
+            for embedding in samples[:5]:
+                search(embedding)
+
+            timings = []
+            for i in range(iterations):
+                embedding = samples[i % len(samples)]
+                start = time.perf_counter()
+                search(embedding)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[label] = timings
+            db.session.rollback()
+
+        print(f"\n{'='*60}")
+        print(f"Vector search benchmark ({iterations} queries, top_k={top_k})")
+        print(f"Driver: {db.engine.dialect.driver}")
+        print(f"{'='*60}")
+        for label, timings in results.items():
+            summarize(label, timings)
+
+        saved = (statistics.median(results['legacy literal SQL']) -
+                 statistics.median(results['bound binary + prepared']))
+        print(f"\nMedian per-query latency saved: {saved:.2f} ms")
+
+
+def load_full_precision():
+    """
+    Get (id, float32 embedding) pairs at full precision.
+
+    A halfvec column only holds float16-rounded vectors, so the originals
+    come from the embedding store (keyed by the text that was embedded);
+    while the column is still a vector it is read directly.
+    """
+    if embedding_schema.column_type(db.session.connection())[0] == 'vector':
+        return load_samples(None)
+
+    embedding_service = EmbeddingService()
+    store = EmbeddingStore(model=embedding_service.model, dimension=embedding_service.dimension)
+
+    corpus = []
+    rows = db.session.query(
+        Dialogue.id, Dialogue.dialogue_tanglish, Dialogue.dialogue_english,
+        Dialogue.context, Dialogue.emotion
+    ).filter(Dialogue.embedding.isnot(None)).order_by(Dialogue.id)
+
+    for row in rows:
+        text_ = embedding_service.prepare_text_for_embedding(
+            dialogue_tamil=row.dialogue_tanglish,
+            dialogue_english=row.dialogue_english,
+            context=row.context,
+            emotion=row.emotion
+        )
+        embedding = store.get(text_)
+        if embedding is not None:
+            corpus.append((row.id, np.asarray(embedding, dtype=np.float32)))
+
+    return corpus
+
+
+def create_bench_table(name, vector_type, corpus, dimension):
+    """Temporary copy of the corpus as vector_type, with the configured ANN index."""
+    _, ops = embedding_schema.VECTOR_TYPES['half' if vector_type == 'halfvec' else 'full']
+
+    db.session.execute(text(
+        f"CREATE TEMP TABLE {name} (id integer PRIMARY KEY, "
+        f"embedding {vector_type}({dimension})) ON COMMIT DROP"
+    ))
+    db.session.execute(
+        text(f"INSERT INTO {name} (id, embedding) VALUES (:id, CAST(:embedding AS {vector_type}))"),
+        [{'id': int(dialogue_id), 'embedding': '[' + ','.join(map(str, embedding.tolist())) + ']'}
+         for dialogue_id, embedding in corpus]
+    )
+
+    if Config.VECTOR_INDEX_TYPE == 'ivfflat':
+        db.session.execute(text(
+            f"CREATE INDEX ON {name} USING ivfflat (embedding {ops}) "
+            f"WITH (lists = {int(Config.IVFFLAT_LISTS)})"
+        ))
+    else:
+        db.session.execute(text(
+            f"CREATE INDEX ON {name} USING hnsw (embedding {ops}) "
+            f"WITH (m = {int(Config.HNSW_M)}, ef_construction = {int(Config.HNSW_EF_CONSTRUCTION)})"
+        ))
+
+    # Autovacuum never analyzes temporary tables
+    db.session.execute(text(f"ANALYZE {name}"))
+
+
+def run_precision_benchmark(iterations=200, top_k=10):
+    """Compare latency and recall@k of vector and halfvec on the same embeddings."""
+    app = create_app('development')
+
+    with app.app_context():
+        corpus = load_full_precision()
+
+        if not corpus:
+            print("No full-precision embeddings found!")
+            print("Run: python scripts/generate_embeddings.py (fills the embedding store)")
+            return
+
+        # Exact float32 ranking as ground truth
+        ids = np.array([dialogue_id for dialogue_id, _ in corpus])
+        matrix = np.asarray([embedding for _, embedding in corpus], dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+
+        queries = corpus[:min(iterations, len(corpus))]
+        k = min(top_k, len(corpus))
+        exact = [set(ids[np.argsort(-(matrix @ matrix[ids == dialogue_id][0]))[:k]])
+                 for dialogue_id, _ in queries]
+
+        print(f"\n{'='*60}")
+        print(f"Precision benchmark ({len(queries)} queries, top_k={k}, "
+              f"{len(corpus)} dialogues, {Config.VECTOR_INDEX_TYPE})")
+        print(f"{'='*60}")
+
+        # Everything runs in one transaction; the temp tables drop on rollback
+        service = VectorSearchService.__new__(VectorSearchService)
+        recall = {}
+
+        for vector_type in ('vector', 'halfvec'):
+            table = f"bench_{vector_type}"
+            create_bench_table(table, vector_type, corpus, matrix.shape[1])
+            service._apply_index_params()
+
+            query = text(
+                f"SELECT id FROM {table} "
+                f"ORDER BY embedding <=> CAST(:embedding AS {vector_type}) LIMIT :top_k"
+            )
+
+            timings = []
+            recalls = []
+            for (dialogue_id, embedding), truth in zip(queries, exact):
+                params = {'embedding': '[' + ','.join(map(str, embedding.tolist())) + ']', 'top_k': k}
+
+                start = time.perf_counter()
+                found = set(db.session.execute(query, params).scalars())
+                timings.append((time.perf_counter() - start) * 1000)
+
+                recalls.append(len(truth & found) / k)
+
+            recall[vector_type] = statistics.mean(recalls)
+            summarize(vector_type, timings)
+            print(f"{'':<28} recall@{k} {recall[vector_type]:.4f}")
+
+        db.session.rollback()
+
+        print(f"\nRecall lost to halfvec: {recall['vector'] - recall['halfvec']:+.4f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=0.0)
+    parser.add_argument('--precision', action='store_true',
+                        help='Compare vector vs halfvec latency and recall@k')
+    args = parser.parse_args()
+
+    if args.precision:
+        run_precision_benchmark(args.iterations, args.top_k)
+    else:
+        run_benchmark(args.iterations, args.top_k, args.threshold)
@@ -0,0 +1,61 @@
+"""
+Script to publish a shared embedding snapshot for the NumPy vector engine.
+
+This script:
+1. Loads all dialogues with embeddings from the database
+2. Writes a normalized float32 matrix (.npy) plus an id/metadata sidecar
+3. Atomically points VECTOR_SNAPSHOT_PATH/CURRENT at the new snapshot
+
+Every gunicorn worker memory-maps the current snapshot read-only, so the
+matrix is held once in the OS page cache no matter how many workers run.
+Workers switch to a newly published snapshot within
+VECTOR_SNAPSHOT_CHECK_SECONDS.
+
+Usage:
+    VECTOR_SNAPSHOT_PATH=data/snapshots python scripts/build_vector_snapshot.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import create_app
+from app.config import Config
+from app.services.numpy_index import NumpyVectorIndex, publish_snapshot
+
+
+def build_snapshot(keep=3):
+    """Build and publish a snapshot of all dialogue embeddings."""
+    if not Config.VECTOR_SNAPSHOT_PATH:
+        print("VECTOR_SNAPSHOT_PATH is not set. Add it to your .env file.")
+        return
+
+    app = create_app('development')
+
+    with app.app_context():
+        print("Loading embeddings from database...")
+        matrix, records = NumpyVectorIndex.fetch_from_database()
+
+        if not records:
+            print("No dialogues with embeddings found!")
+            print("Run: python scripts/generate_embeddings.py")
+            return
+
+        directory = publish_snapshot(
+            Path(Config.VECTOR_SNAPSHOT_PATH),
+            matrix,
+            records,
+            keep=keep
+        )
+
+        print(f"\n{'='*60}")
+        print(f"Snapshot published: {directory}")
+        print(f"Dialogues: {len(records)}")
+        print(f"Matrix size: {matrix.nbytes / (1024 * 1024):.2f} MB")
+        print(f"{'='*60}")
+
+
+if __name__ == '__main__':
+    build_snapshot()
@@ -8,6 +8,8 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from sqlalchemy.orm import undefer
+
 from app import create_app, db
 from app.models.dialogue import Dialogue
 
@@ -42,7 +44,7 @@ def check_embeddings():
             print("\n✓ Embeddings found in database!")
 
             # Show sample
-            sample = Dialogue.query.filter(
+            sample = Dialogue.query.options(undefer(Dialogue.embedding)).filter(
                 Dialogue.embedding.isnot(None)
             ).first()
 
@@ -51,7 +53,7 @@ def check_embeddings():
                 print(f"  ID: {sample.id}")
                 print(f"  Comedian: {sample.comedian}")
                 print(f"  Emotion: {sample.emotion}")
-                embedding_dim = len(sample.embedding) if sample.embedding is not None else 0
+                embedding_dim = len(Dialogue.embedding_array(sample.embedding)) if sample.embedding is not None else 0
                 print(f"  Embedding dimension: {embedding_dim}")
         else:
             print("\n✗ No embeddings found in database.")
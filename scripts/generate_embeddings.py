@@ -3,8 +3,9 @@ Script to generate vector embeddings for all dialogues in the database.
 
 This script:
 1. Fetches dialogues without embeddings
-2. Generates embeddings using OpenRouter API
-3. Updates the database with the embeddings
+2. Reuses embeddings from the on-disk embedding store for unchanged text
+3. Generates the remaining embeddings using OpenRouter API
+4. Updates the database and the embedding store with the embeddings
 
 Usage:
     python scripts/generate_embeddings.py
@@ -19,6 +20,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from app import create_app, db
 from app.models.dialogue import Dialogue
 from app.services.embedding_service import EmbeddingService
+from app.services.embedding_store import EmbeddingStore
 
 
 def generate_embeddings(batch_size=10):
@@ -40,7 +42,15 @@ def generate_embeddings(batch_size=10):
         print(f"Found {len(dialogues)} dialogues without embeddings")
 
         embedding_service = EmbeddingService()
+        embedding_store = EmbeddingStore(
+            model=embedding_service.model,
+            dimension=embedding_service.dimension
+        )
+        print(f"Embedding store: {embedding_store.path} ({len(embedding_store)} stored)")
+
         total_generated = 0
+        total_reused = 0
+        total_written = 0
         total_errors = 0
 
         # Process in batches
@@ -60,15 +70,35 @@ def generate_embeddings(batch_size=10):
                     )
                     texts.append(text)
 
-                # Generate embeddings in batch
-                print("  Generating embeddings...")
-                embeddings = embedding_service.batch_generate_embeddings(texts)
+                # Reuse stored embeddings for unchanged text
+                embeddings = [embedding_store.get(text) for text in texts]
+                missing = [j for j, e in enumerate(embeddings) if e is None]
+
+                # Generate only the missing embeddings in batch
+                if missing:
+                    print(f"  Generating {len(missing)} embeddings...")
+                    generated = embedding_service.batch_generate_embeddings(
+                        [texts[j] for j in missing]
+                    )
+                    for j, embedding in zip(missing, generated):
+                        embeddings[j] = embedding
+                        embedding_store.put(texts[j], embedding)
+
+                    # Persist right away: an interrupted run (or a failed
+                    # commit below) must not pay for these embeddings again
+                    total_written += embedding_store.save()
+
+                reused = len(batch) - len(missing)
+                if reused:
+                    print(f"  Reused {reused} embeddings from store")
 
                 # Update database
                 for dialogue, embedding in zip(batch, embeddings):
                     dialogue.embedding = embedding
                     print(f"  + {dialogue.comedian} - {dialogue.emotion}")
-                    total_generated += 1
+
+                total_generated += len(missing)
+                total_reused += reused
 
                 # Commit batch
                 db.session.commit()
@@ -83,10 +113,12 @@ def generate_embeddings(batch_size=10):
         print(f"\n{'='*60}")
         print(f"Embedding generation complete!")
         print(f"Total embeddings generated: {total_generated}")
+        print(f"Total embeddings reused from store: {total_reused}")
+        print(f"New embeddings written to store: {total_written}")
         print(f"Total errors: {total_errors}")
         print(f"{'='*60}")
 
-        if total_generated > 0:
+        if total_generated + total_reused > 0:
             print(f"\nSuccess! Your dialogues now have vector embeddings.")
             print(f"You can now use the RAG feature in the application!")
 
@@ -36,8 +36,8 @@ def prepare_fine_tuning_dataset(output_file='data/processed/fine_tuning_dataset.
     with app.app_context():
         print("Preparing fine-tuning dataset...")
 
-        # Get all dialogues
-        dialogues = Dialogue.query.all()
+        # Get all dialogues (text columns only, no embeddings)
+        dialogues = Dialogue.records()
 
         if not dialogues:
             print("No dialogues found in database!")